@@ -1,5 +1,6 @@
 
 
+from . import utils
 from . import maya
 from . import houdini
 from . import nuke
\ No newline at end of file
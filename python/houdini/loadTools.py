@@ -5,11 +5,12 @@ try:
     from tank_vendor    import six
 
     import sgtk
-    import os
 
 except:
     pass
 
+from ..utils import PathResolver
+
 class LoadTools(object):
 
     def __init__(self):
@@ -27,7 +28,7 @@ class LoadTools(object):
             :class:`hou.Node`           : The new node created.
         '''
         # Check if the file exists on disk.
-        if not os.path.exists(path):
+        if not PathResolver.get().exists(path):
             raise Exception("File not found on disk - '%s'" % path)
 
         # Let houdini create a unique name by incrementing 001 for the imported geometry.
@@ -71,7 +72,7 @@ class LoadTools(object):
             :class:`hou.Node`           : The new node created.
         '''
         # Check if the file exists on disk.
-        if not os.path.exists(path):
+        if not PathResolver.get().exists(path):
             raise Exception("File not found on disk - '%s'" % path)
 
         # Let houdini create a unique name by incrementing 001 for the imported geometry.
@@ -104,7 +105,7 @@ class LoadTools(object):
             :class:`hou.Node`           : The new node created.
         '''
         # Check if the file exists on disk.
-        if(not os.path.exists(path)):
+        if(not PathResolver.get().exists(path)):
             raise Exception("File not found on disk - '%s'" % path)
 
         # Get the Object context.
@@ -279,7 +279,7 @@ class PublishTools(object):
         # Get the file path to the review file.
         filePath = item.properties.get("path")
 
-        # Check if the file exist.
+        # Check if the file exist, the freshly written file is not checked through the cache.
         if(not os.path.exists(filePath)):
             error_msg = "The file {} does not exist.".format(filePath)
             hookClass.logger.error(error_msg)
@@ -1,6 +1,21 @@
 from .mayaObject                    import MayaObject
 from .mayaAsset                     import MayaAsset
 from .mayaEnvironment               import MayaEnvironment
+from .dagPath                       import DagPath
+from .mayaDagApi                    import MayaDagApi
+from .mayaMetadatas                 import MayaMetadatas
+from .mayaReferenceIndex            import MayaReferenceIndex
+from .mayaRename                    import MayaRenamePlan
+from .mayaAnimation                 import MayaAnimation
+from .mayaDeformation               import MayaDeformation
+from .mayaEnvironmentAnalysis       import MayaEnvironmentAnalysis
+from .mayaInventory                 import MayaSceneInventory
+from .mayaInstanceRegistry          import MayaInstanceRegistry
+from .mayaReferenceLoader           import MayaReferenceLoader
+from .mayaLODSwitcher               import MayaLODSwitcher
+from .mayaProxy                     import MayaProxy
+from .mayaExportBackend             import MayaExportBackend
+from .publishTransaction            import PublishTransaction
 from .publishTools                  import PublishTools
 from .loadTools                     import LoadTools
 from .technicalCheck.technicalCheck import TechnicalCheck
\ No newline at end of file
@@ -0,0 +1,150 @@
+import sys
+import weakref
+
+# Python 2 has intern as a builtin.
+try:
+    _intern = sys.intern
+except AttributeError:
+    _intern = intern
+
+
+class DagPath(object):
+    ''' Parsed dag path.
+    The path is split once, the short name, namespace, depth, parent and the asset
+    name and instance are kept on the object. The instances are interned, DagPath.get
+    returns the same object for the same path while it is used, and the name
+    components are interned as they repeat across the scene.
+    A DagPath compares and hashes like its path string, so it can be used as a key
+    in the dictionaries and sets of paths.
+    '''
+
+    __slots__ = (
+        "_path",
+        "_parentPath",
+        "_shortName",
+        "_name",
+        "_namespace",
+        "_depth",
+        "_assetName",
+        "_instance",
+        "__weakref__"
+    )
+
+    # The interned paths.
+    _paths = weakref.WeakValueDictionary()
+
+    def __init__(self, path):
+        ''' Parse the path.
+
+        Args:
+            path    (str)   : The node path, full or partial.
+        '''
+        path = str(path)
+        parentPath, _, shortName = path.rpartition("|")
+        namespace, _, name = shortName.rpartition(":")
+
+        self._path          = path
+        self._parentPath    = parentPath
+        self._shortName     = _intern(shortName)
+        self._name          = _intern(name)
+        self._namespace     = _intern(namespace)
+        self._depth         = path.count("|")
+
+        # The asset name and instance are in the root namespace of the referenced assets,
+        # "chair_001:chair_RIG", otherwise in the node name, "chair_RIG".
+        assetTags = shortName.partition(":")[0].split("_")
+        self._assetName = _intern(assetTags[0])
+        self._instance  = int(assetTags[1]) if namespace and len(assetTags) > 1 and assetTags[1].isdigit() else None
+
+    @classmethod
+    def get(cls, path):
+        ''' Get the interned DagPath of a path.
+
+        Args:
+            path    (str)   : The node path.
+
+        Returns:
+            :class:`DagPath`: The parsed path.
+        '''
+        if(isinstance(path, DagPath)):
+            return path
+        dagPath = cls._paths.get(path)
+        if(dagPath is None):
+            dagPath = cls(path)
+            cls._paths[dagPath._path] = dagPath
+        return dagPath
+
+    @classmethod
+    def sortByDepth(cls, paths, reverse=False):
+        ''' Sort the paths by depth, the order of the paths with the same depth is kept.
+
+        Args:
+            paths   (list(str))         : The paths to sort.
+            reverse (bool,  optional)   : If True, the deepest paths come first.
+                                        Defaults to False.
+
+        Returns:
+            list(:class:`DagPath`)      : The sorted paths.
+        '''
+        return sorted([cls.get(path) for path in paths], key=lambda x : x._depth, reverse=reverse)
+
+    def __eq__(self, other):
+        if(isinstance(other, DagPath)):
+            return self._path == other._path
+        return self._path == other
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __lt__(self, other):
+        return self._path < str(other)
+
+    def __hash__(self):
+        return hash(self._path)
+
+    def __str__(self):
+        return self._path
+
+    def __repr__(self):
+        return "DagPath(%r)" % self._path
+
+    def __len__(self):
+        return len(self._path)
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def parent(self):
+        if(not self._parentPath):
+            return None
+        return DagPath.get(self._parentPath)
+
+    @property
+    def shortName(self):
+        return self._shortName
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def namespace(self):
+        return self._namespace or None
+
+    @property
+    def rootNamespace(self):
+        return self._shortName.partition(":")[0] if self._namespace else None
+
+    @property
+    def depth(self):
+        return self._depth
+
+    @property
+    def assetName(self):
+        return self._assetName
+
+    @property
+    def instance(self):
+        return self._instance
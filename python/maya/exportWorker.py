@@ -0,0 +1,107 @@
+''' Export worker run by mayapy for the :class:`MayaExportBackend`.
+
+Usage:
+    mayapy exportWorker.py <jobFile>
+
+The job json holds the "type" of the export, the "scene" to open, the "args" of the export
+and the "resultPath" where the result json is written.
+'''
+import  importlib.util
+import  json
+import  os
+import  sys
+import  time
+import  traceback
+
+# The name the framework package is loaded with in the worker.
+PACKAGE_NAME = "p3dFramework"
+
+
+def loadPackage():
+    ''' Load the python package of the framework.
+
+    Returns:
+        module  : The package.
+    '''
+    packageFolder = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    spec = importlib.util.spec_from_file_location(
+        PACKAGE_NAME,
+        os.path.join(packageFolder, "__init__.py"),
+        submodule_search_locations = [packageFolder]
+    )
+    package = importlib.util.module_from_spec(spec)
+    sys.modules[PACKAGE_NAME] = package
+    spec.loader.exec_module(package)
+    return package
+
+
+def exportMayaSelection(tools, args):
+    tools.exportMayaSelection(args["nodes"], args["path"])
+    return [args["path"]]
+
+
+def exportMayaAssetLOD(tools, args):
+    asset = sys.modules[PACKAGE_NAME].maya.MayaAsset(args["root"], readOnly=True)
+    tools.exportMayaAssetLOD(asset, args["lod"], args["path"])
+    return [args["path"]]
+
+
+def exportAlembics(tools, args):
+    tools.exportAlembics(args["jobs"], exportABCVersion=args.get("exportABCVersion", 1))
+    return [job["filePath"] for job in args["jobs"]]
+
+
+def exportMaterialX(tools, args):
+    asset = sys.modules[PACKAGE_NAME].maya.MayaAsset(args["root"], readOnly=True)
+    tools.exportMaterialX(asset, args["lookName"], args["path"], args["lod"])
+    return [args["path"]]
+
+
+# The export functions by job type.
+JOB_TYPES = {
+    "mayaSelection" : exportMayaSelection,
+    "mayaAssetLOD"  : exportMayaAssetLOD,
+    "alembics"      : exportAlembics,
+    "materialX"     : exportMaterialX
+}
+
+
+def main(jobPath):
+    ''' Run an export job.
+
+    Args:
+        jobPath (str)   : The job json.
+
+    Returns:
+        int             : The exit code.
+    '''
+    with open(jobPath, "r") as f:
+        job = json.load(f)
+
+    result      = {"status": "error"}
+    startTime   = time.time()
+    try:
+        import maya.standalone
+        maya.standalone.initialize(name="python")
+        from maya import cmds
+
+        package = loadPackage()
+        if(job["scene"]):
+            cmds.file(job["scene"], open=True, force=True)
+        print("Scene opened in %.3f seconds." % (time.time() - startTime))
+
+        outputs = JOB_TYPES[job["type"]](package.maya.PublishTools(), job["args"])
+        result = {"status": "ok", "outputs": outputs}
+    except Exception:
+        traceback.print_exc()
+        result = {"status": "error", "error": traceback.format_exc().strip().splitlines()[-1]}
+
+    result["workerDuration"] = time.time() - startTime
+    with open(job["resultPath"], "w") as f:
+        json.dump(result, f, indent=4)
+
+    return 0 if result["status"] == "ok" else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1]))
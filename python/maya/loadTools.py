@@ -6,62 +6,327 @@ try:
     from tank_vendor    import six
 
     import sgtk
-    import os
+    import time
 
 except:
     pass
 
-from .mayaObject    import MayaObject
-from .mayaAsset     import MayaAsset
+from .dagPath               import DagPath
+from .mayaObject            import MayaObject
+from .mayaAsset             import MayaAsset
+from .mayaInventory         import MayaSceneInventory
+from .mayaInstanceRegistry  import MayaInstanceRegistry
+from .mayaReferenceIndex    import MayaReferenceIndex
+from .mayaReferenceLoader   import MayaReferenceLoader, LOAD_ALL, LOAD_NONE
+from .mayaLODSwitcher       import MayaLODSwitcher
+from .mayaProxy             import MayaProxy
+from .mayaRename            import MayaRenamePlan
+from ..utils                import PathResolver
 
 class LoadTools(object):
 
-    def __init__(self):
-        pass
+    def __init__(self, publishCache=None):
+        ''' Initialize the load tools.
 
-    def importAsReference(self, name, path, sg_publish_data):
+        Args:
+            publishCache    (:class:`PublishCache`, optional)   : The local cache of the published files.
+                                                                If set, the files are loaded from their local copy.
+                                                                Defaults to None.
+        '''
+        self._publishCache = publishCache
+
+    def resolvePublishPath(self, path, wait=True):
+        ''' Get the file to load for a published file.
+
+        Args:
+            path    (str)               : The published file.
+            wait    (bool,  optional)   : If True, the file is copied to the cache before being loaded.
+                                        Defaults to True.
+
+        Returns:
+            str                         : The local copy if cached, otherwise the published file.
+        '''
+        if(self._publishCache is None):
+            return path
+        return self._publishCache.resolve(path, wait=wait)
+
+    def prefetchPublishes(self, paths):
+        ''' Copy the published files to the local cache in the background, ahead of a load.
+
+        Args:
+            paths   (list(str))     : The published files.
+
+        Returns:
+            dict(str, Future)       : The copies in progress by published file.
+        '''
+        if(self._publishCache is None):
+            return {}
+        return self._publishCache.prefetch(paths)
+
+    def importAsReference(self, name, path, sg_publish_data, loadMode=LOAD_ALL):
         ''' Import the file as reference.
 
         Args:
-            name                (str)   : The entity name.
-            path                (str)   : The path to reference.
-            sg_publish_data     (dict)  : The shotgrid publish data.
+            name                (str)               : The entity name.
+            path                (str)               : The path to reference.
+            sg_publish_data     (dict)              : The shotgrid publish data.
+            loadMode            (str,   optional)   : The load mode, "all", "topOnly" to defer the nested references,
+                                                    or "none" to create the reference unloaded with an anchor.
+                                                    Defaults to "all".
 
         Return:
-            :class:`MayaObject`         : The new object instance.
+            :class:`MayaObject`                     : The new object instance, the anchor for an unloaded reference.
         '''
         # Check if the file exists on disk.
-        if not os.path.exists(path):
+        if not PathResolver.get().exists(path):
             raise Exception("File not found on disk - '%s'" % path)
 
-        # Get the last instance number.
-        lastInstanceNumber = self.getLastInstanceNumber(name)
-        # Create the instance name.
-        instanceName = '{NAME}_{INSTANCE:03d}'.format(NAME=name, INSTANCE=lastInstanceNumber + 1)
-
-        # Import file as reference.
-        nodes = cmds.file(
-            path,
-            reference               = True,
-            loadReferenceDepth      = "all",
-            mergeNamespacesOnClash  = False,
-            namespace               = instanceName,
-            returnNewNodes          = True
-        )
+        # Reserve the next instance number and create the instance name.
+        instanceNumber, instanceName = self.instanceRegistry.allocate(name)
+
+        # Import file as reference, from the local cache when available.
+        try:
+            if(loadMode == LOAD_NONE):
+                # The unloaded reference has no node, it is represented by an anchor.
+                referenceFile = cmds.file(
+                    self.resolvePublishPath(path),
+                    reference               = True,
+                    deferReference          = True,
+                    mergeNamespacesOnClash  = False,
+                    namespace               = instanceName
+                )
+                refNode = cmds.referenceQuery(referenceFile, referenceNode=True)
+                rootNodes = [MayaReferenceLoader.createAnchor(instanceName, refNode)]
+            else:
+                nodes = cmds.file(
+                    self.resolvePublishPath(path),
+                    reference               = True,
+                    loadReferenceDepth      = loadMode,
+                    mergeNamespacesOnClash  = False,
+                    namespace               = instanceName,
+                    returnNewNodes          = True
+                )
+                refNode = None
+        except:
+            # The instance number is not used.
+            self.instanceRegistry.release(name, instanceNumber)
+            raise
 
         # Get the root nodes.
-        rootNodes = [node for node in nodes if 
-            cmds.nodeType(node) == 'transform' and
-            cmds.listRelatives(node, parent=True) is None
-        ]
+        if(refNode is None):
+            rootNodes = [node for node in nodes if 
+                cmds.nodeType(node) == 'transform' and
+                cmds.listRelatives(node, parent=True) is None
+            ]
 
         # Get the Maya object and set the shotgrid metadata.
         mayaObject = MayaObject(root=rootNodes[0])
-        mayaObject.sgMetadatas = sg_publish_data
+        if(sg_publish_data is not None):
+            mayaObject.sgMetadatas = sg_publish_data
+
+        # Record the new instance in the registry and the scene inventory.
+        self.instanceRegistry.setRoot(instanceName, mayaObject.fullname)
+        self.recordImport(mayaObject, name, instanceNumber, path, referenced=True, referenceNode=refNode)
 
         # Return the Maya object.
         return mayaObject
 
+    def importAsProxy(self, name, path, sg_publish_data, fullPath=None):
+        ''' Import the alembic as a gpuCache proxy, named and tagged like a reference.
+
+        Args:
+            name                (str)               : The entity name.
+            path                (str)               : The alembic of the proxy.
+            sg_publish_data     (dict)              : The shotgrid publish data.
+            fullPath            (str,   optional)   : The full file referenced when the proxy is swapped.
+                                                    Defaults to None.
+
+        Return:
+            :class:`MayaObject`                     : The new proxy instance.
+        '''
+        # Check if the file exists on disk.
+        if not PathResolver.get().exists(path):
+            raise Exception("File not found on disk - '%s'" % path)
+
+        # Reserve the next instance number and create the instance name.
+        instanceNumber, instanceName = self.instanceRegistry.allocate(name)
+
+        try:
+            root = MayaProxy.createProxy(instanceName, name, path, fullPath=fullPath, loadPath=self.resolvePublishPath(path))
+        except:
+            # The instance number is not used.
+            self.instanceRegistry.release(name, instanceNumber)
+            raise
+
+        # Get the Maya object and set the shotgrid metadata.
+        mayaObject = MayaObject(root=root)
+        if(sg_publish_data is not None):
+            mayaObject.sgMetadatas = sg_publish_data
+
+        # Record the new instance in the registry and the scene inventory.
+        self.instanceRegistry.setRoot(instanceName, mayaObject.fullname)
+        self.recordImport(mayaObject, name, instanceNumber, path, referenced=False)
+
+        return mayaObject
+
+    def _getSwapRoots(self, nodes, proxies):
+        ''' Get the roots to swap from nodes.
+
+        Args:
+            nodes   (list(str)) : The nodes, the selection if None.
+            proxies (bool)      : If True, the proxy roots are returned, otherwise the referenced roots.
+
+        Returns:
+            list(str)           : The roots full path.
+        '''
+        if(nodes is None):
+            nodes = cmds.ls(selection=True, long=True) or []
+
+        roots = []
+        for node in cmds.ls(nodes, type="transform", long=True) or []:
+            if(proxies):
+                if(not MayaProxy.isProxy(node)):
+                    continue
+                root = node
+            else:
+                if(not cmds.referenceQuery(node, isNodeReferenced=True)):
+                    continue
+                refNode = cmds.referenceQuery(node, referenceNode=True)
+                root = MayaReferenceLoader.getRootFromNodes(cmds.referenceQuery(refNode, nodes=True, dagPath=True) or [])
+            if(root and root not in roots):
+                roots.append(root)
+        return roots
+
+    def _recordSwap(self, inventory, oldRoot, newRoot, referenceNode=None, referencePath=None):
+        ''' Move the inventory record and the registry root of a swapped asset.
+
+        Args:
+            inventory       (:class:`MayaSceneInventory`)   : The scene inventory.
+            oldRoot         (str)                           : The root before the swap.
+            newRoot         (str)                           : The root after the swap.
+            referenceNode   (str,   optional)               : The reference node of the new root.
+                                                            Defaults to None.
+            referencePath   (str,   optional)               : The referenced file of the new root.
+                                                            Defaults to None.
+        '''
+        namespace = newRoot.rpartition("|")[2].rpartition(":")[0]
+        if(namespace):
+            self.instanceRegistry.setRoot(namespace, newRoot)
+
+        record = inventory.getAsset(oldRoot)
+        if(record is None):
+            return
+        inventory.removeAsset(oldRoot)
+        inventory.addAsset(
+            newRoot,
+            record["name"],
+            instance        = record["instance"],
+            referenceNode   = referenceNode,
+            referencePath   = referencePath,
+            sgMetadatas     = record["sgMetadatas"]
+        )
+
+    def swapProxiesToReferences(self, nodes=None):
+        ''' Swap proxies with references of their full file, keeping their transform and metadatas.
+
+        Args:
+            nodes   (list(str), optional)   : The proxies, the selected ones by default.
+                                            Defaults to None.
+
+        Returns:
+            dict                            : The report with the new reference root by proxy root as "swapped",
+                                            the reason by skipped proxy root as "skipped" and the time spent
+                                            in each phase as "timings", in seconds.
+        '''
+        report = {"swapped": {}, "skipped": {}, "timings": {}}
+
+        startTime = time.time()
+        roots = self._getSwapRoots(nodes, proxies=True)
+        inventory = MayaSceneInventory.getCurrent()
+        report["timings"]["plan"] = time.time() - startTime
+
+        startTime = time.time()
+        cmds.refresh(suspend=True)
+        try:
+            for root in roots:
+                fullPath = MayaProxy.getStringAttribute(root, MayaProxy.FULL_ATTRIBUTE)
+                if(fullPath is None):
+                    report["skipped"][root] = "The proxy has no full file."
+                    continue
+                newRoot, refNode = MayaProxy.toReference(root)
+                self._recordSwap(inventory, root, newRoot, referenceNode=refNode, referencePath=fullPath)
+                report["swapped"][root] = newRoot
+        finally:
+            cmds.refresh(suspend=False)
+            inventory.save()
+        report["timings"]["swap"] = time.time() - startTime
+
+        return report
+
+    def swapReferencesToProxies(self, nodes=None, proxyPath=None):
+        ''' Swap referenced assets with gpuCache proxies, keeping their transform and metadatas.
+
+        Args:
+            nodes       (list(str), optional)   : The referenced nodes, the selected ones by default.
+                                                Defaults to None.
+            proxyPath   (str,       optional)   : The alembic of the proxies, the one of their previous proxy by default.
+                                                Defaults to None.
+
+        Returns:
+            dict                                : The report with the new proxy root by reference root as "swapped",
+                                                the reason by skipped reference root as "skipped" and the time spent
+                                                in each phase as "timings", in seconds.
+        '''
+        report = {"swapped": {}, "skipped": {}, "timings": {}}
+
+        startTime = time.time()
+        roots = self._getSwapRoots(nodes, proxies=False)
+        inventory = MayaSceneInventory.getCurrent()
+        report["timings"]["plan"] = time.time() - startTime
+
+        startTime = time.time()
+        cmds.refresh(suspend=True)
+        try:
+            for root in roots:
+                if(not (proxyPath or MayaProxy.getStringAttribute(root, MayaProxy.PROXY_ATTRIBUTE))):
+                    report["skipped"][root] = "No proxy file for the asset."
+                    continue
+                newRoot = MayaProxy.toProxy(root, proxyPath=proxyPath)
+                self._recordSwap(inventory, root, newRoot)
+                report["swapped"][root] = newRoot
+        finally:
+            cmds.refresh(suspend=False)
+            inventory.save()
+        report["timings"]["swap"] = time.time() - startTime
+
+        return report
+
+    def swapSelectedProxiesToReferences(self):
+        ''' Swap the selected proxies with references of their full file.
+
+        Returns:
+            dict    : The swap report, see :func:`swapProxiesToReferences`.
+        '''
+        report = self.swapProxiesToReferences()
+        for root, reason in report["skipped"].items():
+            print("WARNING : The proxy '%s' is not swapped. %s" % (root, reason))
+        return report
+
+    def swapSelectedReferencesToProxies(self, proxyPath=None):
+        ''' Swap the selected referenced assets with gpuCache proxies.
+
+        Args:
+            proxyPath   (str,   optional)   : The alembic of the proxies, the one of their previous proxy by default.
+                                            Defaults to None.
+
+        Returns:
+            dict                            : The swap report, see :func:`swapReferencesToProxies`.
+        '''
+        report = self.swapReferencesToProxies(proxyPath=proxyPath)
+        for root, reason in report["skipped"].items():
+            print("WARNING : The asset '%s' is not swapped. %s" % (root, reason))
+        return report
+
     def importAsReferenceWithoutNamespace(self, name, path, sg_publish_data):
         ''' Import the file as reference without namespace.
 
@@ -74,24 +339,27 @@ class LoadTools(object):
             :class:`MayaObject`         : The new object instance.
         '''
         # Check if the file exists on disk.
-        if not os.path.exists(path):
+        if not PathResolver.get().exists(path):
             raise Exception("File not found on disk - '%s'" % path)
 
-        # Get the last instance number.
-        lastInstanceNumber = self.getLastInstanceNumber(name)
-        # Create the instance name.
-        instanceName = '{NAME}_{INSTANCE:03d}_WN'.format(NAME=name, INSTANCE=lastInstanceNumber + 1)
+        # Reserve the next instance number and create the instance name.
+        instanceNumber, instanceName = self.instanceRegistry.allocate(name, suffix="_WN")
 
         # Import the file as reference.
-        nodes = cmds.file(
-            path,
-            reference               = True,
-            loadReferenceDepth      = 'all',
-            mergeNamespacesOnClash  = False,
-            namespace               = ':',
-            referenceNode           = '{}RN'.format(instanceName),
-            returnNewNodes          = True
-        )
+        try:
+            nodes = cmds.file(
+                path,
+                reference               = True,
+                loadReferenceDepth      = 'all',
+                mergeNamespacesOnClash  = False,
+                namespace               = ':',
+                referenceNode           = '{}RN'.format(instanceName),
+                returnNewNodes          = True
+            )
+        except:
+            # The instance number is not used.
+            self.instanceRegistry.release(name, instanceNumber)
+            raise
 
         # Get the root nodes.
         rootNodes = [node for node in nodes if 
@@ -103,6 +371,10 @@ class LoadTools(object):
         mayaObject = MayaObject(root=rootNodes[0])
         mayaObject.sgMetadatas = sg_publish_data
 
+        # Record the new instance in the registry and the scene inventory.
+        self.instanceRegistry.setRoot(instanceName, mayaObject.fullname)
+        self.recordImport(mayaObject, name, instanceNumber, path, referenced=True)
+
         # Return the Maya object.
         return mayaObject
 
@@ -118,12 +390,12 @@ class LoadTools(object):
             :class:`MayaObject`         : The new object.
         '''
         # Check if the file exists on disk.
-        if not os.path.exists(path):
+        if not PathResolver.get().exists(path):
             raise Exception("File not found on disk - '%s'" % path)
 
-        # Import the file.
+        # Import the file, from the local cache when available.
         nodes = cmds.file(
-            path,
+            self.resolvePublishPath(path),
             i=True,
             type="mayaAscii",
             returnNewNodes=True
@@ -139,16 +411,402 @@ class LoadTools(object):
         mayaObject = MayaObject(root=rootNodes[0])
         mayaObject.sgMetadatas = sg_publish_data
 
+        # Record the object in the scene inventory.
+        self.recordImport(mayaObject, name, None, path, referenced=False)
+
         return mayaObject
 
-    def importAssetAsStandin(self, assetName, path):
-        pass
+    def recordImport(self, mayaObject, name, instance, path, referenced=True, referenceNode=None, save=True):
+        ''' Record an imported object in the scene inventory.
+
+        Args:
+            mayaObject      (:class:`MayaObject`)   : The imported object.
+            name            (str)                   : The entity name.
+            instance        (int)                   : The instance number, None if the object is not instanced.
+            path            (str)                   : The imported file.
+            referenced      (bool,  optional)       : If True, the object is referenced.
+                                                    Defaults to True.
+            referenceNode   (str,   optional)       : The reference node, queried if not given.
+                                                    Defaults to None.
+            save            (bool,  optional)       : If True, the inventory is saved.
+                                                    Defaults to True.
+        '''
+        if(referenced and referenceNode is None):
+            referenceNode = mayaObject.referenceNode
+
+        inventory = MayaSceneInventory.getCurrent()
+        inventory.addObject(
+            mayaObject,
+            name,
+            instance        = instance,
+            referenceNode   = referenceNode if referenced else None,
+            referencePath   = path if referenced else None
+        )
+        if(save):
+            inventory.save()
+
+    def importAsReferences(self, items, withoutNamespace=False, loadMode=LOAD_ALL):
+        ''' Import many files as references in one pass.
+        The instance numbers are reserved together and the references are created deferred,
+        then all loaded with the viewport refresh suspended.
+
+        Args:
+            items               (list(tuple))       : The (name, path, sg_publish_data) of the files to reference.
+            withoutNamespace    (bool,  optional)   : If True, the references are loaded without namespace.
+                                                    Defaults to False.
+            loadMode            (str,   optional)   : The load mode, "all", "topOnly" to defer the nested references,
+                                                    or "none" to keep the references unloaded with an anchor.
+                                                    Defaults to "all".
+
+        Return:
+            list(:class:`MayaObject`), dict         : The new object instances in the items order, None if
+                                                    the reference has no root, and the time spent in each
+                                                    phase, in seconds.
+        '''
+        timings = {}
+        startTime = time.time()
+
+        # Check all the files before changing the scene.
+        # The files of a same folder are checked with one listing.
+        pathStates = PathResolver.get().existsMany([path for _, path, _ in items])
+        missingPaths = [path for _, path, _ in items if not pathStates[path]]
+        if(missingPaths):
+            raise Exception("File(s) not found on disk - '%s'" % "', '".join(missingPaths))
+        timings["check"] = time.time() - startTime
+
+        # Reserve the instance numbers together.
+        startTime = time.time()
+        instances = []
+        for name, _, _ in items:
+            instances.append(self.instanceRegistry.allocate(name, suffix="_WN" if withoutNamespace else ""))
+        timings["allocate"] = time.time() - startTime
+
+        # Copy the files to the local cache together.
+        if(self._publishCache is not None):
+            startTime = time.time()
+            self._publishCache.prefetch([path for _, path, _ in items])
+            self._publishCache.wait()
+            timings["cache"] = time.time() - startTime
+
+        # Create the references without loading them.
+        startTime = time.time()
+        references = []
+        try:
+            for (_, path, _), (_, instanceName) in zip(items, instances):
+                if(withoutNamespace):
+                    referenceFile = cmds.file(
+                        self.resolvePublishPath(path, wait=False),
+                        reference               = True,
+                        deferReference          = True,
+                        mergeNamespacesOnClash  = False,
+                        namespace               = ':',
+                        referenceNode           = '{}RN'.format(instanceName)
+                    )
+                else:
+                    referenceFile = cmds.file(
+                        self.resolvePublishPath(path, wait=False),
+                        reference               = True,
+                        deferReference          = True,
+                        mergeNamespacesOnClash  = False,
+                        namespace               = instanceName
+                    )
+                references.append(cmds.referenceQuery(referenceFile, referenceNode=True))
+        except:
+            # Remove the references already created, they are not loaded yet.
+            for refNode in references:
+                cmds.file(referenceNode=refNode, removeReference=True)
+            # Release all the instance numbers.
+            for (name, _, _), (instanceNumber, _) in zip(items, instances):
+                self.instanceRegistry.release(name, instanceNumber)
+            raise
+        timings["create"] = time.time() - startTime
+
+        # Load all the references with the viewport refresh suspended.
+        startTime = time.time()
+        newNodes = []
+        if(loadMode != LOAD_NONE):
+            cmds.refresh(suspend=True)
+            try:
+                for refNode in references:
+                    newNodes.append(cmds.file(loadReference=refNode, loadReferenceDepth=loadMode, returnNewNodes=True) or [])
+            finally:
+                cmds.refresh(suspend=False)
+        timings["load"] = time.time() - startTime
+
+        # Find the roots from the returned paths.
+        startTime = time.time()
+        assemblies = None
+        rootNodes = []
+        if(loadMode == LOAD_NONE):
+            # The unloaded references are represented by their anchor.
+            for (_, instanceName), refNode in zip(instances, references):
+                rootNodes.append(MayaReferenceLoader.createAnchor(instanceName, refNode))
+        for nodes in newNodes:
+            roots = [node for node in nodes if node.startswith("|") and DagPath.get(node).depth == 1]
+            if(not roots):
+                # The paths are not full paths, compare them with the top nodes of the scene.
+                if(assemblies is None):
+                    assemblies = set(cmds.ls(assemblies=True, long=True) or [])
+                roots = [node for node in cmds.ls(nodes, long=True) or [] if node in assemblies]
+            rootNodes.append(roots[0] if roots else None)
+        timings["roots"] = time.time() - startTime
+
+        # Set the shotgrid metadatas and record the instances.
+        startTime = time.time()
+        mayaObjects = []
+        for (name, path, sg_publish_data), (instanceNumber, instanceName), refNode, root in zip(items, instances, references, rootNodes):
+            if(root is None):
+                print("WARNING : No root found for the reference '%s'." % refNode)
+                mayaObjects.append(None)
+                continue
+            mayaObject = MayaObject(root=root)
+            if(sg_publish_data is not None):
+                mayaObject.sgMetadatas = sg_publish_data
+            self.instanceRegistry.setRoot(instanceName, root)
+            self.recordImport(mayaObject, name, instanceNumber, path, referenceNode=refNode, save=False)
+            mayaObjects.append(mayaObject)
+        MayaSceneInventory.getCurrent().save()
+        timings["metadatas"] = time.time() - startTime
+
+        return mayaObjects, timings
+
+    def loadDeferredReferences(self, refNodes, depth=LOAD_ALL):
+        ''' Load deferred references with the viewport refresh suspended.
+
+        Args:
+            refNodes    (list(str))         : The reference nodes.
+            depth       (str,   optional)   : The load depth, "all" or "topOnly".
+                                            Defaults to "all".
+
+        Returns:
+            list(:class:`MayaObject`), dict : The loaded objects and the time spent in each phase, in seconds.
+        '''
+        roots, timings = MayaReferenceLoader.loadReferences(refNodes, depth=depth)
+        mayaObjects = [MayaObject(root=roots[refNode], readOnly=True) for refNode in refNodes if roots[refNode]]
+        return mayaObjects, timings
+
+    def loadDeferredBySelection(self, depth=LOAD_ALL):
+        ''' Load the deferred references of the selected anchors and top only references.
+
+        Args:
+            depth   (str,   optional)   : The load depth, "all" or "topOnly".
+                                        Defaults to "all".
+
+        Returns:
+            list(:class:`MayaObject`), dict : The loaded objects and the time spent in each phase, in seconds.
+        '''
+        return self.loadDeferredReferences(MayaReferenceLoader.getSelectedReferences(), depth=depth)
+
+    def loadDeferredByAssetName(self, assetName, depth=LOAD_ALL):
+        ''' Load the deferred references of an asset.
+
+        Args:
+            assetName   (str)               : The asset name.
+            depth       (str,   optional)   : The load depth, "all" or "topOnly".
+                                            Defaults to "all".
+
+        Returns:
+            list(:class:`MayaObject`), dict : The loaded objects and the time spent in each phase, in seconds.
+        '''
+        return self.loadDeferredReferences(MayaReferenceLoader.getAssetReferences(assetName), depth=depth)
+
+    def loadDeferredByCamera(self, camera, startFrame, endFrame, maxDistance=None, margin=0.1, depth=LOAD_ALL):
+        ''' Load the deferred references seen by a camera over a frame range.
+
+        Args:
+            camera      (str)               : The camera transform.
+            startFrame  (float)             : The first frame.
+            endFrame    (float)             : The last frame.
+            maxDistance (float, optional)   : The maximum distance from the camera, None for no limit.
+                                            Defaults to None.
+            margin      (float, optional)   : The extra angle of view, as a ratio, for the assets partly in view.
+                                            Defaults to 0.1.
+            depth       (str,   optional)   : The load depth, "all" or "topOnly".
+                                            Defaults to "all".
+
+        Returns:
+            list(:class:`MayaObject`), dict : The loaded objects and the time spent in each phase, in seconds.
+        '''
+        startTime = time.time()
+        refNodes = MayaReferenceLoader.getCameraReferences(
+            camera,
+            startFrame,
+            endFrame,
+            maxDistance = maxDistance,
+            margin      = margin
+        )
+        cullTime = time.time() - startTime
+
+        mayaObjects, timings = self.loadDeferredReferences(refNodes, depth=depth)
+        timings["cull"] = cullTime
+        return mayaObjects, timings
+
+    def importAssetAsStandin(self, assetName, path, sg_publish_data=None):
+        ''' Import the file as an Arnold standin, named and tagged like a reference.
+        The standin is not expanded, the file is only read at render time.
+
+        Args:
+            assetName           (str)               : The asset name.
+            path                (str)               : The file of the standin, ass or usd.
+            sg_publish_data     (dict,  optional)   : The shotgrid publish data.
+                                                    Defaults to None.
+
+        Return:
+            :class:`MayaAsset`                      : The new standin instance.
+        '''
+        # Check if the file exists on disk.
+        if not PathResolver.get().exists(path):
+            raise Exception("File not found on disk - '%s'" % path)
+
+        if(not cmds.pluginInfo("mtoa", query=True, loaded=True)):
+            cmds.loadPlugin("mtoa", quiet=True)
+
+        # Reserve the next instance number and create the instance name.
+        instanceNumber, instanceName = self.instanceRegistry.allocate(assetName)
+
+        try:
+            if(not cmds.namespace(exists=":%s" % instanceName)):
+                cmds.namespace(add=instanceName, parent=":")
+            root = cmds.createNode("transform", name="%s:%s_RIG" % (instanceName, assetName), skipSelect=True)
+            standin = cmds.createNode("aiStandIn", name="%s:%s_RIGShape" % (instanceName, assetName), parent=root, skipSelect=True)
+            # The published file is used, the render farm can not read the local cache.
+            cmds.setAttr("%s.dso" % standin, path, type="string")
+        except:
+            # The instance number is not used.
+            self.instanceRegistry.release(assetName, instanceNumber)
+            raise
+
+        # Get the Maya asset and set the shotgrid metadata.
+        asset = MayaAsset(assetRoot=cmds.ls(root, long=True)[0])
+        asset.standin = True
+        if(sg_publish_data is not None):
+            asset.sgMetadatas = sg_publish_data
+
+        # Record the new instance in the registry and the scene inventory.
+        self.instanceRegistry.setRoot(instanceName, asset.fullname)
+        self.recordImport(asset, assetName, instanceNumber, path, referenced=False)
 
-    def importAssetRig(self, assetName, rigResolution, path):
-        pass
+        return asset
+
+    def importAssetRig(self, assetName, rigResolution, path, sg_publish_data=None):
+        ''' Import the rig of an asset at a resolution as reference.
+        The lower resolutions are used when the resolution is not published.
+
+        Args:
+            assetName       (str)               : The asset name.
+            rigResolution   (str)               : The rig resolution, "high", "mid" or "low".
+            path            (str)               : A published rig of the asset.
+            sg_publish_data (dict,  optional)   : The shotgrid publish data.
+                                                Defaults to None.
+
+        Return:
+            :class:`MayaObject`                 : The new object instance.
+        '''
+        switcher = MayaLODSwitcher()
+        rigResolution = switcher.getLODName(rigResolution)
+        lods = switcher.LODS[switcher.LODS.index(rigResolution):] if rigResolution in switcher.LODS else [rigResolution]
+        rigPath, _ = switcher.resolve(path, lods)
+        if(rigPath is None):
+            raise Exception("No '%s' rig found for the file - '%s'" % (rigResolution, path))
+
+        return self.importAsReference(assetName, rigPath, sg_publish_data)
 
     def replaceAssetRig(self, assetName, rigResolution, path):
-        pass
+        ''' Switch all the instances of an asset to a rig resolution in one pass.
+
+        Args:
+            assetName       (str)   : The asset name.
+            rigResolution   (str)   : The rig resolution, "high", "mid" or "low".
+            path            (str)   : A published rig of the asset, giving the version to load.
+
+        Returns:
+            dict                    : The switch report, see :func:`MayaLODSwitcher.reload`.
+        '''
+        switcher = MayaLODSwitcher()
+        rigPath, _ = switcher.resolve(path, [rigResolution])
+        if(rigPath is None):
+            raise Exception("No '%s' rig found for the file - '%s'" % (rigResolution, path))
+
+        # Get the reference node of each instance.
+        references = []
+        for asset in self.getAssetInstances(assetName):
+            refNode = asset.referenceNode
+            if(refNode and refNode not in references):
+                references.append(refNode)
+
+        report = switcher.reload(dict((refNode, rigPath) for refNode in references), resolve=self.resolvePublishPath)
+
+        # Update the reference files in the scene inventory.
+        inventory = MayaSceneInventory.getExisting()
+        if(inventory is not None and report["switched"]):
+            for refNode, switchedPath in report["switched"].items():
+                inventory.setReferencePath(refNode, switchedPath)
+            inventory.save()
+
+        return report
+
+    def replaceAssetsReference(self, assetName, path, nodes=None):
+        ''' Replace the reference file of asset instances in one pass.
+        The instances are grouped by reference node, the structure of each referenced file is
+        validated once, and the references are reloaded with the viewport refresh suspended.
+
+        Args:
+            assetName   (str)                   : The name of the asset instances to replace.
+            path        (str)                   : The new path for the asset instances reference.
+            nodes       (list(str), optional)   : The asset roots, the selected transforms by default.
+                                                Defaults to None.
+
+        Returns:
+            dict                                : The report with the "replaced" file by reference node, the "skipped"
+                                                reference nodes already on the file, the "invalid" roots with the reason
+                                                and the time spent in each phase as "timings", in seconds.
+        '''
+        if not PathResolver.get().exists(path):
+            raise Exception("File not found on disk - '%s'" % path)
+
+        if(nodes is None):
+            nodes = cmds.ls(selection=True, type="transform", long=True) or []
+        else:
+            nodes = cmds.ls(nodes, type="transform", long=True) or []
+
+        startTime = time.time()
+        invalid     = {}
+        references  = {}
+        # The validation result by referenced file, the instances of a file share its structure.
+        structures  = {}
+        for node in nodes:
+            if(DagPath.get(node).assetName != assetName):
+                invalid[node] = "The object is not an instance of '%s'." % assetName
+                continue
+            if(not cmds.referenceQuery(node, isNodeReferenced=True)):
+                invalid[node] = "The object is not referenced."
+                continue
+            refNode = cmds.referenceQuery(node, referenceNode=True)
+            if(refNode in references):
+                continue
+
+            currentPath = MayaLODSwitcher.getReferencePath(refNode)
+            if(currentPath not in structures):
+                structures[currentPath] = MayaAsset(assetRoot=node, readOnly=True).isValid()
+            if(not structures[currentPath]):
+                invalid[node] = "The object is not a valid asset."
+                continue
+            references[refNode] = path
+        validateTime = time.time() - startTime
+
+        report = MayaLODSwitcher.reload(references, resolve=self.resolvePublishPath)
+        report["replaced"]  = report.pop("switched")
+        report["invalid"]   = invalid
+        report["timings"]["validate"] = validateTime
+
+        # Update the reference files in the scene inventory.
+        inventory = MayaSceneInventory.getExisting()
+        if(inventory is not None and report["replaced"]):
+            for refNode, replacedPath in report["replaced"].items():
+                inventory.setReferencePath(refNode, replacedPath)
+            inventory.save()
+
+        return report
 
     def replaceSelectedAssetsReference(self, assetName, path):
         ''' Select the asset reference then replace the reference file with the new one.
@@ -156,20 +814,24 @@ class LoadTools(object):
         Args:
             assetName   (str)   : The name of the asset instance to replace.
             path        (str)   : The new path for the asset instance reference.
+
+        Returns:
+            dict                : The replace report, see :func:`replaceAssetsReference`.
         '''
         # Get the current selected asset.
-        selection = cmds.ls(sl=True, type="transform")
-        if(len(selection) > 0):
-            for sel in selection:
-                print(sel)
-                asset = MayaAsset(assetRoot=sel)
-                if(asset.isValid() and asset.name == assetName and asset.isReferenced()):
-                    asset.referencePath = path
-                else:
-                    print("WARNING : The current selected object '%s' is not a valid referenced asset." % sel)
-        else:
+        selection = cmds.ls(sl=True, type="transform", long=True)
+        if(not selection):
             raise TypeError()
 
+        report = self.replaceAssetsReference(assetName, path, nodes=selection)
+        for node in report["invalid"]:
+            print("WARNING : The current selected object '%s' is not a valid referenced asset." % node)
+        return report
+
+    @property
+    def instanceRegistry(self):
+        return MayaInstanceRegistry.get()
+
     def getAssetInstances(self, assetName):
         ''' Get the instances of the asset.
 
@@ -177,9 +839,9 @@ class LoadTools(object):
             assetName (str): The asset name.
 
         Returns:
-            list(str): The asset's instances.
+            list(:class:`MayaAsset`): The asset's instances, sorted by instance number.
         '''
-        return [MayaAsset(assetRoot=asset) for asset in cmds.ls(type="transform") if asset.find(":") != -1 and asset.split(":")[0].split("_")[0] == assetName]
+        return [MayaAsset(assetRoot=root, readOnly=True) for root in self.instanceRegistry.getRoots(assetName)]
 
     def getAssetLastInstances(self, assetName):
         ''' Get the last asset instance.
@@ -190,18 +852,12 @@ class LoadTools(object):
         Returns:
             :class:`MayaAsset`: The last asset instance.
         '''
-        instanceNumber  = 0
-        lastInstance    = None
-
-        for asset in self.getAssetInstances(assetName):
-            if(asset.instance >= instanceNumber):
-                instanceNumber  = asset.instance
-                lastInstance    = asset
-
-        return lastInstance
+        instances = self.getAssetInstances(assetName)
+        return instances[-1] if instances else None
 
     def getInstancesByName(self, name):
         ''' Get the instances using the name.
+        The namespaces and the references nodes are taken into account, as we can load references without namespaces.
 
         Args:
             name    (str)   : The name to look for.
@@ -209,22 +865,7 @@ class LoadTools(object):
         Returns:
             list(str)       : A list of the instance names.
         '''
-        # This will take into account the namespaces and the references nodes
-        # as we can load references without namespaces.
-
-        # Filter the namespaces to keep only the ones with the same name.
-        instances = [ns for ns in cmds.namespaceInfo(listOnlyNamespaces=True) if ns.startswith(name + '_')]
-        # Filter the references nodes to keep only the ones with the same name.
-        references = [ref for ref in cmds.ls(type='reference') if ref.startswith(name + '_')]
-        # Merge the two lists.
-        for refNode in references:
-            # Get the name without the RN tag.
-            refName = refNode.replace('RN', '')
-            # Check if the reference node is not already in the instances list.
-            if(refName not in instances):
-                instances.append(refName)
-
-        return instances
+        return self.instanceRegistry.getInstanceNames(name)
 
     def getLastInstanceNumber(self, name):
         ''' Get the last instance number of the asset.
@@ -235,11 +876,44 @@ class LoadTools(object):
         Returns:
             int             : The last instance number.
         '''
-        # Get the instances.
-        instances = self.getInstancesByName(name)
-        # Get the last instance number.
-        lastInstanceNumber = 0
-        if(instances):
-            lastInstanceNumber = max([int(ns.split('_')[-1]) for ns in instances])
+        return self.instanceRegistry.getLastInstanceNumber(name)
 
-        return lastInstanceNumber
\ No newline at end of file
+    def renumberAssetInstances(self, assetName):
+        ''' Renumber the referenced instances of an asset from 1, keeping their order.
+        The new namespaces are checked before renaming, and all the references are renamed in one pass.
+        The reference nodes keep their name.
+
+        Args:
+            assetName   (str)   : The asset name.
+
+        Returns:
+            dict(str, str), dict    : The new namespace by old namespace and the time spent in each phase, in seconds.
+        '''
+        referenceIndex = MayaReferenceIndex()
+
+        # Get the instances namespaces with their number.
+        instances = []
+        for namespace in referenceIndex.getChildNamespaces(""):
+            splitName = namespace.rsplit("_", 1)
+            if(splitName[0] == assetName and len(splitName) == 2 and splitName[1].isdigit()):
+                instances.append((int(splitName[1]), namespace))
+        instances.sort()
+
+        # Plan the new instance numbers.
+        plan = MayaRenamePlan(chunkName="P3D renumber instances")
+        renames = {}
+        for index, (_, namespace) in enumerate(instances):
+            newNamespace = '{NAME}_{INSTANCE:03d}'.format(NAME=assetName, INSTANCE=index + 1)
+            plan.addReferenceNamespace(
+                referenceIndex.getNamespaceReference(namespace),
+                namespace,
+                newNamespace
+            )
+            renames[namespace] = newNamespace
+
+        timings = plan.apply()
+        MayaSceneInventory.notifyRenamePlan(plan)
+        # The instance names have changed.
+        self.instanceRegistry.invalidate()
+
+        return renames, timings
@@ -0,0 +1,221 @@
+try:
+    from    maya import cmds
+    import  maya.api.OpenMaya as om
+except:
+    pass
+
+
+class MayaAnimation(object):
+    ''' Batched animation detection for the assets.
+    The anim curves connected to the controllers of all the assets are listed in one
+    listConnections call, the controllers driven through anim layers or pair blends are
+    followed upstream by batches of blend nodes. The results are cached by asset and
+    controller mode, and the cache is cleared by the Maya callbacks when a connection
+    changes or a scene is opened.
+    '''
+
+    # The controller end tag.
+    CONTROLLER_TAG = "_CON"
+    # The node types between the anim curves and the controllers.
+    BLEND_TYPES = ["animBlendNodeBase", "pairBlend"]
+
+    # The animated state by (asset root full path, use of the controller tags).
+    _cache      = {}
+    # The callbacks clearing the cache.
+    _callbacks  = []
+
+    @classmethod
+    def clearCache(cls, *args):
+        ''' Clear the cached results.
+        '''
+        cls._cache = {}
+
+    # CALLBACKS
+
+    @classmethod
+    def installCallbacks(cls):
+        ''' Install the callbacks clearing the cache.
+        A curve added, deleted or reconnected always changes a connection.
+        '''
+        if(cls._callbacks):
+            return
+
+        cls._callbacks.append(om.MDGMessage.addConnectionCallback(cls.clearCache))
+        cls._callbacks.append(om.MSceneMessage.addCallback(om.MSceneMessage.kAfterOpen, cls.clearCache))
+        cls._callbacks.append(om.MSceneMessage.addCallback(om.MSceneMessage.kAfterNew, cls.clearCache))
+        cls._callbacks.append(om.MSceneMessage.addCallback(om.MSceneMessage.kAfterLoadReference, cls.clearCache))
+        cls._callbacks.append(om.MSceneMessage.addCallback(om.MSceneMessage.kAfterUnloadReference, cls.clearCache))
+
+    @classmethod
+    def removeCallbacks(cls):
+        ''' Remove the callbacks, the cache is cleared as it can no longer be trusted.
+        '''
+        if(cls._callbacks):
+            om.MMessage.removeCallbacks(cls._callbacks)
+        cls._callbacks = []
+        cls.clearCache()
+
+    @classmethod
+    def getControllers(cls, asset):
+        ''' Get the controllers of the asset, found by their end tag under the rig group.
+
+        Args:
+            asset   (:class:`MayaAsset`)    : The asset.
+
+        Returns:
+            list(str)                       : The controllers full paths.
+        '''
+        groupRig = asset.groupRig
+        if(not groupRig):
+            return []
+
+        return [node for node in asset.hierarchy.getDescendants(groupRig)
+            if node.endswith(cls.CONTROLLER_TAG)
+        ]
+
+    @classmethod
+    def getTaggedControllers(cls):
+        ''' Get the objects tagged as controller in the scene.
+
+        Returns:
+            list(str)   : The controllers full paths.
+        '''
+        tags = cmds.ls(type="controller") or []
+        if(not tags):
+            return []
+
+        objects = cmds.listConnections(
+            ["%s.controllerObject" % tag for tag in tags],
+            source      = True,
+            destination = False
+        ) or []
+
+        return cmds.ls(objects, long=True) or []
+
+    @classmethod
+    def getAnimatedAssets(cls, assets, useControllerTags=True):
+        ''' Check if the assets are animated.
+        An asset is animated if one of its controllers is driven by an anim curve, directly or through blend nodes.
+
+        Args:
+            assets              (list(:class:`MayaAsset`))  : The assets to check.
+            useControllerTags   (bool,  optional)           : If True, the objects tagged as controller
+                                                            are checked with the _CON transforms.
+                                                            Defaults to True.
+
+        Returns:
+            dict(str, bool)                                 : The animated state by asset root full path.
+        '''
+        # The cache is only kept while the callbacks watch the scene.
+        cls.installCallbacks()
+
+        roots   = dict((asset.hierarchy.root, asset) for asset in assets)
+        pending = [root for root in roots if (root, useControllerTags) not in cls._cache]
+        if(pending):
+            states = cls._getAnimatedStates([roots[root] for root in pending], useControllerTags)
+            for root, state in states.items():
+                cls._cache[(root, useControllerTags)] = state
+
+        return dict((root, cls._cache[(root, useControllerTags)]) for root in roots)
+
+    @classmethod
+    def _listInputs(cls, nodes, nodeType):
+        ''' List the input connections of the nodes from a node type, in one call.
+
+        Args:
+            nodes       (list(str)) : The nodes.
+            nodeType    (str)       : The type of the input nodes, the inherited types are included.
+
+        Returns:
+            list(tuple(str, str))   : The (node, input node) pairs, as named by Maya.
+        '''
+        connections = cmds.listConnections(
+            nodes,
+            source      = True,
+            destination = False,
+            type        = nodeType,
+            connections = True
+        ) or []
+
+        return [(plug.partition(".")[0], source) for plug, source in zip(connections[0::2], connections[1::2])]
+
+    @classmethod
+    def _getAnimatedStates(cls, assets, useControllerTags):
+        ''' Find the animated assets.
+
+        Args:
+            assets              (list(:class:`MayaAsset`))  : The assets to check.
+            useControllerTags   (bool)                      : If True, check the objects tagged as controller.
+
+        Returns:
+            dict(str, bool)                                 : The animated state by asset root full path.
+        '''
+        states = dict((asset.hierarchy.root, False) for asset in assets)
+
+        # Gather the controllers of all the assets.
+        controllers = {}
+        for asset in assets:
+            for controller in cls.getControllers(asset):
+                controllers[controller] = asset.hierarchy.root
+
+        # Add the tagged controllers to the asset containing them.
+        if(useControllerTags):
+            for controller in cls.getTaggedControllers():
+                parent = controller
+                while(parent):
+                    if(parent in states):
+                        controllers[controller] = parent
+                        break
+                    parent = parent.rpartition("|")[0]
+
+        if(not controllers):
+            return states
+
+        byShortName = {}
+        for controller, root in controllers.items():
+            byShortName.setdefault(controller.rpartition("|")[2], []).append((controller, root))
+
+        def getRoots(node):
+            # Maya gives the shortest unique name of the node.
+            return [root for controller, root in byShortName.get(node.rpartition("|")[2], [])
+                if controller == node or controller.endswith("|" + node) or node.find("|") == -1
+            ]
+
+        # List the anim curves of all the controllers in one call.
+        for node, _ in cls._listInputs(list(controllers), "animCurve"):
+            for root in getRoots(node):
+                states[root] = True
+
+        # The controllers of the other assets can be driven through blend nodes.
+        pending = [controller for controller, root in controllers.items() if not states[root]]
+        if(not pending):
+            return states
+
+        # The asset roots by blend node.
+        blends = {}
+        for nodeType in cls.BLEND_TYPES:
+            for node, blend in cls._listInputs(pending, nodeType):
+                blends.setdefault(blend, set()).update(getRoots(node))
+
+        # Walk upstream through the blend nodes, the anim layers are chained.
+        visited = set(blends)
+        while(blends):
+            blends = dict((blend, roots) for blend, roots in blends.items()
+                if not all(states[root] for root in roots)
+            )
+            if(not blends):
+                break
+
+            for blend, _ in cls._listInputs(list(blends), "animCurve"):
+                for root in blends.get(blend, []):
+                    states[root] = True
+
+            upstream = {}
+            for nodeType in cls.BLEND_TYPES:
+                for blend, source in cls._listInputs(list(blends), nodeType):
+                    if(source not in visited and blend in blends):
+                        visited.add(source)
+                        upstream.setdefault(source, set()).update(blends[blend])
+            blends = upstream
+
+        return states
@@ -1,18 +1,48 @@
 
 try:
     from    maya import cmds
-    import  json
 except:
     pass
 
+from .dagPath              import DagPath
+from .mayaHierarchy        import MayaHierarchy
+from .mayaDagApi           import MayaDagApi, BACKEND_CMDS, BACKEND_API, STANDIN_TYPES
+from .mayaMetadatas        import MayaMetadatas
+from .mayaReferenceIndex   import MayaReferenceIndex
+from .mayaInventory        import MayaSceneInventory
+from .mayaRename           import MayaRenamePlan
+from .mayaLODSwitcher      import MayaLODSwitcher
+from .mayaAnimation        import MayaAnimation
+from .mayaDeformation      import MayaDeformation
 
-class MayaAsset(object):
 
-    def __init__(self, assetRoot=""):
+class MayaAsset(object):
 
-        self._root = assetRoot
+    def __init__(self, assetRoot="", readOnly=False):
+        ''' Initialize the asset.
 
-        self.addMetadatas()
+        Args:
+            assetRoot   (str,   optional)   : The root transform of the asset, a path or a :class:`DagPath`.
+                                            Defaults to "".
+            readOnly    (bool,  optional)   : If True, the scene is not modified when the asset is created.
+                                            The metadatas attribute is created on the first write.
+                                            Defaults to False.
+        '''
+        self._root      = str(assetRoot)
+        self._readOnly  = readOnly
+        # The decoded metadatas, read on first access.
+        self._metadatas = MayaMetadatas(self._root)
+        # The hierarchy snapshot, built on first access.
+        self._hierarchy = None
+        # The scene reference index, built on first access.
+        self._referenceIndex = None
+        # The deformation analyses by backend, built on first access.
+        self._deformation = {}
+        # The standin state, queried when unknown.
+        self._standin = None
+
+        if(not readOnly):
+            self.addMetadatas()
 
     def __eq__(self, other):
         return self._root == other._root
@@ -34,47 +64,69 @@ class MayaAsset(object):
         Returns:
             list    : The list of namespaces.
         '''
-        # Get the all the asset child transforms.
-        assetDatas = cmds.listRelatives(self._root, allDescendents=True, type="transform")
-
-        # Store all the namespaces in a list.
+        # Store all the namespaces in a list, the set is used to skip the duplicates.
         assetNamespaces = []
-        for element in assetDatas:
-            # Check if the name contains a namespace>
-            if(element.find(":") != -1):
-                # Split the name and the namespace.
-                namespace = element.split(":")[0]
+        seen            = set()
+        for element in self.hierarchy.nodes:
+            # Get the element root namespace.
+            namespace = DagPath.get(element).rootNamespace
+            # Check if the name contains a namespace.
+            if(namespace):
                 # Check if the namespace is not already in the list.
-                if not(namespace in assetNamespaces):
+                if(namespace not in seen):
                     # Add the namespace to the list.
+                    seen.add(namespace)
                     assetNamespaces.append(namespace)
 
         # Return the list of namespaces.
         return assetNamespaces
 
-    def freezeNamespace(self):
-        ''' Include the namespace in the object naming.
+    def getFreezeNamespacePlan(self):
+        ''' Get the rename plan including the namespace in the object naming.
+
+        Returns:
+            :class:`MayaRenamePlan` : The rename plan, it can be reverted once applied.
         '''
         # Get the all namespaces in the current asset.
         allNamespaces = self.getAssetNamespaces()
+        # Get all the objects in the namespaces.
+        # Use the full path to avoid errors if two objects have the same name.
+        npObjects = []
+        for np in allNamespaces:
+            npObjects.extend(cmds.namespaceInfo(np, listNamespace=True, dagPath=True) or [])
+
+        # Replace the : by a _ in all the names.
+        return MayaRenamePlan.fromMapping(
+            npObjects,
+            lambda shortName : shortName.replace(":", "_"),
+            chunkName = "P3D freeze namespace"
+        )
+
+    def freezeNamespace(self):
+        ''' Include the namespace in the object naming.
+        All the names are computed first and the objects are renamed in one pass.
+
+        Returns:
+            dict    : The time spent in each phase of the rename, in seconds.
+        '''
         # Set the current namespace to root.
         cmds.namespace(setNamespace=":")
-        # Loop over the asset to merge the namespace with the object name.
-        for np in allNamespaces:
-            # Get all the objects in the namespace.
-            # Use the full path to avoid errors if two objects have the same name.
-            npObjects = cmds.namespaceInfo(np, listNamespace=True, dagPath=True)
-            # Reorder the objects by path length, to have the farthest objects renamed first.
-            # This will avoid errors where Maya can no longer find an object because
-            # an element in the path has changed.
-            npObjects.sort(key = lambda x : len(x.split('|')) , reverse = True)
-            # Loop over the objects and rename them.
-            for obj in npObjects:
-                # Get the shortname.
-                shortName = obj.split("|")[-1]
-                # Replace the : by a _.
-                newName = shortName.replace(":", "_")
-                cmds.rename(obj, newName)
+        plan = self.getFreezeNamespacePlan()
+        timings = plan.apply()
+        MayaSceneInventory.notifyRenamePlan(plan)
+
+        # The asset nodes have been renamed.
+        self.invalidateHierarchy()
+
+        return timings
+
+    def invalidateHierarchy(self):
+        ''' Drop the hierarchy snapshot and the cached analysis of the asset.
+        Must be called after any operation that modify the asset hierarchy.
+        '''
+        self._hierarchy         = None
+        self._referenceIndex    = None
+        self._deformation       = {}
 
     def asNameSpace(self):
         ''' Check if the asset is name a namespace.
@@ -87,12 +139,23 @@ class MayaAsset(object):
         '''
         return cmds.referenceQuery(self._root, isNodeReferenced=True)
 
-    def isStandin(self):
+    def isStandin(self, backend=BACKEND_CMDS):
         ''' Check if the asset is standin type.
+
+        Args:
+            backend (str,   optional)   : The scene access backend, "cmds" or "api".
+                                        Defaults to "cmds".
         '''
-        shapes = cmds.listRelatives(self._root, shapes=True, fullPath=True)
+        # The state is known when the asset comes from an environment walk.
+        if(self._standin is not None):
+            return self._standin
+
+        if(backend == BACKEND_API):
+            return MayaDagApi.getShapeType(self._root) in STANDIN_TYPES
+
+        shapes = cmds.listRelatives(self._root, shapes=True, fullPath=True) or []
         if(len(shapes)):
-            if(cmds.nodeType(shapes[0]) == "standin"):
+            if(cmds.nodeType(shapes[0]) in STANDIN_TYPES):
                 return True
 
         return False
@@ -127,57 +190,84 @@ class MayaAsset(object):
         Returns:
             str: The group full path.
         '''
+        # The parent group can be missing.
+        if(parent is None):
+            return None
+
+        # Resolve the group from the hierarchy snapshot.
+        hierarchy = self.hierarchy
+        if(hierarchy.contains(parent)):
+            return hierarchy.getChild(parent, groupName)
+
         subGroups = cmds.listRelatives(parent, allDescendents=False, type="transform", fullPath=True) or []
 
         for group in subGroups:
-            # Get the group short name.
-            groupShortName = group.split("|")[-1]
-            # Remove the namespace.
-            groupShortName = groupShortName.split(":")[-1]
-            # Check if the group name is the same.
-            if(groupShortName == groupName):
+            # Check if the group name without namespace is the same.
+            if(DagPath.get(group).name == groupName):
                 return group
         
         return None
 
-    def getChildReferences(self):
+    def getChildren(self, parent):
+        ''' Get the direct child transforms of the parent object.
+
+        Args:
+            parent  (str)   : The parent of the children.
+
+        Returns:
+            list(str)       : The children full paths.
+        '''
+        # The parent group can be missing.
+        if(parent is None):
+            return []
+
+        # Resolve the children from the hierarchy snapshot.
+        hierarchy = self.hierarchy
+        if(hierarchy.contains(parent)):
+            return hierarchy.getChildren(parent)
+
+        return cmds.listRelatives(parent, children=True, fullPath=True, type="transform") or []
+
+    def getChildReferences(self, backend=BACKEND_CMDS):
         ''' Get all the references contained in the current asset.
         For instance, the modules for the rig.
 
+        Args:
+            backend (str,   optional)   : The scene access backend, "cmds" or "api".
+                                        Defaults to "cmds".
+
         Returns:
             list    : The list of references.
         '''
+        if(backend == BACKEND_API):
+            return MayaDagApi.getChildReferences(self._root)
+
         # Get the all the asset child transforms.
-        assetDatas = cmds.listRelatives(self._root, allDescendents=True, type="transform", fullPath=True)
-
-        # Store all the referenceNodes in a list.
-        referencesNodes = []
-        for element in assetDatas:
-            # Check if the element if referenced.
-            if( cmds.referenceQuery(element, isNodeReferenced=True) ):
-                # Get the reference node.
-                refNode = cmds.referenceQuery(element, referenceNode=True)
-                # Check if the reference node is not already in the list.
-                if(not refNode in referencesNodes):
-                    # Add the reference node to the list.
-                    referencesNodes.append(refNode)
-                
-        # Return the list of references.
-        return referencesNodes
-
-    def getBuffers(self, parentGroup, relativePath=False):
+        assetDatas = self.hierarchy.nodes
+
+        # Get the distinct reference nodes from the scene reference index.
+        return self.referenceIndex.getReferenceNodes(assetDatas)
+
+    def getBuffers(self, parentGroup, relativePath=False, backend=BACKEND_CMDS):
         ''' Get all the buffers contained in the current group.
 
         Args:
             parentGroup     (str)               : The parent group of the buffers.
             relativePath    (bool,  optional)   : If True, the path will be relative to the parent group.
                                                 Defaults to False.
+            backend         (str,   optional)   : The scene access backend, "cmds" or "api".
+                                                Defaults to "cmds".
 
         Returns:
             list                                : The list of buffers with.
         '''
         # Get the all the asset child transforms.
-        assetDatas = cmds.listRelatives(parentGroup, allDescendents=True, type="transform", fullPath=True)
+        if(backend == BACKEND_API):
+            assetDatas = MayaDagApi.getTransformsBySuffix(parentGroup, "_BUF")
+        elif(self.hierarchy.contains(parentGroup)):
+            assetDatas = self.hierarchy.getDescendants(parentGroup)
+        else:
+            assetDatas = cmds.listRelatives(parentGroup, allDescendents=True, type="transform", fullPath=True)
         # List relatives can return None if there is no transform.
         if(not assetDatas):
             return []
@@ -201,6 +291,8 @@ class MayaAsset(object):
         cmds.delete(self.meshesLO)
         # Delete the low techincal group.
         cmds.delete(self.meshesTechnicalLO)
+        # The hierarchy has changed.
+        self.invalidateHierarchy()
 
     def deleteMeshesMI(self):
         ''' Delete the meshes in the middle group.
@@ -209,6 +301,8 @@ class MayaAsset(object):
         cmds.delete(self.meshesMI)
         # Delete the mid techincal group.
         cmds.delete(self.meshesTechnicalMI)
+        # The hierarchy has changed.
+        self.invalidateHierarchy()
 
     def deleteMeshesHI(self):
         ''' Delete the meshes in the middle group.
@@ -217,11 +311,15 @@ class MayaAsset(object):
         cmds.delete(self.meshesHI)
         # Delete the high techincal group.
         cmds.delete(self.meshesTechnicalHI)
+        # The hierarchy has changed.
+        self.invalidateHierarchy()
 
     def deleteMeshesTechnical(self):
         ''' Delete the meshes in the technical group.
         '''
         cmds.delete(self.meshesTechnical)
+        # The hierarchy has changed.
+        self.invalidateHierarchy()
 
     def importChildReferences(self):
         ''' Import all the references contained in the current asset.
@@ -234,6 +332,9 @@ class MayaAsset(object):
             refFile = cmds.referenceQuery(ref, filename=True)
             cmds.file(refFile, importReference=True)
 
+        # The imported nodes are no longer referenced.
+        self.invalidateHierarchy()
+
     def cleanMetadatas(self, metadatas):
         ''' Clean the shotgrid metadatas to keep only the usefull datas.
 
@@ -265,66 +366,54 @@ class MayaAsset(object):
         '''
         return cmds.keyframe(node, query=True, name=True) != None
 
-    def isAnimated(self):
+    def isAnimated(self, useControllerTags=True):
         ''' Check if the asset is animated.
+        The result is shared with the other assets through the :class:`MayaAnimation` cache.
+
+        Args:
+            useControllerTags   (bool,  optional)   : If True, the objects tagged as controller
+                                                    are checked with the _CON transforms.
+                                                    Defaults to True.
 
         Returns:
             bool: True if the node is animated, False otherwise.
         '''
-        # Get the controllers.
-        controllers = cmds.listRelatives(
-            self.groupRig,
-            allDescendents = True,
-            type='transform'
-        )
-        if(not controllers):
+        if(not self.groupRig):
             return False
-        
-        hasKey = False
-        for con in controllers:
-            # Skip if the controller is not tag as controller.
-            if(not con.endswith('_CON')):
-                continue
-            
-            # Check if the controller has keyframe.
-            if(self.hasKeyframe(con)):
-                hasKey = True
-                break
-        
-        return hasKey
 
-    def isDeformed(self):
-        ''' Check if the asset is deformed.
+        states = MayaAnimation.getAnimatedAssets([self], useControllerTags=useControllerTags)
+        return states[self.hierarchy.root]
+
+    def getDeformation(self, backend=BACKEND_CMDS):
+        ''' Get the deformation analysis of the asset.
+        The analysis of each backend is cached until the hierarchy is invalidated.
+
+        Args:
+            backend (str,   optional)   : The scene access backend, "cmds" or "api".
+                                        Defaults to "cmds".
 
         Returns:
-            bool: True if the node is deformed, False otherwise.
+            :class:`MayaDeformation`    : The deformers of the asset buffers.
         '''
+        if(backend not in self._deformation):
+            self._deformation[backend] = MayaDeformation(self, backend=backend)
+        return self._deformation[backend]
 
-        meshesGrp = []
-        if(self.groupMeshesHI):
-            meshesGrp.append(self.groupMeshesHI)
-        if(self.groupMeshesMI):
-            meshesGrp.append(self.groupMeshesMI)
-        if(self.groupMeshesLO):
-            meshesGrp.append(self.groupMeshesLO)
-
-        # Get the shapes.
-        shapes = cmds.listRelatives(
-            meshesGrp,
-            allDescendents = True,
-            type='mesh'
-        ) or []
+    def isDeformed(self, backend=BACKEND_CMDS):
+        ''' Check if the asset is deformed.
 
-        # Get the origShapes.
-        origShapes = [shape for shape in shapes if shape.endswith('ShapeOrig')]
+        Args:
+            backend (str,   optional)   : The scene access backend, "cmds" or "api".
+                                        Defaults to "cmds".
 
-        return True if len(origShapes) > 0 else False
+        Returns:
+            bool: True if the node is deformed, False otherwise.
+        '''
+        return self.getDeformation(backend=backend).isDeformed()
 
     @property
     def name(self):
-        if(self.asNameSpace()):
-            return self._root.split('|')[-1].split(":")[0].split("_")[0]
-        return self._root.split('|')[-1].split("_")[0]
+        return self.dagPath.assetName
 
     @name.setter
     def name(self, value):
@@ -339,11 +428,12 @@ class MayaAsset(object):
             splitName = self._root.split("_")
             splitName[0] = value
             cmds.rename(self._root, "_".join(splitName))
+        self.invalidateHierarchy()
 
     @property
     def instance(self):
         if(self.isReferenced()):
-            return int(self._root.split('|')[-1].split(":")[0].split("_")[1])
+            return self.dagPath.instance
         return None
 
     @instance.setter
@@ -354,6 +444,7 @@ class MayaAsset(object):
             splitName[1]        = '%3d' % value
             splitNameSpace[0]   = "_".join(splitName)
             cmds.rename(self._root, ":".join(splitNameSpace))
+        self.invalidateHierarchy()
 
     @property
     def step(self):
@@ -367,6 +458,7 @@ class MayaAsset(object):
             splitName = self._root.split("_")
             splitName[1] = value
             cmds.rename(self._root, "_".join(splitName))
+        self.invalidateHierarchy()
 
     @property
     def fullname(self):
@@ -375,6 +467,38 @@ class MayaAsset(object):
     @fullname.setter
     def fullname(self, value):
         cmds.rename(self._root, value)
+        self.invalidateHierarchy()
+
+    @property
+    def hierarchy(self):
+        if(self._hierarchy is None):
+            self._hierarchy = MayaHierarchy(self._root)
+        return self._hierarchy
+
+    @hierarchy.setter
+    def hierarchy(self, value):
+        # Allow to reuse a snapshot built from a parent hierarchy.
+        self._hierarchy = value
+
+    @property
+    def standin(self):
+        return self.isStandin()
+
+    @standin.setter
+    def standin(self, value):
+        # Allow to reuse the standin state found by a parent walk.
+        self._standin = value
+
+    @property
+    def referenceIndex(self):
+        if(self._referenceIndex is None):
+            self._referenceIndex = MayaReferenceIndex()
+        return self._referenceIndex
+
+    @referenceIndex.setter
+    def referenceIndex(self, value):
+        # Allow to share the same index between the assets of a scene.
+        self._referenceIndex = value
 
     @property
     def groupMeshes(self):
@@ -422,51 +546,35 @@ class MayaAsset(object):
 
     @property
     def meshesHI(self):
-        content = cmds.listRelatives(self.groupMeshesHI, children=True, fullPath=True, type="transform")
-        content = content if content else []
-        return content
+        return self.getChildren(self.groupMeshesHI)
 
     @property
     def meshesMI(self):
-        content = cmds.listRelatives(self.groupMeshesMI, children=True, fullPath=True, type="transform")
-        content = content if content else []
-        return content
+        return self.getChildren(self.groupMeshesMI)
 
     @property
     def meshesLO(self):
-        content = cmds.listRelatives(self.groupMeshesLO, children=True, fullPath=True, type="transform")
-        content = content if content else []
-        return content
+        return self.getChildren(self.groupMeshesLO)
 
     @property
     def meshesTechnical(self):
-        content = cmds.listRelatives(self.groupMeshesTechnical, children=True, fullPath=True, type="transform")
-        content = content if content else []
-        return content
+        return self.getChildren(self.groupMeshesTechnical)
 
     @property
     def meshesTechnicalGlobal(self):
-        content = cmds.listRelatives(self.groupMeshesTechnicalGlobal, children=True, fullPath=True, type="transform")
-        content = content if content else []
-        return content
+        return self.getChildren(self.groupMeshesTechnicalGlobal)
 
     @property
     def meshesTechnicalHI(self):
-        content = cmds.listRelatives(self.groupMeshesTechnicalHI, children=True, fullPath=True, type="transform")
-        content = content if content else []
-        return content
+        return self.getChildren(self.groupMeshesTechnicalHI)
 
     @property
     def meshesTechnicalMI(self):
-        content = cmds.listRelatives(self.groupMeshesTechnicalMI, children=True, fullPath=True, type="transform")
-        content = content if content else []
-        return content
+        return self.getChildren(self.groupMeshesTechnicalMI)
 
     @property
     def meshesTechnicalLO(self):
-        content = cmds.listRelatives(self.groupMeshesTechnicalLO, children=True, fullPath=True, type="transform")
-        content = content if content else []
-        return content
+        return self.getChildren(self.groupMeshesTechnicalLO)
 
     @property
     def referenceNode(self):
@@ -478,37 +586,66 @@ class MayaAsset(object):
     def referencePath(self):
         reference = self.referenceNode
         if(reference):
-            return cmds.referenceQuery(reference, filename=True).split("{")[0]
+            return MayaLODSwitcher.getReferencePath(reference)
         return None
     
     @referencePath.setter
     def referencePath(self, value):
         reference = self.referenceNode
         if(reference):
-            cmds.file(value, loadReference=reference, type="mayaAscii")
+            cmds.file(value, loadReference=reference, type=MayaLODSwitcher.getFileType(value))
+        self.invalidateHierarchy()
 
     @property
     def rootNamespace(self):
-        return self._root.split(":")[0] if self._root.find(":") != -1 else None
+        return self.dagPath.rootNamespace
+
+    @property
+    def dagPath(self):
+        return DagPath.get(self._root)
+
+    @property
+    def metadatasCache(self):
+        return self._metadatas
 
     @property
     def sgMetadatas(self):
-        return json.loads(cmds.getAttr("%s.sg_metadatas" % self._root))
+        # The cache returns None when the root has no metadatas.
+        return self._metadatas.read()
     
     @sgMetadatas.setter
     def sgMetadatas(self, value):
+        # Create the metadatas attribute on the first write of a read only asset.
+        if(self._readOnly):
+            self.addMetadatas()
         # Clean the metadatas.
         metadatas = self.cleanMetadatas(value)
         # Set the metadatas value.
-        cmds.setAttr("%s.sg_metadatas" % self._root, json.dumps(metadatas), type="string")
+        self._metadatas.write(metadatas)
+
+    def getSgMetadata(self, key):
+        ''' Get a value of the sg_metadatas.
+
+        Args:
+            key     (str)   : The metadata key.
+
+        Returns:
+            object          : The metadata value.
+        '''
+        metadatas = self.sgMetadatas
+        if(metadatas is None):
+            raise Exception("The asset '%s' has no sg_metadatas." % self._root)
+        if(key not in metadatas):
+            raise Exception("The sg_metadatas of the asset '%s' have no '%s'." % (self._root, key))
+        return metadatas[key]
 
     @property
     def sgCode(self):
-        return self.sgMetadatas["code"]
+        return self.getSgMetadata("code")
 
     @property
     def sgEntity(self):
-        return self.sgMetadatas["entity"]
+        return self.getSgMetadata("entity")
     
     @property
     def sgEntityName(self):
@@ -516,11 +653,11 @@ class MayaAsset(object):
     
     @property
     def sgID(self):
-        return self.sgMetadatas["id"]
+        return self.getSgMetadata("id")
 
     @property
     def sgTask(self):
-        return self.sgMetadatas["task"]
+        return self.getSgMetadata("task")
 
     @property
     def sgTaskName(self):
@@ -528,4 +665,4 @@ class MayaAsset(object):
 
     @property
     def sgVersionNumber(self):
-        return self.sgMetadatas["version_number"]
+        return self.getSgMetadata("version_number")
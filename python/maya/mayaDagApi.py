@@ -0,0 +1,372 @@
+try:
+    import maya.api.OpenMaya as om
+except:
+    pass
+
+# The scene access backends.
+BACKEND_CMDS    = "cmds"
+BACKEND_API     = "api"
+
+# The shape types of the Arnold standins.
+STANDIN_TYPES   = ["aiStandIn", "standin"]
+
+
+class MayaDagApi(object):
+    ''' Scene access functions based on the OpenMaya API 2.0.
+    The hierarchy is walked with MItDag and the nodes are manipulated as MDagPath
+    and MObjectHandle, the string paths are only built for the returned values.
+    '''
+
+    @classmethod
+    def getDagPath(cls, node):
+        ''' Get the dag path of a node.
+
+        Args:
+            node    (str)       : The node name or path.
+
+        Returns:
+            :class:`MDagPath`   : The dag path of the node.
+        '''
+        selection = om.MSelectionList()
+        selection.add(node)
+        return selection.getDagPath(0)
+
+    @classmethod
+    def getHandle(cls, node):
+        ''' Get a handle on a node that can be kept between calls.
+
+        Args:
+            node    (str)           : The node name or path.
+
+        Returns:
+            :class:`MObjectHandle`  : The handle of the node.
+        '''
+        selection = om.MSelectionList()
+        selection.add(node)
+        return om.MObjectHandle(selection.getDependNode(0))
+
+    @classmethod
+    def getDagPathFromHandle(cls, handle):
+        ''' Get the dag path of a node from its handle.
+
+        Args:
+            handle  (:class:`MObjectHandle`)    : The handle of the node.
+
+        Returns:
+            :class:`MDagPath`                   : The dag path, None if the node no longer exists.
+        '''
+        if(not handle.isValid()):
+            return None
+        return om.MDagPath.getAPathTo(handle.object())
+
+    @classmethod
+    def iterDescendants(cls, root, filterType=None):
+        ''' Iterate over the descendants of the root, depth first.
+
+        Args:
+            root        (:class:`MDagPath`)     : The root of the iteration.
+            filterType  (int,   optional)       : The MFn type of the nodes to return.
+                                                Defaults to None.
+
+        Yields:
+            :class:`MDagPath`                   : The dag path of a descendant.
+        '''
+        if(filterType is None):
+            filterType = om.MFn.kInvalid
+
+        dagIt = om.MItDag()
+        dagIt.reset(root, om.MItDag.kDepthFirst, filterType)
+        while(not dagIt.isDone()):
+            dagPath = dagIt.getPath()
+            # The iterator starts on the root itself.
+            if(not dagPath == root):
+                yield dagPath
+            dagIt.next()
+
+    @classmethod
+    def getTransformsBySuffix(cls, root, suffix):
+        ''' Get the transforms under the root with a name ending with the suffix.
+
+        Args:
+            root    (str)   : The root of the search.
+            suffix  (str)   : The end of the transform names.
+
+        Returns:
+            list(str)       : The full paths of the transforms.
+        '''
+        transforms = []
+        for dagPath in cls.iterDescendants(cls.getDagPath(root), om.MFn.kTransform):
+            # Check the node name before building the full path.
+            if(om.MFnDagNode(dagPath).name().endswith(suffix)):
+                transforms.append(dagPath.fullPathName())
+
+        return transforms
+
+    @classmethod
+    def getStandinRoots(cls, root):
+        ''' Get the transforms of the standins under the root.
+
+        Args:
+            root    (str)   : The root of the search.
+
+        Returns:
+            list(str)       : The full paths of the standin transforms.
+        '''
+        transforms = []
+        # The standins are plugin shapes.
+        for dagPath in cls.iterDescendants(cls.getDagPath(root), om.MFn.kPluginShape):
+            if(om.MFnDependencyNode(dagPath.node()).typeName in STANDIN_TYPES):
+                dagPath.pop()
+                transforms.append(dagPath.fullPathName())
+
+        return transforms
+
+    @classmethod
+    def getShapeNames(cls, roots, filterType):
+        ''' Get the short names of the shapes of a type under the roots.
+
+        Args:
+            roots       (list(str)) : The roots of the search.
+            filterType  (int)       : The MFn type of the shapes.
+
+        Returns:
+            list(str)               : The shape names.
+        '''
+        names = []
+        for root in roots:
+            for dagPath in cls.iterDescendants(cls.getDagPath(root), filterType):
+                names.append(om.MFnDagNode(dagPath).name())
+
+        return names
+
+    @classmethod
+    def getGeometryDeformers(cls, shape):
+        ''' Get the deformers in the geometry input chain of a shape.
+        The chain is followed from the shape input geometry up to the first dag node.
+
+        Args:
+            shape   (:class:`MDagPath`) : The shape.
+
+        Returns:
+            list(str)                   : The deformer types, from the shape to the original geometry.
+        '''
+        deformers = []
+        fnNode = om.MFnDependencyNode(shape.node())
+        plug = fnNode.findPlug("inMesh", False)
+        # Limit the walk in case of a cycle.
+        for _ in range(256):
+            source = plug.source()
+            if(source.isNull):
+                break
+            node = source.node()
+            # The original geometry is reached.
+            if(node.hasFn(om.MFn.kDagNode)):
+                break
+
+            fnNode = om.MFnDependencyNode(node)
+            if(node.hasFn(om.MFn.kGeometryFilt)):
+                deformers.append(fnNode.typeName)
+                # Follow the input matching the output geometry index.
+                index = source.logicalIndex() if source.isElement else 0
+                inputPlug = fnNode.findPlug("input", False).elementByLogicalIndex(index)
+                plug = inputPlug.child(fnNode.attribute("inputGeometry"))
+                continue
+
+            # Follow the geometry input of the other nodes, for instance the groupParts.
+            for attribute in ["inputGeometry", "inputPolymesh", "inMesh"]:
+                if(fnNode.hasAttribute(attribute)):
+                    plug = fnNode.findPlug(attribute, False)
+                    break
+            else:
+                break
+
+        return deformers
+
+    @classmethod
+    def getDeformedShapes(cls, roots):
+        ''' Get the deformers of the mesh shapes under the roots.
+        The intermediate shapes are skipped.
+
+        Args:
+            roots   (list(str)) : The roots of the search.
+
+        Returns:
+            dict(str, list(str)): The deformer types by deformed shape full path.
+        '''
+        shapes = {}
+        for root in roots:
+            for dagPath in cls.iterDescendants(cls.getDagPath(root), om.MFn.kMesh):
+                if(om.MFnDagNode(dagPath).isIntermediateObject):
+                    continue
+                deformers = cls.getGeometryDeformers(dagPath)
+                if(deformers):
+                    shapes[dagPath.fullPathName()] = deformers
+
+        return shapes
+
+    @classmethod
+    def getNodeType(cls, node):
+        ''' Get the type of a node.
+
+        Args:
+            node    (str)   : The node name or path.
+
+        Returns:
+            str             : The node type.
+        '''
+        selection = om.MSelectionList()
+        selection.add(node)
+        return om.MFnDependencyNode(selection.getDependNode(0)).typeName
+
+    @classmethod
+    def getShapeType(cls, node):
+        ''' Get the type of the first shape of a transform.
+
+        Args:
+            node    (str)   : The transform name or path.
+
+        Returns:
+            str             : The shape type, None if the transform has no shape.
+        '''
+        dagPath = cls.getDagPath(node)
+        for index in range(dagPath.childCount()):
+            child = dagPath.child(index)
+            if(child.hasFn(om.MFn.kShape)):
+                return om.MFnDependencyNode(child).typeName
+
+        return None
+
+    @classmethod
+    def getStringAttribute(cls, node, attribute):
+        ''' Read a string attribute of a node.
+
+        Args:
+            node        (str)   : The node name or path.
+            attribute   (str)   : The attribute name.
+
+        Returns:
+            str                 : The attribute value, None if the attribute does not exist.
+        '''
+        selection = om.MSelectionList()
+        selection.add(node)
+        fnNode = om.MFnDependencyNode(selection.getDependNode(0))
+        if(not fnNode.hasAttribute(attribute)):
+            return None
+        return fnNode.findPlug(attribute, False).asString()
+
+    @classmethod
+    def getPlug(cls, node, attribute):
+        ''' Get the plug of a node attribute.
+        The plug can be kept and read again without resolving the node name.
+
+        Args:
+            node        (str)   : The node name or path.
+            attribute   (str)   : The attribute name.
+
+        Returns:
+            :class:`MPlug`      : The plug, None if the attribute does not exist.
+        '''
+        selection = om.MSelectionList()
+        selection.add(node)
+        fnNode = om.MFnDependencyNode(selection.getDependNode(0))
+        if(not fnNode.hasAttribute(attribute)):
+            return None
+        return fnNode.findPlug(attribute, False)
+
+    @classmethod
+    def getStringAttributes(cls, nodes, attribute):
+        ''' Read a string attribute on many nodes in one pass.
+
+        Args:
+            nodes       (list(str)) : The node names or paths.
+            attribute   (str)       : The attribute name.
+
+        Returns:
+            dict(str, str)          : The attribute value by node.
+                                    The value is None if the node does not have the attribute.
+        '''
+        values      = dict.fromkeys(nodes)
+        selection   = om.MSelectionList()
+        added       = []
+        for node in nodes:
+            # Adding a plug that does not exist raises an error.
+            try:
+                selection.add("%s.%s" % (node, attribute))
+            except RuntimeError:
+                continue
+            added.append(node)
+
+        for index, node in enumerate(added):
+            values[node] = selection.getPlug(index).asString()
+
+        return values
+
+    @classmethod
+    def getReferenceMembers(cls):
+        ''' Map the nodes loaded by the references to their reference node.
+
+        The hash codes of the handles are not unique, so the handles sharing a hash code are
+        kept together and told apart with :func:`getReferenceNode`.
+
+        Returns:
+            dict(int, list)     : The (node handle, reference node name) pairs by handle hash code.
+        '''
+        members = {}
+        refIt = om.MItDependencyNodes(om.MFn.kReference)
+        while(not refIt.isDone()):
+            fnReference = om.MFnReference(refIt.thisNode())
+            # Skip the internal reference nodes and the unloaded references.
+            if(fnReference.name() != "sharedReferenceNode" and fnReference.isLoaded()):
+                refNode = fnReference.name()
+                nodes   = fnReference.nodes()
+                for index in range(len(nodes)):
+                    handle = om.MObjectHandle(nodes[index])
+                    members.setdefault(handle.hashCode(), []).append((handle, refNode))
+            refIt.next()
+
+        return members
+
+    @classmethod
+    def getReferenceNode(cls, members, node):
+        ''' Get the reference node of a node from the reference members.
+
+        Args:
+            members (dict(int, list))   : The reference members, see :func:`getReferenceMembers`.
+            node    (:class:`MObject`)  : The node.
+
+        Returns:
+            str                         : The reference node name, None if the node is not a member.
+        '''
+        handle = om.MObjectHandle(node)
+        for member, refNode in members.get(handle.hashCode(), []):
+            if(member == handle):
+                return refNode
+        return None
+
+    @classmethod
+    def getChildReferences(cls, root):
+        ''' Get the reference nodes of the transforms under the root.
+
+        Args:
+            root    (str)   : The root of the search.
+
+        Returns:
+            list(str)       : The reference nodes, in hierarchy order.
+        '''
+        members = None
+        references = []
+        seen = set()
+        for dagPath in cls.iterDescendants(cls.getDagPath(root), om.MFn.kTransform):
+            node = dagPath.node()
+            # Skip the nodes created in the current scene.
+            if(not om.MFnDependencyNode(node).isFromReferencedFile):
+                continue
+            # Only map the references when a referenced node is found.
+            if(members is None):
+                members = cls.getReferenceMembers()
+            refNode = cls.getReferenceNode(members, node)
+            if(refNode and refNode not in seen):
+                seen.add(refNode)
+                references.append(refNode)
+
+        return references
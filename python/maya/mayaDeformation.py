@@ -0,0 +1,127 @@
+try:
+    from    maya import cmds
+except:
+    pass
+
+from .mayaDagApi import MayaDagApi, BACKEND_CMDS, BACKEND_API
+
+
+class MayaDeformation(object):
+    ''' Deformers of the buffers of an asset.
+    The geometryFilter nodes are found in the history of all the asset meshes at once,
+    then each deformer gives the shapes it deforms. It does not rely on the shape names.
+    '''
+
+    # The end tag of the buffers.
+    BUFFER_TAG = "_BUF"
+
+    def __init__(self, asset, backend=BACKEND_CMDS):
+        ''' Analyse the deformations of the asset.
+
+        Args:
+            asset   (:class:`MayaAsset`)    : The asset to analyse.
+            backend (str,   optional)       : The scene access backend, "cmds" or "api".
+                                            Defaults to "cmds".
+        '''
+        # The deformer types by deformed buffer.
+        self._buffers = {}
+
+        # Get the LOD groups.
+        groups = [group for group in [asset.groupMeshesHI, asset.groupMeshesMI, asset.groupMeshesLO] if group]
+        if(not groups):
+            return
+
+        if(backend == BACKEND_API):
+            shapes = MayaDagApi.getDeformedShapes(groups)
+        else:
+            shapes = self.getDeformedShapes(groups)
+
+        for shape, deformers in shapes.items():
+            buffer = self.getShapeBuffer(shape)
+            self._buffers.setdefault(buffer, set()).update(deformers)
+
+    @classmethod
+    def getDeformedShapes(cls, groups):
+        ''' Get the deformers of the mesh shapes under the groups.
+
+        Args:
+            groups  (list(str)) : The groups to analyse.
+
+        Returns:
+            dict(str, list(str)): The deformer types by deformed shape full path.
+        '''
+        # Get the visible shapes, the intermediate shapes are the deformers input.
+        shapes = cmds.listRelatives(
+            groups,
+            allDescendents  = True,
+            type            = "mesh",
+            fullPath        = True,
+            noIntermediate  = True
+        ) or []
+        if(not shapes):
+            return {}
+
+        # Get the deformers in the history of all the shapes in one call.
+        history = cmds.listHistory(shapes, pruneDagObjects=True) or []
+        # Get the deformers with their type, as a flat list of name and type.
+        deformers = cmds.ls(history, type="geometryFilter", showType=True) or []
+        if(not deformers):
+            return {}
+
+        # Index the shapes by short name to match the names returned by Maya.
+        byShortName = {}
+        for shape in shapes:
+            byShortName.setdefault(shape.rpartition("|")[2], []).append(shape)
+
+        deformedShapes = {}
+        for deformer, deformerType in zip(deformers[0::2], deformers[1::2]):
+            geometries = cmds.deformer(deformer, query=True, geometry=True) or []
+            for geometry in geometries:
+                for shape in byShortName.get(geometry.rpartition("|")[2], []):
+                    if(shape == geometry or shape.endswith("|" + geometry) or geometry.find("|") == -1):
+                        deformedShapes.setdefault(shape, []).append(deformerType)
+
+        return deformedShapes
+
+    @classmethod
+    def getShapeBuffer(cls, shape):
+        ''' Get the buffer of a shape, the closest parent ending with the buffer tag.
+        If there is no buffer, the transform of the shape is returned.
+
+        Args:
+            shape   (str)   : The shape full path.
+
+        Returns:
+            str             : The buffer full path.
+        '''
+        transform = shape.rpartition("|")[0]
+        parent = transform
+        while(parent):
+            if(parent.endswith(cls.BUFFER_TAG)):
+                return parent
+            parent = parent.rpartition("|")[0]
+
+        return transform
+
+    def isDeformed(self):
+        ''' Check if one of the buffers is deformed.
+
+        Returns:
+            bool    : True if a buffer is deformed, otherwise False.
+        '''
+        return len(self._buffers) > 0
+
+    def getDeformerTypes(self, buffer):
+        ''' Get the types of the deformers of a buffer.
+
+        Args:
+            buffer  (str)   : The buffer full path.
+
+        Returns:
+            list(str)       : The deformer types.
+        '''
+        return sorted(self._buffers.get(buffer, []))
+
+    @property
+    def buffers(self):
+        return sorted(self._buffers)
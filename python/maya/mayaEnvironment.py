@@ -1,9 +1,12 @@
 from .mayaObject    import MayaObject
 from .mayaAsset     import MayaAsset
+from .mayaDagApi    import MayaDagApi, BACKEND_CMDS, BACKEND_API, STANDIN_TYPES
+from .mayaEnvironmentAnalysis   import MayaEnvironmentAnalysis
 
 try:
     from    maya import cmds
     import  json
+    import  maya.api.OpenMaya as om
 except:
     pass
 
@@ -11,6 +14,15 @@ except:
 class MayaEnvironment(MayaObject):
     ''' Object representing an environment in Maya.'''
 
+    # The analysis of the environment assets, shared by the publish hooks.
+    _analysis           = None
+    # The scene generation of the analysis.
+    _analysisGeneration = None
+    # The scene generation, increased by the callbacks when the analyses can no longer be trusted.
+    _generation         = 0
+    # The callbacks increasing the scene generation.
+    _callbacks          = []
+
     def isValid(self):
         return self.groupMeshes
 
@@ -38,21 +50,78 @@ class MayaEnvironment(MayaObject):
         
         return None
 
-    def getAssets(self):
+    def getStandinRoots(self, backend=BACKEND_CMDS):
+        ''' Get the transforms of the standins in the environment.
+
+        Args:
+            backend (str,   optional)   : The scene access backend, "cmds" or "api".
+                                        Defaults to "cmds".
+
+        Returns:
+            set(str)                    : The full paths of the standin transforms.
+        '''
+        groupMeshes = self.groupMeshes
+        if(not groupMeshes):
+            return set()
+
+        if(backend == BACKEND_API):
+            return set(MayaDagApi.getStandinRoots(groupMeshes))
+
+        # Only the standin types of the loaded plugins can be queried.
+        nodeTypes = set(cmds.allNodeTypes() or [])
+        standinTypes = [nodeType for nodeType in STANDIN_TYPES if nodeType in nodeTypes]
+        if(not standinTypes):
+            return set()
+
+        shapes = cmds.listRelatives(groupMeshes, allDescendents=True, type=standinTypes, fullPath=True) or []
+        return set(shape.rpartition("|")[0] for shape in shapes)
+
+    @classmethod
+    def isUnderStandin(cls, transform, standinRoots):
+        ''' Check if a transform is under a standin.
+
+        Args:
+            transform       (str)       : The transform full path.
+            standinRoots    (set(str))  : The standin transforms.
+
+        Returns:
+            bool                        : True if a parent of the transform is a standin.
+        '''
+        parent = transform.rpartition("|")[0]
+        while(parent):
+            if(parent in standinRoots):
+                return True
+            parent = parent.rpartition("|")[0]
+        return False
+
+    def getAssets(self, backend=BACKEND_CMDS):
         ''' Get the assets in the environment.
-        
+        The standin assets are returned as they are, their content is never expanded.
+
+        Args:
+            backend (str,   optional)   : The scene access backend, "cmds" or "api".
+                                        Defaults to "cmds".
+
         Returns:
             list(:class:`MayaAsset`)    : The assets in the environment.
         '''
         # Get the content of the environment.
-        content = cmds.listRelatives(self.groupMeshes, allDescendents=True, type="transform", fullPath=True) or []
+        if(backend == BACKEND_API):
+            content = MayaDagApi.getTransformsBySuffix(self.groupMeshes, "_RIG")
+        else:
+            content = cmds.listRelatives(self.groupMeshes, allDescendents=True, type="transform", fullPath=True) or []
+        standinRoots = self.getStandinRoots(backend=backend)
 
         # Loop over the content and get the assets.
         assets = []
         for transform in content:
             # Check the end tag.
             if(transform.endswith("_RIG")):
-                asset = MayaAsset(transform)
+                # Skip the content of the standins.
+                if(standinRoots and self.isUnderStandin(transform, standinRoots)):
+                    continue
+                asset = MayaAsset(transform, readOnly=True)
+                asset.standin = transform in standinRoots
                 assets.append(asset)
 
         # Return the assets.
@@ -65,8 +134,12 @@ class MayaEnvironment(MayaObject):
             asset (:class:`MayaAsset`)  : The asset to get the main buffers.
         
         Returns:
-            list(str)   : The main buffers of the asset.
+            list(str)   : The main buffers of the asset, the standin transform for a standin.
         '''
+        # The standins have no buffers, their transform is published to keep their placement.
+        if(asset.isStandin()):
+            return [asset.fullname]
+
         # Get the direct children of the asset.
         # Get the highest level of the asset in priority.
         buffers = []
@@ -82,22 +155,70 @@ class MayaEnvironment(MayaObject):
         # Return the buffers.
         return buffers
 
+    # CALLBACKS
+
+    @classmethod
+    def clearAnalyses(cls, *args):
+        ''' Drop the analyses of all the environments, they are made again on the next call.
+        '''
+        MayaEnvironment._generation += 1
+
+    @classmethod
+    def installCallbacks(cls):
+        ''' Install the callbacks dropping the analyses.
+        The same scene changes as :class:`MayaAnimation`, with the renamed, imported and deleted nodes.
+        '''
+        if(MayaEnvironment._callbacks):
+            return
+
+        MayaEnvironment._callbacks = [
+            om.MDGMessage.addConnectionCallback(cls.clearAnalyses),
+            om.MDGMessage.addNodeAddedCallback(cls.clearAnalyses),
+            om.MDGMessage.addNodeRemovedCallback(cls.clearAnalyses),
+            om.MEventMessage.addEventCallback("NameChanged", cls.clearAnalyses),
+            om.MSceneMessage.addCallback(om.MSceneMessage.kAfterOpen, cls.clearAnalyses),
+            om.MSceneMessage.addCallback(om.MSceneMessage.kAfterNew, cls.clearAnalyses),
+            om.MSceneMessage.addCallback(om.MSceneMessage.kAfterLoadReference, cls.clearAnalyses),
+            om.MSceneMessage.addCallback(om.MSceneMessage.kAfterUnloadReference, cls.clearAnalyses)
+        ]
+
+    @classmethod
+    def removeCallbacks(cls):
+        ''' Remove the callbacks, the analyses are dropped as they can no longer be trusted.
+        '''
+        if(MayaEnvironment._callbacks):
+            om.MMessage.removeCallbacks(MayaEnvironment._callbacks)
+        MayaEnvironment._callbacks = []
+        cls.clearAnalyses()
+
+    # ANALYSIS
+
+    def getAnalysis(self, refresh=False):
+        ''' Get the analysis of the assets in the environment.
+        The analysis is kept on the environment to be reused by the next calls, until the scene changes.
+
+        Args:
+            refresh (bool,  optional)   : If True, a new analysis is made.
+                                        Defaults to False.
+
+        Returns:
+            :class:`MayaEnvironmentAnalysis`    : The analysis of the environment.
+        '''
+        # The analysis is only kept while the callbacks watch the scene.
+        self.installCallbacks()
+
+        if(refresh or self._analysis is None or self._analysisGeneration != MayaEnvironment._generation):
+            self._analysis = MayaEnvironmentAnalysis(self)
+            self._analysisGeneration = MayaEnvironment._generation
+        return self._analysis
+
     def getAllAssetsMainBuffers(self):
         ''' Get all the main buffers of the assets in the environment.
         
         Returns:
             list(str)   : The main buffers of the assets in the environment.
         '''
-        # Get the assets.
-        assets = self.getAssets()
-
-        # Get the main buffers of the assets.
-        buffers = []
-        for asset in assets:
-            buffers.extend(self.getAssetMainBuffers(asset))
-
-        # Return the buffers.
-        return buffers
+        return self.getAnalysis().mainBuffers
 
     def getAnimation(self, animated=True, deformed=True):
         ''' Get the animation of the environment.
@@ -111,23 +232,13 @@ class MayaEnvironment(MayaObject):
         Returns:
             list, list                      : The animated and deformed list of object.
         '''
-        # Get the assets.
-        assets = self.getAssets()
+        # Get the analysis of the assets.
+        analysis = self.getAnalysis()
 
         # Get the animation of the assets.
-        animatedAssets = []
-        deformedAssets = []
-        for asset in assets:
-            
-            if(deformed):
-                # The asset must be deformed.
-                if(asset.isDeformed()):
-                    deformedAssets.append(asset)
-            
-            if(animated):
-                # The asset must have animation without being deformed.
-                if(asset.isAnimated() and not asset.isDeformed()):
-                    animatedAssets.append(asset)
+        # The animated assets are not deformed.
+        animatedAssets = analysis.animatedAssets if animated else []
+        deformedAssets = analysis.deformedAssets if deformed else []
 
         # Return the animation.
         return animatedAssets, deformedAssets
@@ -0,0 +1,186 @@
+from .mayaAsset         import MayaAsset
+from .mayaHierarchy     import MayaHierarchy
+from .mayaAnimation     import MayaAnimation
+
+
+class MayaAssetAnalysis(object):
+    ''' Result of the analysis of an asset in an environment.'''
+
+    def __init__(self, asset, mainBuffers, animated, deformed):
+        ''' Initialize the result.
+
+        Args:
+            asset       (:class:`MayaAsset`)    : The analysed asset.
+            mainBuffers (list(str))             : The main buffers of the asset.
+            animated    (bool)                  : True if the asset controllers are animated.
+            deformed    (bool)                  : True if the asset buffers are deformed.
+        '''
+        self.asset          = asset
+        self.mainBuffers    = mainBuffers
+        self.animated       = animated
+        self.deformed       = deformed
+
+    @property
+    def static(self):
+        return not self.animated and not self.deformed
+
+
+class MayaEnvironmentAnalysis(object):
+    ''' Analysis of the assets of an environment.
+    The meshes group is walked once, each asset gets its hierarchy snapshot from that walk,
+    and the animation of the assets is checked by chunks. The results are computed together
+    and kept, so the environment publish hooks of a session can share them.
+    '''
+
+    def __init__(self, environment, chunkSize=200):
+        ''' Initialize the analysis.
+
+        Args:
+            environment (:class:`MayaEnvironment`)  : The environment to analyse.
+            chunkSize   (int,   optional)           : The number of assets checked together for the animation.
+                                                    Defaults to 200.
+        '''
+        self._environment   = environment
+        self._chunkSize     = chunkSize
+        # The results, set once all the assets are analysed.
+        self._results       = None
+        # The results by asset root.
+        self._byRoot        = {}
+
+    def getAssets(self):
+        ''' Get the assets of the environment from a single walk of the meshes group.
+        The assets are created with their hierarchy snapshot.
+
+        Returns:
+            list(:class:`MayaAsset`)    : The assets of the environment.
+        '''
+        groupMeshes = self._environment.groupMeshes
+        if(not groupMeshes):
+            return []
+
+        # Walk the meshes group once.
+        hierarchy = MayaHierarchy(groupMeshes)
+
+        standinRoots = self._environment.getStandinRoots()
+
+        assets = []
+        for transform in hierarchy.nodes:
+            # Check the end tag.
+            if(transform.endswith("_RIG")):
+                # Skip the content of the standins.
+                if(standinRoots and self._environment.isUnderStandin(transform, standinRoots)):
+                    continue
+                asset = MayaAsset(transform, readOnly=True)
+                asset.standin = transform in standinRoots
+                if(asset.standin):
+                    # The standin is not expanded.
+                    asset.hierarchy = MayaHierarchy(transform, [])
+                else:
+                    # The asset descendants are a range of the environment walk.
+                    # MayaHierarchy expects them in the listRelatives order.
+                    descendants = hierarchy.getDescendants(transform)
+                    descendants.reverse()
+                    asset.hierarchy = MayaHierarchy(transform, descendants)
+                assets.append(asset)
+
+        return assets
+
+    def iterAssets(self):
+        ''' Iterate over the analysed assets.
+        The assets are analysed while iterating, by chunks, and the results are kept
+        once the iteration is complete.
+
+        Yields:
+            :class:`MayaAssetAnalysis`  : The analysis of an asset.
+        '''
+        if(self._results is not None):
+            for result in self._results:
+                yield result
+            return
+
+        assets  = self.getAssets()
+        results = []
+        for index in range(0, len(assets), self._chunkSize):
+            chunk = assets[index:index + self._chunkSize]
+            # Check the animation of the chunk at once.
+            animatedStates = MayaAnimation.getAnimatedAssets(chunk)
+
+            for asset in chunk:
+                # The standins have no buffers to deform.
+                deformed = not asset.standin and asset.isDeformed()
+                result = MayaAssetAnalysis(
+                    asset,
+                    self._environment.getAssetMainBuffers(asset),
+                    # An asset with a deformation is published as deformed.
+                    animatedStates[asset.hierarchy.root] and not deformed,
+                    deformed
+                )
+                self._byRoot[asset.fullname] = result
+                results.append(result)
+                yield result
+
+        self._results = results
+
+    def analyse(self):
+        ''' Analyse all the assets of the environment.
+
+        Returns:
+            list(:class:`MayaAssetAnalysis`)    : The analysis of the assets.
+        '''
+        if(self._results is None):
+            for _ in self.iterAssets():
+                pass
+        return list(self._results)
+
+    def getAssetAnalysis(self, asset):
+        ''' Get the analysis of an asset of the environment.
+
+        Args:
+            asset   (:class:`MayaAsset`)    : The asset.
+
+        Returns:
+            :class:`MayaAssetAnalysis`      : The analysis, None if the asset is not in the environment.
+        '''
+        self.analyse()
+        return self._byRoot.get(asset.fullname)
+
+    def getMainBuffers(self, asset):
+        ''' Get the main buffers of an asset, from the analysis when available.
+
+        Args:
+            asset   (:class:`MayaAsset`)    : The asset.
+
+        Returns:
+            list(str)                       : The main buffers of the asset.
+        '''
+        result = self.getAssetAnalysis(asset)
+        if(result is None):
+            return self._environment.getAssetMainBuffers(asset)
+        return result.mainBuffers
+
+    @property
+    def assets(self):
+        return [result.asset for result in self.analyse()]
+
+    @property
+    def staticAssets(self):
+        return [result.asset for result in self.analyse() if result.static]
+
+    @property
+    def animatedAssets(self):
+        return [result.asset for result in self.analyse() if result.animated]
+
+    @property
+    def deformedAssets(self):
+        return [result.asset for result in self.analyse() if result.deformed]
+
+    @property
+    def standinAssets(self):
+        return [result.asset for result in self.analyse() if result.asset.standin]
+
+    @property
+    def mainBuffers(self):
+        buffers = []
+        for result in self.analyse():
+            buffers.extend(result.mainBuffers)
+        return buffers
@@ -0,0 +1,217 @@
+try:
+    from    maya import cmds
+except:
+    pass
+
+import  os
+import  sys
+
+from ..utils    import ExportPool, PathResolver
+
+
+class MayaExportBackend(object):
+    ''' Run the publish exports in a pool of headless mayapy processes.
+    A snapshot of the scene is saved before any scene mutation of the publish, then the
+    independent exports are sent to the workers, which open the snapshot and run the export
+    with the publish tools. The exports are submitted up front, then the results are collected
+    back into the publish items, with :func:`wait` for one export or :func:`collect` for all of them.
+    '''
+
+    # The worker script run by mayapy.
+    WORKER_SCRIPT   = os.path.join(os.path.dirname(os.path.abspath(__file__)), "exportWorker.py")
+
+    def __init__(self, poolSize=None, timeout=3600.0, retries=1, executable=None, workerScript=None, logFolder=None):
+        ''' Initialize the backend.
+
+        Args:
+            poolSize        (int,   optional)   : The number of worker processes, the number of cores minus one by default.
+                                                Defaults to None.
+            timeout         (float, optional)   : The maximum time of an export, in seconds.
+                                                Defaults to 3600.
+            retries         (int,   optional)   : The number of attempts after a failed export.
+                                                Defaults to 1.
+            executable      (str,   optional)   : The interpreter of the workers, mayapy by default.
+                                                Defaults to None.
+            workerScript    (str,   optional)   : The worker script, the framework one by default.
+                                                Defaults to None.
+            logFolder       (str,   optional)   : The folder of the snapshot, job files and logs, a temporary folder by default.
+                                                Defaults to None.
+        '''
+        self._pool = ExportPool(
+            executable or self.getMayapy(),
+            workerScript or self.WORKER_SCRIPT,
+            poolSize    = poolSize,
+            timeout     = timeout,
+            retries     = retries,
+            logFolder   = logFolder
+        )
+        self._snapshot  = None
+        # The jobs in progress with their publish item.
+        self._jobs      = []
+        # The jobs in progress by output file.
+        self._outputs   = {}
+
+    @classmethod
+    def getMayapy(cls):
+        ''' Get the mayapy executable of the running Maya.
+
+        Returns:
+            str     : The mayapy path.
+        '''
+        name = "mayapy.exe" if sys.platform == "win32" else "mayapy"
+        folders = [os.path.dirname(sys.executable)]
+        if(os.environ.get("MAYA_LOCATION")):
+            folders.append(os.path.join(os.environ["MAYA_LOCATION"], "bin"))
+        for folder in folders:
+            path = os.path.join(folder, name)
+            if(PathResolver.get().isFile(path)):
+                return path
+        return name
+
+    # SNAPSHOT
+
+    def saveSnapshot(self):
+        ''' Save the current scene state for the workers, without changing the scene file.
+        It must be called before any scene mutation of the publish, the workers would export it.
+
+        Returns:
+            str     : The snapshot path.
+        '''
+        self._snapshot = os.path.join(self._pool.logFolder, "snapshot.ma")
+        cmds.file(self._snapshot, force=True, exportAll=True, type="mayaAscii", preserveReferences=True)
+        return self._snapshot
+
+    # JOBS
+
+    def submit(self, item, jobType, args):
+        ''' Send an export to the workers, they open the snapshot saved by :func:`saveSnapshot`.
+        An export with a "path" argument can be found back with :func:`getExport`.
+
+        Args:
+            item    (sgUIItem)  : The publish item getting the result, can be None.
+            jobType (str)       : The job type, "mayaSelection", "mayaAssetLOD", "alembics" or "materialX".
+            args    (dict)      : The arguments of the export.
+
+        Returns:
+            Future              : The export in progress.
+        '''
+        if(self._snapshot is None):
+            raise Exception("No snapshot of the scene for the '%s' export, save it before the publish mutations." % jobType)
+        future = self._pool.submit(jobType, args, scene=self._snapshot)
+        self._jobs.append((item, future))
+        if(args.get("path")):
+            self._outputs[PathResolver.normalize(args["path"])] = future
+        return future
+
+    def getExport(self, path):
+        ''' Get the export in progress writing a file.
+
+        Args:
+            path    (str)   : The output file.
+
+        Returns:
+            Future          : The export in progress, None if the file is not exported.
+        '''
+        return self._outputs.get(PathResolver.normalize(path))
+
+    def submitMayaAssetLOD(self, item, asset, lod, path):
+        ''' Export a LOD of the asset as maya scene, see :func:`PublishTools.exportMayaAssetLOD`.
+        '''
+        return self.submit(item, "mayaAssetLOD", {"root": asset.fullname, "lod": lod, "path": path})
+
+    def submitMayaSelection(self, item, nodes, path):
+        ''' Export nodes as maya scene, see :func:`PublishTools.exportMayaSelection`.
+        '''
+        return self.submit(item, "mayaSelection", {"nodes": list(nodes), "path": path})
+
+    def submitAlembics(self, item, jobs, exportABCVersion=1):
+        ''' Export alembic files in one command, see :func:`PublishTools.exportAlembics`.
+        '''
+        return self.submit(item, "alembics", {"jobs": jobs, "exportABCVersion": exportABCVersion})
+
+    def submitMaterialX(self, item, asset, lookName, path, lod):
+        ''' Export the material X of a LOD of the asset, see :func:`PublishTools.exportMaterialX`.
+        '''
+        return self.submit(item, "materialX", {"root": asset.fullname, "lookName": lookName, "path": path, "lod": lod})
+
+    def _collectJob(self, item, future):
+        ''' Wait for an export and store its result in the "exportResults" property of its item.
+
+        Args:
+            item    (sgUIItem)  : The publish item getting the result, can be None.
+            future  (Future)    : The export in progress.
+
+        Returns:
+            dict                : The result, with the error of a failed export.
+        '''
+        try:
+            result = future.result()
+        except Exception as e:
+            result = {"status": "error", "error": str(e)}
+        if(item is not None):
+            item.properties.setdefault("exportResults", []).append(result)
+        # The outputs are new files.
+        for output in result.get("outputs", []):
+            PathResolver.get().invalidate(output)
+        return result
+
+    def wait(self, future, raiseOnError=True):
+        ''' Wait for an export, so its files exist before the publish registers them.
+
+        Args:
+            future          (Future)            : The export in progress, returned by :func:`submit`.
+            raiseOnError    (bool,  optional)   : If True, an exception is raised if the export failed.
+                                                Defaults to True.
+
+        Returns:
+            dict                                : The result, with the error of a failed export.
+        '''
+        job = next((job for job in self._jobs if job[1] is future), (None, future))
+        if(job in self._jobs):
+            self._jobs.remove(job)
+        self._outputs = dict((path, other) for path, other in self._outputs.items() if other is not future)
+        result = self._collectJob(*job)
+
+        if(result["status"] != "ok" and raiseOnError):
+            raise Exception("The export failed:\n%s" % result["error"])
+        return result
+
+    def collect(self, raiseOnError=True):
+        ''' Wait for the exports and store their result in the "exportResults" property of their item.
+
+        Args:
+            raiseOnError    (bool,  optional)   : If True, an exception listing the failed exports is raised.
+                                                Defaults to True.
+
+        Returns:
+            list(dict)                          : The results, with the error of the failed exports.
+        '''
+        results = []
+        errors  = []
+        for item, future in self._jobs:
+            result = self._collectJob(item, future)
+            if(result["status"] != "ok"):
+                errors.append(result["error"])
+            results.append(result)
+        self._jobs      = []
+        self._outputs   = {}
+
+        if(errors and raiseOnError):
+            raise Exception("%d export(s) failed:\n%s" % (len(errors), "\n".join(errors)))
+        return results
+
+    def shutdown(self):
+        ''' Wait for the exports in progress, stop the workers and remove the snapshot.
+        '''
+        self._pool.shutdown(wait=True)
+        if(self._snapshot and os.path.isfile(self._snapshot)):
+            os.remove(self._snapshot)
+        self._snapshot = None
+
+    @property
+    def snapshot(self):
+        return self._snapshot
+
+    @property
+    def logFolder(self):
+        return self._pool.logFolder
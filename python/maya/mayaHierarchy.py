@@ -0,0 +1,171 @@
+try:
+    from    maya import cmds
+except:
+    pass
+
+
+class MayaHierarchy(object):
+    ''' In-memory snapshot of the transform hierarchy under a root.
+    The snapshot is built from a single listRelatives call and answers
+    the group, children and descendants queries without going back to Maya.
+    It is not updated automatically, the owner must drop it after modifying the scene.
+    '''
+
+    def __init__(self, root, descendants=None):
+        ''' Initialize the snapshot.
+
+        Args:
+            root        (str)                   : The root transform of the hierarchy.
+            descendants (list(str), optional)   : The full paths of the transforms under the root.
+                                                If None, they are queried from the scene.
+                                                Defaults to None.
+        '''
+        self._input = root
+
+        # Get all the descendant transforms in one call.
+        if(descendants is None):
+            descendants = cmds.listRelatives(
+                root,
+                allDescendents  = True,
+                type            = "transform",
+                fullPath        = True
+            ) or []
+
+        # Get the root full path.
+        self._root = self._getRootFullPath(root, descendants)
+
+        # listRelatives returns the descendants deepest first.
+        # Reverse the list to get the children in their outliner order.
+        self._children  = {self._root: []}
+        self._groups    = {}
+        for path in reversed(descendants):
+            parent, _, shortName = path.rpartition("|")
+            self._children.setdefault(parent, []).append(path)
+            self._children.setdefault(path, [])
+            # Index the node by its parent and its name without namespace.
+            # Keep the first node found, as getGroup did.
+            key = (parent, shortName.rpartition(":")[2])
+            if(key not in self._groups):
+                self._groups[key] = path
+
+        # Flatten the hierarchy depth first, so each subtree is a contiguous range.
+        self._nodes     = []
+        self._ranges    = {}
+        self._flatten()
+
+    def _getRootFullPath(self, root, descendants):
+        ''' Get the root full path without querying the scene when possible.
+
+        Args:
+            root        (str)       : The root transform of the hierarchy.
+            descendants (list(str)) : The full paths of the transforms under the root.
+
+        Returns:
+            str                     : The root full path.
+        '''
+        if(root.startswith("|")):
+            return root
+        # The shallowest descendant is a direct child of the root.
+        if(descendants):
+            child = min(descendants, key=lambda x : x.count("|"))
+            return child.rpartition("|")[0]
+        # Nothing under the root, ask Maya.
+        paths = cmds.ls(root, long=True) or [root]
+        return paths[0]
+
+    def _flatten(self):
+        ''' Build the depth first list of the nodes and the range of each subtree.
+        '''
+        stack = [(self._root, False)]
+        while(stack):
+            path, visited = stack.pop()
+            if(visited):
+                start = self._ranges[path][0]
+                self._ranges[path] = (start, len(self._nodes))
+                continue
+
+            # Store the start of the subtree, the root is not part of the list.
+            self._ranges[path] = (len(self._nodes), None)
+            if(path != self._root):
+                self._nodes.append(path)
+
+            stack.append((path, True))
+            for child in reversed(self._children[path]):
+                stack.append((child, False))
+
+        # The subtree of a node starts after the node itself.
+        for path, (start, end) in self._ranges.items():
+            if(path != self._root):
+                self._ranges[path] = (start + 1, end)
+
+    def resolve(self, path):
+        ''' Get the path used in the snapshot for the given path.
+
+        Args:
+            path    (str)   : The path to resolve.
+
+        Returns:
+            str             : The snapshot path, None if the path is not in the snapshot.
+        '''
+        if(path == self._input or path == self._root):
+            return self._root
+        if(path in self._children):
+            return path
+        return None
+
+    def contains(self, path):
+        ''' Check if the path is part of the snapshot.
+
+        Args:
+            path    (str)   : The path to check.
+
+        Returns:
+            bool            : True if the path is in the snapshot, otherwise False.
+        '''
+        return self.resolve(path) is not None
+
+    def getChild(self, parent, name):
+        ''' Get a direct child of the parent by its name without namespace.
+
+        Args:
+            parent  (str)   : The parent path.
+            name    (str)   : The child name without namespace.
+
+        Returns:
+            str             : The child full path, None if not found.
+        '''
+        return self._groups.get((self.resolve(parent), name))
+
+    def getChildren(self, parent):
+        ''' Get the direct children of the parent.
+
+        Args:
+            parent  (str)   : The parent path.
+
+        Returns:
+            list(str)       : The children full paths.
+        '''
+        return list(self._children.get(self.resolve(parent), []))
+
+    def getDescendants(self, parent):
+        ''' Get all the descendants of the parent, depth first.
+
+        Args:
+            parent  (str)   : The parent path.
+
+        Returns:
+            list(str)       : The descendants full paths.
+        '''
+        parent = self.resolve(parent)
+        if(parent is None):
+            return []
+        start, end = self._ranges[parent]
+        return self._nodes[start:end]
+
+    @property
+    def root(self):
+        return self._root
+
+    @property
+    def nodes(self):
+        return list(self._nodes)
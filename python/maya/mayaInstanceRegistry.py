@@ -0,0 +1,281 @@
+try:
+    from    maya import cmds
+    import  maya.api.OpenMaya as om
+except:
+    pass
+
+import  re
+
+from .dagPath import DagPath
+
+
+class MayaInstanceRegistry(object):
+    ''' In-session registry of the asset instances.
+    The instance numbers are read once from the namespaces and the reference nodes of the scene,
+    then kept current by the Maya namespace and reference callbacks, so allocating a new
+    instance does not scan the scene.
+    The registry is dropped when a scene is opened or created, and seeded again on next use.
+    '''
+
+    # The instance name, "chair_001", or "chair_001_WN" for the references without namespace.
+    INSTANCE_PATTERN = re.compile(r"^(?P<name>.+)_(?P<number>\d+)(?P<tag>_WN)?$")
+
+    # The registry of the session.
+    _registry = None
+
+    def __init__(self):
+        ''' Initialize the registry, it is seeded on first use.
+        '''
+        # The instance name by instance number by asset name.
+        self._instances = {}
+        # The root full path by instance name.
+        self._roots     = {}
+        self._seeded    = False
+        self._callbacks = []
+
+    @classmethod
+    def get(cls):
+        ''' Get the registry of the session, the callbacks are installed on first call.
+
+        Returns:
+            :class:`MayaInstanceRegistry`   : The registry.
+        '''
+        if(cls._registry is None):
+            cls._registry = cls()
+            cls._registry.installCallbacks()
+        return cls._registry
+
+    @classmethod
+    def parseInstanceName(cls, instanceName):
+        ''' Get the asset name and instance number from an instance name.
+
+        Args:
+            instanceName    (str)   : The instance name.
+
+        Returns:
+            str, int                : The asset name and instance number, None, None if the name is not an instance.
+        '''
+        match = cls.INSTANCE_PATTERN.match(instanceName)
+        if(not match):
+            return None, None
+        return match.group("name"), int(match.group("number"))
+
+    # CALLBACKS
+
+    def installCallbacks(self):
+        ''' Install the callbacks keeping the registry current.
+        '''
+        if(self._callbacks):
+            return
+
+        self._callbacks.append(om.MSceneMessage.addCallback(om.MSceneMessage.kAfterOpen, self._onSceneChanged))
+        self._callbacks.append(om.MSceneMessage.addCallback(om.MSceneMessage.kAfterNew, self._onSceneChanged))
+        self._callbacks.append(om.MNamespaceMessage.addNamespaceAddedCallback(self._onNamespaceAdded))
+        self._callbacks.append(om.MNamespaceMessage.addNamespaceRemovedCallback(self._onNamespaceRemoved))
+        # The references without namespace are only known by their reference node.
+        self._callbacks.append(om.MSceneMessage.addReferenceCallback(om.MSceneMessage.kAfterCreateReference, self._onReferenceCreated))
+        self._callbacks.append(om.MSceneMessage.addReferenceCallback(om.MSceneMessage.kAfterRemoveReference, self._onReferenceRemoved))
+        # The renamed namespaces are read again from the scene.
+        if(hasattr(om.MNamespaceMessage, "addNamespaceRenamedCallback")):
+            self._callbacks.append(om.MNamespaceMessage.addNamespaceRenamedCallback(self._onSceneChanged))
+
+    def removeCallbacks(self):
+        ''' Remove the callbacks of the registry.
+        '''
+        if(self._callbacks):
+            om.MMessage.removeCallbacks(self._callbacks)
+        self._callbacks = []
+
+    def _onSceneChanged(self, *args):
+        self.invalidate()
+
+    def _onNamespaceAdded(self, namespace, *args):
+        # Only the root namespaces are instances.
+        namespace = namespace.lstrip(":")
+        if(namespace.find(":") == -1):
+            self.addInstanceName(namespace)
+
+    def _onNamespaceRemoved(self, namespace, *args):
+        namespace = namespace.lstrip(":")
+        if(namespace.find(":") == -1):
+            self.removeInstanceName(namespace)
+
+    def _onReferenceCreated(self, referenceNode, *args):
+        self.addInstanceName(self._getReferenceInstanceName(referenceNode))
+
+    def _onReferenceRemoved(self, referenceNode, *args):
+        self.removeInstanceName(self._getReferenceInstanceName(referenceNode))
+
+    @classmethod
+    def _getReferenceInstanceName(cls, referenceNode):
+        ''' Get the instance name of a reference node.
+
+        Args:
+            referenceNode   (MObject)   : The reference node.
+
+        Returns:
+            str                         : The reference node name without the RN tag.
+        '''
+        name = om.MFnReference(referenceNode).name()
+        return name[:-2] if name.endswith("RN") else name
+
+    # REGISTRY
+
+    def invalidate(self):
+        ''' Drop the registry, it is seeded again on next use.
+        '''
+        self._instances = {}
+        self._roots     = {}
+        self._seeded    = False
+
+    def seed(self):
+        ''' Read the instances from the root namespaces and the reference nodes of the scene.
+        '''
+        self._instances = {}
+        self._roots     = {}
+
+        for namespace in cmds.namespaceInfo(":", listOnlyNamespaces=True) or []:
+            self.addInstanceName(namespace.lstrip(":"))
+        # The references can be loaded without namespaces.
+        for refNode in cmds.ls(type="reference") or []:
+            if(refNode.endswith("RN")):
+                self.addInstanceName(refNode[:-2])
+
+        self._seeded = True
+
+    def _getInstances(self, name):
+        ''' Get the instances of an asset, the registry is seeded if needed.
+
+        Args:
+            name    (str)   : The asset name.
+
+        Returns:
+            dict(int, str)  : The instance name by instance number.
+        '''
+        if(not self._seeded):
+            self.seed()
+        return self._instances.get(name, {})
+
+    def addInstanceName(self, instanceName):
+        ''' Register an instance from its name, the names that are not instances are ignored.
+
+        Args:
+            instanceName    (str)   : The instance name.
+        '''
+        name, number = self.parseInstanceName(instanceName)
+        if(name is not None):
+            self._instances.setdefault(name, {})[number] = instanceName
+
+    def removeInstanceName(self, instanceName):
+        ''' Unregister an instance from its name.
+
+        Args:
+            instanceName    (str)   : The instance name.
+        '''
+        name, number = self.parseInstanceName(instanceName)
+        instances = self._instances.get(name)
+        if(instances and instances.get(number) == instanceName):
+            del instances[number]
+            self._roots.pop(instanceName, None)
+
+    def allocate(self, name, suffix=""):
+        ''' Reserve the next instance number of an asset.
+
+        Args:
+            name    (str)               : The asset name.
+            suffix  (str,   optional)   : The tag added to the instance name, "_WN" for the references
+                                        without namespace. Defaults to "".
+
+        Returns:
+            int, str                    : The instance number and the instance name.
+        '''
+        number          = self.getLastInstanceNumber(name) + 1
+        instanceName    = '{NAME}_{INSTANCE:03d}{SUFFIX}'.format(NAME=name, INSTANCE=number, SUFFIX=suffix)
+        self._instances.setdefault(name, {})[number] = instanceName
+        return number, instanceName
+
+    def release(self, name, number):
+        ''' Release a reserved instance number, when the import has failed.
+
+        Args:
+            name    (str)   : The asset name.
+            number  (int)   : The instance number.
+        '''
+        instances = self._instances.get(name)
+        if(instances and number in instances):
+            self._roots.pop(instances.pop(number), None)
+
+    def setRoot(self, instanceName, root):
+        ''' Store the root of an instance.
+
+        Args:
+            instanceName    (str)   : The instance name.
+            root            (str)   : The root full path.
+        '''
+        self._roots[instanceName] = str(root)
+
+    def getRoot(self, instanceName):
+        ''' Get the root of an instance, found once from the instance namespace.
+
+        Args:
+            instanceName    (str)   : The instance name.
+
+        Returns:
+            str                     : The root full path, None if not found.
+        '''
+        root = self._roots.get(instanceName)
+        if(root is not None and cmds.objExists(root)):
+            return root
+
+        # The root is the shallowest transform of the namespace, or of the reference without namespace.
+        nodes = cmds.ls("%s:*" % instanceName, type="transform", long=True) or []
+        if(not nodes and cmds.objExists("%sRN" % instanceName)):
+            members = cmds.referenceQuery("%sRN" % instanceName, nodes=True, dagPath=True) or []
+            nodes = cmds.ls(members, type="transform", long=True) or []
+        if(not nodes):
+            return None
+        root = min(nodes, key=lambda x : DagPath.get(x).depth)
+        self._roots[instanceName] = root
+        return root
+
+    # QUERIES
+
+    def getLastInstanceNumber(self, name):
+        ''' Get the last instance number of an asset.
+
+        Args:
+            name    (str)   : The asset name.
+
+        Returns:
+            int             : The last instance number, 0 if the asset has no instance.
+        '''
+        instances = self._getInstances(name)
+        return max(instances) if instances else 0
+
+    def getInstanceNames(self, name):
+        ''' Get the instance names of an asset, sorted by instance number.
+
+        Args:
+            name    (str)   : The asset name.
+
+        Returns:
+            list(str)       : The instance names.
+        '''
+        instances = self._getInstances(name)
+        return [instances[number] for number in sorted(instances)]
+
+    def getRoots(self, name):
+        ''' Get the roots of the instances of an asset, sorted by instance number.
+
+        Args:
+            name    (str)   : The asset name.
+
+        Returns:
+            list(str)       : The roots full paths.
+        '''
+        roots = []
+        for instanceName in self.getInstanceNames(name):
+            root = self.getRoot(instanceName)
+            if(root):
+                roots.append(root)
+        return roots
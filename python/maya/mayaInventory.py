@@ -0,0 +1,531 @@
+try:
+    from    maya import cmds
+    import  maya.api.OpenMaya as om
+except:
+    pass
+
+import  json
+import  os
+
+from .dagPath               import DagPath
+from .mayaMetadatas         import MayaMetadatas
+from .mayaReferenceIndex    import MayaReferenceIndex
+from ..utils                import PublishCache
+
+
+class MayaSceneInventory(object):
+    ''' Inventory of the assets loaded in the scene.
+    The inventory records the root, the instance, the reference and the decoded sg_metadatas
+    of each asset. It is stored as json on a single network node, and mirrored to a sidecar
+    json next to the work file so the tools outside of Maya can read it.
+    The inventory is updated in memory by the load tools and the rename operations. The node
+    is written when the scene is saved and the sidecar is mirrored after the save, so the
+    sidecar always matches the saved work file. The changes of a scene that is not saved
+    are dropped with the scene.
+    The inventory is only rebuilt from the scene when the node does not exist or when it
+    has been marked stale.
+    '''
+
+    # The network node holding the inventory.
+    NODE_NAME       = "P3D_inventory"
+    # The attribute holding the json.
+    ATTRIBUTE       = "p3d_inventory"
+    # The extension of the sidecar file, added to the work file name.
+    SIDECAR_EXT     = ".inventory.json"
+    # The version of the stored data.
+    VERSION         = 1
+
+    # The inventory of the scene and the stored string it was decoded from.
+    _current        = None
+    _currentToken   = None
+    # True if the inventory of the scene has changes not written on the node.
+    _dirty          = False
+    # True if the inventory of the scene must be rebuilt.
+    _stale          = False
+    # The (work file, json) of the last sidecar written.
+    _sidecarState   = None
+    # The callbacks storing the inventory with the scene.
+    _callbacks      = []
+
+    def __init__(self, data=None):
+        ''' Initialize the inventory.
+
+        Args:
+            data    (dict,  optional)   : The stored data of the inventory.
+                                        Defaults to None.
+        '''
+        # The records by asset root full path.
+        self._assets    = {}
+        # The roots by asset name and instance number, for the instanced assets.
+        self._instances = {}
+        # The roots by reference node.
+        self._references = {}
+
+        if(data):
+            for record in data.get("assets", []):
+                self._addRecord(record)
+
+    def _addRecord(self, record):
+        ''' Add a record to the inventory and its indexes.
+
+        Args:
+            record  (dict)  : The asset record.
+        '''
+        root = record["root"]
+        if(root in self._assets):
+            self._removeRecord(root)
+
+        self._assets[root] = record
+        if(record["instance"] is not None):
+            self._instances.setdefault(record["name"], {})[record["instance"]] = root
+        if(record["referenceNode"]):
+            self._references.setdefault(record["referenceNode"], set()).add(root)
+
+    def _removeRecord(self, root):
+        ''' Remove a record from the inventory and its indexes.
+
+        Args:
+            root    (str)   : The asset root full path.
+
+        Returns:
+            dict            : The removed record, None if the root is unknown.
+        '''
+        record = self._assets.pop(root, None)
+        if(record is None):
+            return None
+
+        instances = self._instances.get(record["name"], {})
+        if(instances.get(record["instance"]) == root):
+            del instances[record["instance"]]
+            if(not instances):
+                del self._instances[record["name"]]
+
+        roots = self._references.get(record["referenceNode"])
+        if(roots):
+            roots.discard(root)
+            if(not roots):
+                del self._references[record["referenceNode"]]
+
+        return record
+
+    # CALLBACKS
+
+    @classmethod
+    def installCallbacks(cls):
+        ''' Install the callbacks storing the inventory with the scene.
+        '''
+        if(cls._callbacks):
+            return
+
+        cls._callbacks.append(om.MSceneMessage.addCallback(om.MSceneMessage.kBeforeSave, cls._onBeforeSave))
+        cls._callbacks.append(om.MSceneMessage.addCallback(om.MSceneMessage.kAfterSave, cls._onAfterSave))
+        cls._callbacks.append(om.MSceneMessage.addCallback(om.MSceneMessage.kAfterOpen, cls._onSceneChanged))
+        cls._callbacks.append(om.MSceneMessage.addCallback(om.MSceneMessage.kAfterNew, cls._onSceneChanged))
+
+    @classmethod
+    def removeCallbacks(cls):
+        ''' Remove the callbacks, the pending changes are written on the node first.
+        '''
+        cls.flush()
+        if(cls._callbacks):
+            om.MMessage.removeCallbacks(cls._callbacks)
+        cls._callbacks = []
+
+    @classmethod
+    def _onBeforeSave(cls, *args):
+        cls.flush()
+
+    @classmethod
+    def _onAfterSave(cls, *args):
+        cls.writeSidecar()
+
+    @classmethod
+    def _onSceneChanged(cls, *args):
+        # The changes of the previous scene are dropped with it.
+        cls._current        = None
+        cls._currentToken   = None
+        cls._dirty          = False
+        cls._stale          = False
+        cls._sidecarState   = None
+
+    @classmethod
+    def markStale(cls):
+        ''' Mark the inventory of the scene to be rebuilt on next use.
+        Used when the scene has been changed without updating the inventory.
+        '''
+        cls._stale = True
+
+    # SCENE STORAGE
+
+    @classmethod
+    def getSidecarPath(cls, scenePath):
+        ''' Get the sidecar file of a work file.
+
+        Args:
+            scenePath   (str)   : The work file path.
+
+        Returns:
+            str                 : The sidecar file path.
+        '''
+        return os.path.splitext(scenePath)[0] + cls.SIDECAR_EXT
+
+    @classmethod
+    def fromSidecar(cls, scenePath):
+        ''' Read the inventory of a work file from its sidecar, without Maya.
+
+        Args:
+            scenePath   (str)   : The work file path.
+
+        Returns:
+            :class:`MayaSceneInventory` : The inventory, None if the work file has no sidecar.
+        '''
+        sidecarPath = cls.getSidecarPath(scenePath)
+        if(not os.path.isfile(sidecarPath)):
+            return None
+
+        with open(sidecarPath, "r") as f:
+            return cls(json.load(f))
+
+    @classmethod
+    def getCurrent(cls, rebuild=False):
+        ''' Get the inventory of the current scene.
+        The stored json is only decoded again when it has changed.
+        If the scene has no inventory, it is built from the scene and saved.
+
+        Args:
+            rebuild (bool,  optional)   : If True, the inventory is built from the scene.
+                                        Defaults to False.
+
+        Returns:
+            :class:`MayaSceneInventory` : The inventory of the scene.
+        '''
+        cls.installCallbacks()
+        # The changes not written yet are only in memory.
+        if(not rebuild and not cls._stale and cls._dirty and cls._current is not None):
+            return cls._current
+
+        token = cls.readToken()
+        if(rebuild or cls._stale or token is None):
+            inventory = cls.build()
+            inventory.save()
+            return inventory
+
+        if(token != cls._currentToken or cls._current is None):
+            cls._current        = cls(json.loads(token))
+            cls._currentToken   = token
+
+        return cls._current
+
+    @classmethod
+    def getExisting(cls):
+        ''' Get the inventory of the current scene, without building it.
+
+        Returns:
+            :class:`MayaSceneInventory` : The inventory, None if the scene has no inventory.
+        '''
+        if(not cmds.objExists(cls.NODE_NAME) and not (cls._dirty and cls._current is not None)):
+            return None
+        return cls.getCurrent()
+
+    @classmethod
+    def readToken(cls):
+        ''' Read the stored json of the scene.
+
+        Returns:
+            str     : The json string, None if the scene has no inventory.
+        '''
+        attribute = "%s.%s" % (cls.NODE_NAME, cls.ATTRIBUTE)
+        if(not cmds.objExists(attribute)):
+            return None
+        return cmds.getAttr(attribute) or None
+
+    @classmethod
+    def build(cls):
+        ''' Build the inventory from the objects holding sg_metadatas in the scene.
+
+        Returns:
+            :class:`MayaSceneInventory` : The inventory of the scene.
+        '''
+        inventory = cls()
+
+        roots = cmds.ls("*.%s" % MayaMetadatas.ATTRIBUTE, recursive=True, objectsOnly=True, long=True) or []
+        if(not roots):
+            return inventory
+
+        referenceIndex = MayaReferenceIndex()
+        tokens = {}
+        for root in roots:
+            tokens[root] = cmds.getAttr("%s.%s" % (root, MayaMetadatas.ATTRIBUTE))
+
+        # Query the path once per reference node.
+        referencePaths = {}
+        for root in roots:
+            refNode = referenceIndex.getReferenceNode(root)
+            if(refNode and refNode not in referencePaths):
+                # The local copies of the publish cache are recorded as their published file.
+                referencePaths[refNode] = PublishCache.toPublishedPath(
+                    cmds.referenceQuery(refNode, filename=True, withoutCopyNumber=True)
+                )
+
+            dagPath = DagPath.get(root)
+            inventory.addAsset(
+                root,
+                dagPath.assetName,
+                instance        = dagPath.instance,
+                referenceNode   = refNode,
+                referencePath   = referencePaths.get(refNode),
+                sgMetadatas     = json.loads(tokens[root]) if tokens[root] else None
+            )
+
+        return inventory
+
+    def save(self):
+        ''' Keep the inventory as the one of the scene.
+        The node is written on the next scene save, see :func:`flush`.
+        '''
+        MayaSceneInventory.installCallbacks()
+        MayaSceneInventory._current = self
+        MayaSceneInventory._dirty   = True
+        MayaSceneInventory._stale   = False
+
+    @classmethod
+    def flush(cls):
+        ''' Write the pending changes of the inventory on the scene node.
+        '''
+        if(not cls._dirty or cls._current is None):
+            return
+
+        token = json.dumps(cls._current.toDict(), sort_keys=True)
+        if(not cmds.objExists(cls.NODE_NAME)):
+            cmds.createNode("network", name=cls.NODE_NAME, skipSelect=True)
+        if(not cmds.attributeQuery(cls.ATTRIBUTE, node=cls.NODE_NAME, exists=True)):
+            cmds.addAttr(cls.NODE_NAME, longName=cls.ATTRIBUTE, dataType="string")
+        cmds.setAttr("%s.%s" % (cls.NODE_NAME, cls.ATTRIBUTE), token, type="string")
+
+        # The stored string is the one of the current inventory.
+        cls._currentToken   = token
+        cls._dirty          = False
+
+    @classmethod
+    def writeSidecar(cls):
+        ''' Mirror the stored inventory of the saved scene to its sidecar.
+        The sidecar is only written when the stored json or the work file have changed.
+        '''
+        scenePath   = cmds.file(query=True, sceneName=True)
+        token       = cls.readToken()
+        if(not scenePath or token is None or cls._sidecarState == (scenePath, token)):
+            return
+
+        with open(cls.getSidecarPath(scenePath), "w") as f:
+            f.write(token)
+        cls._sidecarState = (scenePath, token)
+
+    def toDict(self):
+        ''' Get the data to store.
+
+        Returns:
+            dict    : The inventory data.
+        '''
+        return {
+            "version"   : self.VERSION,
+            "assets"    : [self._assets[root] for root in sorted(self._assets)]
+        }
+
+    # UPDATES
+
+    def addAsset(self, root, name, instance=None, referenceNode=None, referencePath=None, sgMetadatas=None):
+        ''' Record an asset.
+
+        Args:
+            root            (str)               : The asset root full path.
+            name            (str)               : The asset name.
+            instance        (int,   optional)   : The instance number. Defaults to None.
+            referenceNode   (str,   optional)   : The reference node. Defaults to None.
+            referencePath   (str,   optional)   : The referenced file. Defaults to None.
+            sgMetadatas     (dict,  optional)   : The shotgrid metadatas. Defaults to None.
+        '''
+        self._addRecord({
+            "root"          : str(root),
+            "name"          : name,
+            "instance"      : instance,
+            "referenceNode" : referenceNode,
+            "referencePath" : referencePath,
+            "sgMetadatas"   : sgMetadatas
+        })
+
+    def addObject(self, mayaObject, name, instance=None, referenceNode=None, referencePath=None):
+        ''' Record an object loaded by the load tools.
+
+        Args:
+            mayaObject      (:class:`MayaObject`)   : The loaded object.
+            name            (str)                   : The asset name.
+            instance        (int,   optional)       : The instance number. Defaults to None.
+            referenceNode   (str,   optional)       : The reference node. Defaults to None.
+            referencePath   (str,   optional)       : The referenced file. Defaults to None.
+        '''
+        root = (cmds.ls(mayaObject.fullname, long=True) or [mayaObject.fullname])[0]
+        self.addAsset(
+            root,
+            name,
+            instance        = instance,
+            referenceNode   = referenceNode,
+            referencePath   = referencePath,
+            sgMetadatas     = mayaObject.sgMetadatas
+        )
+
+    def removeAsset(self, root):
+        ''' Remove an asset from the inventory.
+
+        Args:
+            root    (str)   : The asset root full path.
+        '''
+        self._removeRecord(str(root))
+
+    def moveAsset(self, oldRoot, newRoot):
+        ''' Move the record of an asset to a new root, keeping its instance.
+
+        Args:
+            oldRoot (str)   : The old root full path.
+            newRoot (str)   : The new root full path.
+        '''
+        record = self._removeRecord(str(oldRoot))
+        if(record is not None):
+            record["root"] = str(newRoot)
+            self._addRecord(record)
+
+    def setReferencePath(self, referenceNode, referencePath):
+        ''' Update the file of a reference.
+
+        Args:
+            referenceNode   (str)   : The reference node.
+            referencePath   (str)   : The new referenced file.
+        '''
+        for root in self._references.get(referenceNode, []):
+            self._assets[root]["referencePath"] = referencePath
+
+    def renameNamespaces(self, namespaces):
+        ''' Update the roots and instances of the assets in renamed namespaces.
+        The namespaces are renamed together, so they can be swapped.
+
+        Args:
+            namespaces  (dict(str, str))    : The new namespace by old namespace.
+        '''
+        roots = {}
+        for root in self._assets:
+            components = root.split("|")
+            for index, component in enumerate(components):
+                namespace, _, name = component.partition(":")
+                if(name and namespace in namespaces):
+                    components[index] = "%s:%s" % (namespaces[namespace], name)
+            newRoot = "|".join(components)
+            if(newRoot != root):
+                roots[root] = newRoot
+
+        self._renameRoots(roots)
+
+    def applyRenamePlan(self, plan):
+        ''' Update the inventory after a rename plan has been applied.
+
+        Args:
+            plan    (:class:`MayaRenamePlan`)   : The applied rename plan.
+        '''
+        # Rename the deepest nodes first, their paths are based on the old parent names.
+        renames = []
+        newNames = dict(plan.renames)
+        for path in DagPath.sortByDepth(newNames, reverse=True):
+            oldPath = path.path
+            renames.append((oldPath, oldPath.rpartition("|")[0] + "|" + newNames[oldPath]))
+
+        roots = {}
+        for root in self._assets:
+            newRoot = root
+            for oldPath, newPath in renames:
+                if(newRoot == oldPath or newRoot.startswith(oldPath + "|")):
+                    newRoot = newPath + newRoot[len(oldPath):]
+            if(newRoot != root):
+                roots[root] = newRoot
+        self._renameRoots(roots)
+
+        self.renameNamespaces(dict((old, new) for _, old, new in plan.namespaces))
+
+    def _renameRoots(self, roots):
+        ''' Move records to new roots, the instances are parsed again from the new roots.
+
+        Args:
+            roots   (dict(str, str))    : The new root full path by old root full path.
+        '''
+        # Remove all the records first, a new root can be the old root of another record.
+        records = [self._removeRecord(root) for root in roots]
+        for record in records:
+            record["root"] = roots[record["root"]]
+            if(record["instance"] is not None):
+                record["instance"] = DagPath.get(record["root"]).instance
+            self._addRecord(record)
+
+    @classmethod
+    def notifyRenamePlan(cls, plan):
+        ''' Update the inventory of the scene after a rename plan, if the scene has one.
+        The renames of a :class:`PublishTransaction` are not notified, as they are rolled back.
+
+        Args:
+            plan    (:class:`MayaRenamePlan`)   : The applied rename plan.
+        '''
+        inventory = cls.getExisting()
+        if(inventory is not None):
+            inventory.applyRenamePlan(plan)
+            inventory.save()
+
+    # QUERIES
+
+    def getAsset(self, root):
+        ''' Get the record of an asset.
+
+        Args:
+            root    (str)   : The asset root full path.
+
+        Returns:
+            dict            : The record, None if the root is unknown.
+        '''
+        return self._assets.get(str(root))
+
+    def getInstances(self, name):
+        ''' Get the roots of the instances of an asset.
+
+        Args:
+            name    (str)   : The asset name.
+
+        Returns:
+            dict(int, str)  : The root by instance number.
+        '''
+        return dict(self._instances.get(name, {}))
+
+    def getLastInstanceNumber(self, name):
+        ''' Get the last instance number of an asset.
+
+        Args:
+            name    (str)   : The asset name.
+
+        Returns:
+            int             : The last instance number, 0 if the asset has no instance.
+        '''
+        numbers = self._instances.get(name)
+        return max(numbers) if numbers else 0
+
+    def getReferenceRoots(self, referenceNode):
+        ''' Get the roots of the assets loaded by a reference.
+
+        Args:
+            referenceNode   (str)   : The reference node.
+
+        Returns:
+            list(str)               : The roots full paths.
+        '''
+        return sorted(self._references.get(referenceNode, []))
+
+    @property
+    def assets(self):
+        return [self._assets[root] for root in sorted(self._assets)]
+
+    @property
+    def names(self):
+        return sorted(self._instances)
@@ -0,0 +1,256 @@
+try:
+    from    maya import cmds
+except:
+    pass
+
+import  os
+import  re
+import  time
+
+from .mayaReferenceIndex    import MayaReferenceIndex
+from ..utils                import PathResolver, PublishCache
+
+
+class MayaLODSwitcher(object):
+    ''' Switch the LOD of the referenced assets of the scene.
+    The target file of each reference is derived from its current file, with the publish
+    template when given, otherwise from the LOD tag of the file name. The targets are checked
+    with one listing per publish folder, the references already on their target are skipped
+    and the others are reloaded in one pass with the viewport refresh suspended.
+    The files of the references are always the published files, the local copies of the
+    publish cache are mapped back to them.
+    '''
+
+    # The LODs from the highest to the lowest.
+    LODS            = ["high", "mid", "low"]
+    # The LOD names used by the asset groups.
+    LOD_ALIASES     = {"HI": "high", "MI": "mid", "LO": "low"}
+    # The LOD tag in a file name, "chair_rig_high.v003.ma".
+    LOD_PATTERN     = re.compile(r"(?<=[_.])(high|mid|low)(?=[_.])")
+    # The Maya file type by extension.
+    FILE_TYPES      = {
+        ".ma"   : "mayaAscii",
+        ".mb"   : "mayaBinary",
+        ".abc"  : "Alembic",
+        ".fbx"  : "FBX"
+    }
+
+    def __init__(self, template=None):
+        ''' Initialize the switcher.
+
+        Args:
+            template    (:class:`TemplatePath`, optional)   : The publish template with a "lod" field.
+                                                            Defaults to None.
+        '''
+        self._template = template
+
+    @classmethod
+    def getFileType(cls, path):
+        ''' Get the Maya file type of a file from its extension.
+
+        Args:
+            path    (str)   : The file path.
+
+        Returns:
+            str             : The file type, "mayaAscii" if the extension is unknown.
+        '''
+        return cls.FILE_TYPES.get(os.path.splitext(path.split("{")[0])[1].lower(), "mayaAscii")
+
+    @classmethod
+    def getLODName(cls, lod):
+        ''' Get the LOD name used in the files.
+
+        Args:
+            lod     (str)   : The LOD, "high" or "HI".
+
+        Returns:
+            str             : The LOD name.
+        '''
+        return cls.LOD_ALIASES.get(lod, lod)
+
+    # PATHS
+
+    def getLOD(self, path):
+        ''' Get the LOD of a file.
+
+        Args:
+            path    (str)   : The file path.
+
+        Returns:
+            str             : The LOD, None if the file has no LOD.
+        '''
+        if(self._template):
+            fields = self._template.get_fields(path)
+            return fields.get("lod") if fields else None
+
+        matches = self.LOD_PATTERN.findall(os.path.basename(path))
+        return matches[-1] if matches else None
+
+    def getLODPath(self, path, lod):
+        ''' Get the file of another LOD.
+
+        Args:
+            path    (str)   : The current file path.
+            lod     (str)   : The target LOD.
+
+        Returns:
+            str             : The target file path, None if the file has no LOD.
+        '''
+        lod = self.getLODName(lod)
+        if(self._template):
+            fields = self._template.get_fields(path)
+            if(not fields or "lod" not in fields):
+                return None
+            fields["lod"] = lod
+            return self._template.apply_fields(fields)
+
+        folder, fileName = os.path.split(path)
+        matches = list(self.LOD_PATTERN.finditer(fileName))
+        if(not matches):
+            return None
+        # Replace the last LOD tag of the file name.
+        match = matches[-1]
+        return os.path.join(folder, fileName[:match.start()] + lod + fileName[match.end():])
+
+    def exists(self, path):
+        ''' Check if a file exists from the listing of its folder.
+
+        Args:
+            path    (str)   : The file path.
+
+        Returns:
+            bool            : True if the file exists.
+        '''
+        return PathResolver.get().exists(path, scanDirectory=True)
+
+    def resolve(self, path, lods=None):
+        ''' Get the first existing LOD file of a file.
+
+        Args:
+            path    (str)                   : The current file path.
+            lods    (list(str), optional)   : The LODs by priority, from the highest by default.
+                                            Defaults to None.
+
+        Returns:
+            str, str                        : The LOD file path and the LOD, None, None if no LOD exists.
+        '''
+        for lod in lods or self.LODS:
+            lodPath = self.getLODPath(path, lod)
+            if(lodPath and self.exists(lodPath)):
+                return lodPath, self.getLODName(lod)
+        return None, None
+
+    # REFERENCES
+
+    @classmethod
+    def getReferencePath(cls, refNode):
+        ''' Get the published file of a reference without the copy number.
+
+        Args:
+            refNode (str)   : The reference node.
+
+        Returns:
+            str             : The file path, the published file when the reference is loaded from the publish cache.
+        '''
+        return PublishCache.toPublishedPath(cmds.referenceQuery(refNode, filename=True, withoutCopyNumber=True))
+
+    def getTargets(self, lods, references=None, fallback=True):
+        ''' Get the target file of the references.
+
+        Args:
+            lods        (str|dict(str, str))    : The target LOD of all the references, or by reference node.
+            references  (list(str), optional)   : The reference nodes, all the loaded references by default.
+                                                Defaults to None.
+            fallback    (bool,  optional)       : If True, the next lower LOD is used when the target does not exist.
+                                                Defaults to True.
+
+        Returns:
+            dict(str, str), list(str)           : The target file by reference node and the references without target.
+        '''
+        if(references is None):
+            references = [refNode for refNode in MayaReferenceIndex().referenceNodes
+                if cmds.referenceQuery(refNode, isLoaded=True)
+            ]
+
+        targets = {}
+        missing = []
+        for refNode in references:
+            lod = lods.get(refNode) if isinstance(lods, dict) else lods
+            if(not lod):
+                continue
+            lod = self.getLODName(lod)
+            # The lower LODs are tried when the target does not exist.
+            candidates = [lod]
+            if(fallback and lod in self.LODS):
+                candidates = self.LODS[self.LODS.index(lod):]
+
+            targetPath, _ = self.resolve(self.getReferencePath(refNode), candidates)
+            if(targetPath is None):
+                missing.append(refNode)
+            else:
+                targets[refNode] = targetPath
+
+        return targets, missing
+
+    @classmethod
+    def reload(cls, targets, resolve=None):
+        ''' Reload the references on their target file in one pass with the viewport refresh suspended.
+        The references already on their target are skipped.
+
+        Args:
+            targets (dict(str, str))        : The target published file by reference node.
+            resolve (callable,  optional)   : The function giving the file to load for a published file,
+                                            as :func:`LoadTools.resolvePublishPath`. Defaults to None.
+
+        Returns:
+            dict                        : The report with the "switched" file by reference node, the "skipped"
+                                        reference nodes and the time spent in each phase as "timings", in seconds.
+        '''
+        report = {"switched": {}, "skipped": [], "timings": {}}
+
+        startTime = time.time()
+        pending = {}
+        for refNode, targetPath in targets.items():
+            if(os.path.normpath(cls.getReferencePath(refNode)) == os.path.normpath(targetPath)):
+                report["skipped"].append(refNode)
+            else:
+                pending[refNode] = targetPath
+        report["timings"]["plan"] = time.time() - startTime
+
+        startTime = time.time()
+        if(pending):
+            cmds.refresh(suspend=True)
+            try:
+                for refNode, targetPath in pending.items():
+                    loadPath = resolve(targetPath) if resolve else targetPath
+                    cmds.file(loadPath, loadReference=refNode, type=cls.getFileType(targetPath))
+                    report["switched"][refNode] = targetPath
+            finally:
+                cmds.refresh(suspend=False)
+        report["timings"]["reload"] = time.time() - startTime
+
+        return report
+
+    def switch(self, lods, references=None, fallback=True, resolve=None):
+        ''' Switch the references to a LOD.
+
+        Args:
+            lods        (str|dict(str, str))    : The target LOD of all the references, or by reference node.
+            references  (list(str), optional)   : The reference nodes, all the loaded references by default.
+                                                Defaults to None.
+            fallback    (bool,  optional)       : If True, the next lower LOD is used when the target does not exist.
+                                                Defaults to True.
+            resolve     (callable,  optional)   : The function giving the file to load for a published file.
+                                                Defaults to None.
+
+        Returns:
+            dict                                : The reload report, with the references without target as "missing".
+        '''
+        startTime = time.time()
+        targets, missing = self.getTargets(lods, references=references, fallback=fallback)
+        resolveTime = time.time() - startTime
+
+        report = self.reload(targets, resolve=resolve)
+        report["missing"] = missing
+        report["timings"]["resolve"] = resolveTime
+        return report
@@ -0,0 +1,119 @@
+try:
+    from    maya import cmds
+    import  maya.api.OpenMaya as om
+    import  json
+except:
+    pass
+
+from .mayaDagApi import MayaDagApi
+
+
+class MayaMetadatas(object):
+    ''' Cache of the decoded sg_metadatas of a root.
+    The attribute string is kept as change token. It is read from a stored plug,
+    and the json is only decoded again when the string has changed, so the edits
+    made outside of the framework are still noticed.
+    '''
+
+    ATTRIBUTE = "sg_metadatas"
+
+    def __init__(self, root):
+        ''' Initialize the cache.
+
+        Args:
+            root    (str)   : The root transform holding the metadatas.
+        '''
+        self._root      = root
+        self._handle    = None
+        self._plug      = None
+        self._token     = None
+        self._value     = None
+
+    def _getPlug(self):
+        ''' Get the metadatas plug, resolved once while the node exists.
+
+        Returns:
+            :class:`MPlug`  : The plug, None if the root has no metadatas.
+        '''
+        if(self._plug is None or not self._handle.isValid()):
+            self._plug = MayaDagApi.getPlug(self._root, self.ATTRIBUTE)
+            if(self._plug is None):
+                return None
+            self._handle = om.MObjectHandle(self._plug.node())
+
+        return self._plug
+
+    def update(self, token):
+        ''' Update the cache from the attribute string.
+
+        Args:
+            token   (str)   : The attribute string.
+
+        Returns:
+            dict            : The decoded metadatas, None if not set.
+        '''
+        # Only decode the json when the attribute has changed.
+        if(token != self._token or self._value is None):
+            self._token = token
+            self._value = json.loads(token) if token else None
+
+        return self._value
+
+    def read(self):
+        ''' Read the metadatas.
+
+        Returns:
+            dict    : The decoded metadatas, None if not set.
+                    The dictionary is shared with the cache and must not be modified.
+        '''
+        plug = self._getPlug()
+        if(plug is None):
+            return None
+
+        return self.update(plug.asString())
+
+    def write(self, metadatas):
+        ''' Write the metadatas and update the cache.
+        The attribute must exist on the root.
+
+        Args:
+            metadatas   (dict)  : The metadatas to write.
+        '''
+        token = json.dumps(metadatas)
+        # Write with cmds to keep the change in the undo queue.
+        cmds.setAttr("%s.%s" % (self._root, self.ATTRIBUTE), token, type="string")
+        # Keep the written value.
+        self._token = token
+        self._value = metadatas
+
+    def invalidate(self):
+        ''' Drop the cached value and the stored plug.
+        '''
+        self._handle    = None
+        self._plug      = None
+        self._token     = None
+        self._value     = None
+
+    @classmethod
+    def readBulk(cls, objects):
+        ''' Read the metadatas of many objects in one pass.
+        The cache of each object is updated.
+
+        Args:
+            objects (list(:class:`MayaObject`)) : The objects to read, :class:`MayaAsset` are accepted.
+
+        Returns:
+            dict(str, dict)                     : The decoded metadatas by object root.
+        '''
+        roots   = [obj.fullname for obj in objects]
+        tokens  = MayaDagApi.getStringAttributes(roots, cls.ATTRIBUTE)
+
+        metadatas = {}
+        for obj in objects:
+            token = tokens[obj.fullname]
+            if(token is None):
+                metadatas[obj.fullname] = None
+                continue
+            metadatas[obj.fullname] = obj.metadatasCache.update(token)
+
+        return metadatas
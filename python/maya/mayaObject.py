@@ -1,9 +1,13 @@
 try:
     from    maya import cmds
-    import  json
 except:
     pass
 
+from .dagPath           import DagPath
+from .mayaDagApi        import MayaDagApi, BACKEND_CMDS, BACKEND_API, STANDIN_TYPES
+from .mayaMetadatas     import MayaMetadatas
+from .mayaLODSwitcher   import MayaLODSwitcher
+
 
 class MayaObject(object):
     ''' Object representing an object in Maya.
@@ -11,16 +15,23 @@ class MayaObject(object):
     Can contains shotgrid related data.
     '''
 
-    def __init__(self, root=""):
+    def __init__(self, root="", readOnly=False):
         ''' Initialize the object.
 
         Args:
-            root    (str,   optional)   : The root transform of the object.
-                                        Defaults to "".
+            root        (str,   optional)   : The root transform of the object, a path or a :class:`DagPath`.
+                                            Defaults to "".
+            readOnly    (bool,  optional)   : If True, the scene is not modified when the object is created.
+                                            The metadatas attribute is created on the first write.
+                                            Defaults to False.
         '''
-        self._root = root
+        self._root      = str(root)
+        self._readOnly  = readOnly
+        # The decoded metadatas, read on first access.
+        self._metadatas = MayaMetadatas(self._root)
         # Add the metadatas attributes to the root.
-        self.addMetadatas()
+        if(not readOnly):
+            self.addMetadatas()
 
     def metadatasExist(self):
         ''' Check if the metadatas already exist on the root.
@@ -43,12 +54,19 @@ class MayaObject(object):
         '''
         return cmds.referenceQuery(self._root, isNodeReferenced=True)
     
-    def isStandin(self):
+    def isStandin(self, backend=BACKEND_CMDS):
         ''' Check if the object is standin type.
+
+        Args:
+            backend (str,   optional)   : The scene access backend, "cmds" or "api".
+                                        Defaults to "cmds".
         '''
-        shapes = cmds.listRelatives(self._root, shapes=True, fullPath=True)
+        if(backend == BACKEND_API):
+            return MayaDagApi.getShapeType(self._root) in STANDIN_TYPES
+
+        shapes = cmds.listRelatives(self._root, shapes=True, fullPath=True) or []
         if(len(shapes)):
-            if(cmds.nodeType(shapes[0]) == "standin"):
+            if(cmds.nodeType(shapes[0]) in STANDIN_TYPES):
                 return True
 
         return False
@@ -83,9 +101,7 @@ class MayaObject(object):
 
     @property
     def name(self):
-        if(self.hasNameSpace()):
-            return self._root.split(":")[0].split("_")[0]
-        return self._root.split("_")[0]
+        return self.dagPath.assetName
 
     @name.setter
     def name(self, value):
@@ -104,7 +120,7 @@ class MayaObject(object):
     @property
     def instance(self):
         if(self.isReferenced()):
-            return int(self._root.split('|')[-1].split(":")[0].split("_")[1])
+            return self.dagPath.instance
         return None
 
     @instance.setter
@@ -134,37 +150,65 @@ class MayaObject(object):
     def referencePath(self):
         reference = self.referenceNode
         if(reference):
-            return cmds.referenceQuery(reference, filename=True).split("{")[0]
+            return MayaLODSwitcher.getReferencePath(reference)
         return None
     
     @referencePath.setter
     def referencePath(self, value):
         reference = self.referenceNode
         if(reference):
-            cmds.file(value, loadReference=reference, type="mayaAscii")
+            cmds.file(value, loadReference=reference, type=MayaLODSwitcher.getFileType(value))
 
     @property
     def rootNamespace(self):
-        return self._root.split(":")[0] if self._root.find(":") != -1 else None
+        return self.dagPath.rootNamespace
+
+    @property
+    def dagPath(self):
+        return DagPath.get(self._root)
+
+    @property
+    def metadatasCache(self):
+        return self._metadatas
 
     @property
     def sgMetadatas(self):
-        return json.loads(cmds.getAttr("%s.sg_metadatas" % self._root))
+        # The cache returns None when the root has no metadatas.
+        return self._metadatas.read()
     
     @sgMetadatas.setter
     def sgMetadatas(self, value):
+        # Create the metadatas attribute on the first write of a read only object.
+        if(self._readOnly):
+            self.addMetadatas()
         # Clean the metadatas.
         metadatas = self.cleanMetadatas(value)
         # Set the metadatas value.
-        cmds.setAttr("%s.sg_metadatas" % self._root, json.dumps(metadatas), type="string")
+        self._metadatas.write(metadatas)
+
+    def getSgMetadata(self, key):
+        ''' Get a value of the sg_metadatas.
+
+        Args:
+            key     (str)   : The metadata key.
+
+        Returns:
+            object          : The metadata value.
+        '''
+        metadatas = self.sgMetadatas
+        if(metadatas is None):
+            raise Exception("The object '%s' has no sg_metadatas." % self._root)
+        if(key not in metadatas):
+            raise Exception("The sg_metadatas of the object '%s' have no '%s'." % (self._root, key))
+        return metadatas[key]
 
     @property
     def sgCode(self):
-        return self.sgMetadatas["code"]
+        return self.getSgMetadata("code")
 
     @property
     def sgEntity(self):
-        return self.sgMetadatas["entity"]
+        return self.getSgMetadata("entity")
     
     @property
     def sgEntityName(self):
@@ -172,11 +216,11 @@ class MayaObject(object):
     
     @property
     def sgID(self):
-        return self.sgMetadatas["id"]
+        return self.getSgMetadata("id")
 
     @property
     def sgTask(self):
-        return self.sgMetadatas["task"]
+        return self.getSgMetadata("task")
 
     @property
     def sgTaskName(self):
@@ -184,5 +228,5 @@ class MayaObject(object):
 
     @property
     def sgVersionNumber(self):
-        return self.sgMetadatas["version_number"]
+        return self.getSgMetadata("version_number")
 
@@ -0,0 +1,207 @@
+try:
+    from    maya import cmds
+except:
+    pass
+
+from .mayaMetadatas         import MayaMetadatas
+from .mayaInstanceRegistry  import MayaInstanceRegistry
+from .mayaReferenceLoader   import MayaReferenceLoader
+from .mayaLODSwitcher       import MayaLODSwitcher
+
+
+class MayaProxy(object):
+    ''' GPU cache proxies of the assets.
+    A proxy is a transform with a gpuCache shape, created in the instance namespace like a reference.
+    It keeps the alembic and the full file of the asset, so it can be swapped with a reference of the
+    full file and back. The swaps keep the world transform, the parent and the sg_metadatas of the root.
+    '''
+
+    # The end tag of the proxy roots.
+    PROXY_TAG           = "_GPU"
+    # The attribute holding the proxy alembic.
+    PROXY_ATTRIBUTE     = "p3d_proxyPath"
+    # The attribute holding the full file of the asset.
+    FULL_ATTRIBUTE      = "p3d_fullPath"
+
+    @classmethod
+    def loadPlugin(cls):
+        ''' Load the gpuCache plugin if needed.
+        '''
+        if(not cmds.pluginInfo("gpuCache", query=True, loaded=True)):
+            cmds.loadPlugin("gpuCache", quiet=True)
+
+    @classmethod
+    def isProxy(cls, node):
+        ''' Check if a node is a proxy root.
+
+        Args:
+            node    (str)   : The node.
+
+        Returns:
+            bool            : True if the node is a proxy root.
+        '''
+        return cmds.attributeQuery(cls.PROXY_ATTRIBUTE, node=node, exists=True) and \
+            bool(cmds.listRelatives(node, shapes=True, type="gpuCache"))
+
+    @classmethod
+    def setStringAttribute(cls, node, attribute, value):
+        ''' Set a string attribute, the attribute is created if needed.
+
+        Args:
+            node        (str)   : The node.
+            attribute   (str)   : The attribute name.
+            value       (str)   : The value.
+        '''
+        if(not cmds.attributeQuery(attribute, node=node, exists=True)):
+            cmds.addAttr(node, longName=attribute, dataType="string")
+        cmds.setAttr("%s.%s" % (node, attribute), value or "", type="string")
+
+    @classmethod
+    def getStringAttribute(cls, node, attribute):
+        ''' Get a string attribute.
+
+        Args:
+            node        (str)   : The node.
+            attribute   (str)   : The attribute name.
+
+        Returns:
+            str                 : The value, None if the attribute does not exist or is empty.
+        '''
+        if(not cmds.attributeQuery(attribute, node=node, exists=True)):
+            return None
+        return cmds.getAttr("%s.%s" % (node, attribute)) or None
+
+    @classmethod
+    def createProxy(cls, instanceName, name, proxyPath, fullPath=None, loadPath=None):
+        ''' Create a proxy in the instance namespace.
+
+        Args:
+            instanceName    (str)               : The instance name, used as namespace.
+            name            (str)               : The asset name.
+            proxyPath       (str)               : The published alembic of the proxy.
+            fullPath        (str,   optional)   : The full file of the asset. Defaults to None.
+            loadPath        (str,   optional)   : The alembic loaded by the gpuCache, as a local copy of the
+                                                proxy alembic. The proxy alembic by default.
+                                                Defaults to None.
+
+        Returns:
+            str                                 : The proxy root full path.
+        '''
+        cls.loadPlugin()
+        if(not cmds.namespace(exists=":%s" % instanceName)):
+            cmds.namespace(add=instanceName, parent=":")
+
+        root = cmds.createNode("transform", name="%s:%s%s" % (instanceName, name, cls.PROXY_TAG), skipSelect=True)
+        cmds.createNode("gpuCache", name="%sShape" % root.rpartition(":")[2], parent=root, skipSelect=True)
+        shape = cmds.listRelatives(root, shapes=True, fullPath=True)[0]
+        cmds.setAttr("%s.cacheFileName" % shape, loadPath or proxyPath, type="string")
+
+        cls.setStringAttribute(root, cls.PROXY_ATTRIBUTE, proxyPath)
+        cls.setStringAttribute(root, cls.FULL_ATTRIBUTE, fullPath)
+        return cmds.ls(root, long=True)[0]
+
+    @classmethod
+    def getState(cls, root):
+        ''' Get the state kept by the swaps.
+
+        Args:
+            root    (str)   : The root.
+
+        Returns:
+            dict            : The world matrix, parent, sg_metadatas string, proxy and full files of the root.
+        '''
+        parents = cmds.listRelatives(root, parent=True, fullPath=True)
+        return {
+            "matrix"    : cmds.xform(root, query=True, worldSpace=True, matrix=True),
+            "parent"    : parents[0] if parents else None,
+            "metadatas" : cls.getStringAttribute(root, MayaMetadatas.ATTRIBUTE),
+            "proxyPath" : cls.getStringAttribute(root, cls.PROXY_ATTRIBUTE),
+            "fullPath"  : cls.getStringAttribute(root, cls.FULL_ATTRIBUTE)
+        }
+
+    @classmethod
+    def setState(cls, root, state):
+        ''' Restore the state kept by the swaps on a new root.
+
+        Args:
+            root    (str)   : The new root.
+            state   (dict)  : The state of the previous root.
+
+        Returns:
+            str             : The new root full path.
+        '''
+        if(state["parent"]):
+            root = cmds.parent(root, state["parent"])[0]
+        root = cmds.ls(root, long=True)[0]
+        cmds.xform(root, worldSpace=True, matrix=state["matrix"])
+        if(state["metadatas"]):
+            cls.setStringAttribute(root, MayaMetadatas.ATTRIBUTE, state["metadatas"])
+        cls.setStringAttribute(root, cls.PROXY_ATTRIBUTE, state["proxyPath"])
+        cls.setStringAttribute(root, cls.FULL_ATTRIBUTE, state["fullPath"])
+        return root
+
+    @classmethod
+    def toReference(cls, root):
+        ''' Swap a proxy with a reference of its full file, in the same namespace.
+
+        Args:
+            root    (str)   : The proxy root.
+
+        Returns:
+            str, str        : The reference root full path and the reference node.
+        '''
+        state = cls.getState(root)
+        if(not state["fullPath"]):
+            raise Exception("The proxy '%s' has no full file." % root)
+
+        namespace = root.rpartition("|")[2].rpartition(":")[0]
+        cmds.delete(root)
+        # The namespace is used by the reference.
+        if(namespace and cmds.namespace(exists=":%s" % namespace)):
+            cmds.namespace(removeNamespace=":%s" % namespace, deleteNamespaceContent=True)
+
+        nodes = cmds.file(
+            state["fullPath"],
+            reference               = True,
+            loadReferenceDepth      = "all",
+            mergeNamespacesOnClash  = False,
+            namespace               = namespace or ":",
+            type                    = MayaLODSwitcher.getFileType(state["fullPath"]),
+            returnNewNodes          = True
+        ) or []
+
+        newRoot = MayaReferenceLoader.getRootFromNodes(nodes)
+        if(newRoot is None):
+            raise Exception("No root found in the file - '%s'" % state["fullPath"])
+        newRoot = cls.setState(newRoot, state)
+        return newRoot, cmds.referenceQuery(newRoot, referenceNode=True)
+
+    @classmethod
+    def toProxy(cls, root, proxyPath=None):
+        ''' Swap a referenced asset with a proxy, in the same namespace.
+
+        Args:
+            root        (str)               : The reference root.
+            proxyPath   (str,   optional)   : The alembic of the proxy, the one of the previous proxy by default.
+                                            Defaults to None.
+
+        Returns:
+            str                             : The proxy root full path.
+        '''
+        state = cls.getState(root)
+        state["proxyPath"] = proxyPath or state["proxyPath"]
+        if(not state["proxyPath"]):
+            raise Exception("No proxy file for the asset '%s'." % root)
+
+        refNode = cmds.referenceQuery(root, referenceNode=True)
+        state["fullPath"] = MayaLODSwitcher.getReferencePath(refNode)
+
+        shortName   = root.rpartition("|")[2]
+        namespace   = shortName.rpartition(":")[0]
+        # The asset name is read from the instance name, the root name without namespace.
+        name        = MayaInstanceRegistry.parseInstanceName(namespace)[0] if namespace else None
+        name        = name or shortName.split("_")[0]
+        cmds.file(referenceNode=refNode, removeReference=True)
+
+        proxyRoot = cls.createProxy(namespace, name, state["proxyPath"], state["fullPath"])
+        return cls.setState(proxyRoot, state)
@@ -0,0 +1,162 @@
+try:
+    from    maya import cmds
+except:
+    pass
+
+
+class MayaReferenceIndex(object):
+    ''' Index of the references of the scene.
+    Built from a single ls(type="reference") pass, it maps the reference namespaces
+    to their reference node and keeps the namespace tree, so the reference of a node
+    is found from its name without querying Maya.
+    The index is not updated automatically, build a new one after loading,
+    removing or importing references.
+    '''
+
+    # The reference nodes that are not linked to a file.
+    IGNORED_REFERENCES = ["sharedReferenceNode", "_UNKNOWN_REF_NODE_"]
+
+    def __init__(self):
+        ''' Initialize the index.
+        '''
+        # The reference node by namespace.
+        self._namespaces        = {}
+        # The child namespaces by namespace. The root namespace is "".
+        self._namespaceTree     = {"": set()}
+        # The references loaded without namespace.
+        self._rootReferences    = []
+        # The reference node by full path for the references loaded without namespace.
+        self._members           = None
+
+        self.build()
+
+    def build(self):
+        ''' Index the references of the scene.
+        '''
+        for refNode in cmds.ls(type="reference") or []:
+            # Skip the references that are not linked to a file.
+            if(refNode in self.IGNORED_REFERENCES):
+                continue
+            try:
+                namespace = cmds.referenceQuery(refNode, namespace=True)
+            except RuntimeError:
+                continue
+
+            # Remove the root namespace.
+            namespace = namespace.lstrip(":")
+            if(not namespace):
+                self._rootReferences.append(refNode)
+                continue
+
+            self._namespaces[namespace] = refNode
+            self.addNamespace(namespace)
+
+    def addNamespace(self, namespace):
+        ''' Add the namespace and its parents to the namespace tree.
+
+        Args:
+            namespace   (str)   : The namespace without the root ":".
+        '''
+        while(namespace not in self._namespaceTree):
+            self._namespaceTree[namespace] = set()
+            parent = namespace.rpartition(":")[0]
+            self._namespaceTree.setdefault(parent, set()).add(namespace)
+            namespace = parent
+
+    def _getMembers(self):
+        ''' Map the nodes of the references loaded without namespace.
+
+        Returns:
+            dict(str, str)  : The reference node by node full path.
+        '''
+        if(self._members is None):
+            self._members = {}
+            for refNode in self._rootReferences:
+                # Skip the unloaded references.
+                if(not cmds.referenceQuery(refNode, isLoaded=True)):
+                    continue
+                nodes = cmds.referenceQuery(refNode, nodes=True, dagPath=True) or []
+                for node in cmds.ls(nodes, long=True) or []:
+                    self._members[node] = refNode
+
+        return self._members
+
+    def getReferenceNode(self, node):
+        ''' Get the reference node of a node.
+        The node is matched by its namespace, from the deepest to the root.
+
+        Args:
+            node    (str)   : The node full path.
+
+        Returns:
+            str             : The reference node, None if the node is not referenced.
+        '''
+        namespace = node.rpartition("|")[2].rpartition(":")[0]
+        # Look for the closest reference namespace.
+        while(namespace):
+            refNode = self._namespaces.get(namespace)
+            if(refNode):
+                return refNode
+            namespace = namespace.rpartition(":")[0]
+
+        # The node can come from a reference without namespace.
+        if(self._rootReferences):
+            return self._getMembers().get(node)
+
+        return None
+
+    def getReferenceNodes(self, nodes):
+        ''' Get the distinct reference nodes of a list of nodes.
+
+        Args:
+            nodes   (list(str)) : The nodes full paths.
+
+        Returns:
+            list(str)           : The reference nodes, in the nodes order.
+        '''
+        references  = []
+        seen        = set()
+        for node in nodes:
+            refNode = self.getReferenceNode(node)
+            if(refNode and refNode not in seen):
+                seen.add(refNode)
+                references.append(refNode)
+
+        return references
+
+    def getNamespaceReference(self, namespace):
+        ''' Get the reference node loaded in a namespace.
+
+        Args:
+            namespace   (str)   : The namespace without the root ":".
+
+        Returns:
+            str                 : The reference node, None if no reference use the namespace.
+        '''
+        return self._namespaces.get(namespace)
+
+    def getChildNamespaces(self, namespace, recursive=False):
+        ''' Get the reference namespaces under a namespace.
+
+        Args:
+            namespace   (str)               : The parent namespace without the root ":".
+            recursive   (bool,  optional)   : If True, get all the namespaces under the parent.
+                                            Defaults to False.
+
+        Returns:
+            list(str)                       : The child namespaces.
+        '''
+        children = sorted(self._namespaceTree.get(namespace, []))
+        if(not recursive):
+            return children
+
+        namespaces = []
+        for child in children:
+            namespaces.append(child)
+            namespaces.extend(self.getChildNamespaces(child, recursive=True))
+
+        return namespaces
+
+    @property
+    def referenceNodes(self):
+        return list(self._namespaces.values()) + self._rootReferences
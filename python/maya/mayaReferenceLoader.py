@@ -0,0 +1,290 @@
+try:
+    from    maya import cmds
+    import  maya.api.OpenMaya as om
+    import  math
+    import  time
+except:
+    pass
+
+from .dagPath               import DagPath
+from .mayaMetadatas         import MayaMetadatas
+from .mayaInventory         import MayaSceneInventory
+from .mayaInstanceRegistry  import MayaInstanceRegistry
+from .mayaReferenceIndex    import MayaReferenceIndex
+
+# The reference load modes.
+LOAD_ALL        = "all"
+LOAD_TOP_ONLY   = "topOnly"
+LOAD_NONE       = "none"
+
+
+class MayaReferenceLoader(object):
+    ''' On demand loading of the deferred references.
+    A reference created without loading has no node in the scene, it is represented by
+    an anchor transform holding the reference node and the shotgrid metadatas. The layout can
+    place the anchors, and the references are loaded by selection, by asset name or from their
+    visibility in a camera. When a reference is loaded, its root takes the anchor transform and
+    metadatas, and the anchor is deleted.
+    '''
+
+    # The end tag of the anchors.
+    ANCHOR_TAG          = "_ANCHOR"
+    # The attribute holding the reference node of the anchor.
+    ANCHOR_ATTRIBUTE    = "p3d_reference"
+
+    # ANCHORS
+
+    @classmethod
+    def createAnchor(cls, instanceName, refNode):
+        ''' Create the anchor of a deferred reference.
+
+        Args:
+            instanceName    (str)   : The instance name.
+            refNode         (str)   : The reference node.
+
+        Returns:
+            str                     : The anchor full path.
+        '''
+        anchor = cmds.createNode("transform", name=instanceName + cls.ANCHOR_TAG, skipSelect=True)
+        cmds.addAttr(anchor, longName=cls.ANCHOR_ATTRIBUTE, dataType="string")
+        cmds.setAttr("%s.%s" % (anchor, cls.ANCHOR_ATTRIBUTE), refNode, type="string")
+        cmds.addAttr(anchor, longName=MayaMetadatas.ATTRIBUTE, niceName="SG Metadatas", dataType="string")
+        return cmds.ls(anchor, long=True)[0]
+
+    @classmethod
+    def getAnchors(cls):
+        ''' Get the anchors of the scene.
+
+        Returns:
+            dict(str, str)  : The anchor full path by reference node.
+        '''
+        anchors = {}
+        for anchor in cmds.ls("*.%s" % cls.ANCHOR_ATTRIBUTE, recursive=True, objectsOnly=True, long=True) or []:
+            anchors[cmds.getAttr("%s.%s" % (anchor, cls.ANCHOR_ATTRIBUTE))] = anchor
+        return anchors
+
+    # DEFERRED REFERENCES
+
+    @classmethod
+    def getDeferredReferences(cls):
+        ''' Get the references that are not loaded.
+
+        Returns:
+            list(str)   : The reference nodes.
+        '''
+        references = []
+        for refNode in cmds.ls(type="reference") or []:
+            if(refNode in MayaReferenceIndex.IGNORED_REFERENCES):
+                continue
+            try:
+                if(not cmds.referenceQuery(refNode, isLoaded=True)):
+                    references.append(refNode)
+            except RuntimeError:
+                continue
+        return references
+
+    @classmethod
+    def loadReferences(cls, refNodes, depth=LOAD_ALL):
+        ''' Load references with the viewport refresh suspended.
+        The anchored references get the anchor transform and metadatas.
+
+        Args:
+            refNodes    (list(str))         : The reference nodes.
+            depth       (str,   optional)   : The load depth, "all" or "topOnly".
+                                            Defaults to "all".
+
+        Returns:
+            dict(str, str), dict            : The root full path by reference node, None if the reference has no root,
+                                            and the time spent in each phase, in seconds.
+        '''
+        timings = {}
+        anchors = cls.getAnchors()
+
+        startTime = time.time()
+        newNodes = {}
+        cmds.refresh(suspend=True)
+        try:
+            for refNode in refNodes:
+                newNodes[refNode] = cmds.file(loadReference=refNode, loadReferenceDepth=depth, returnNewNodes=True) or []
+        finally:
+            cmds.refresh(suspend=False)
+        timings["load"] = time.time() - startTime
+
+        startTime = time.time()
+        inventory = MayaSceneInventory.getExisting()
+        roots = {}
+        for refNode in refNodes:
+            roots[refNode] = cls.getRootFromNodes(newNodes[refNode])
+
+            # Move the root to the anchor and take its metadatas.
+            anchor = anchors.get(refNode)
+            if(anchor and roots[refNode]):
+                root = roots[refNode]
+                cmds.xform(root, worldSpace=True, matrix=cmds.xform(anchor, query=True, worldSpace=True, matrix=True))
+                token = cmds.getAttr("%s.%s" % (anchor, MayaMetadatas.ATTRIBUTE))
+                if(token):
+                    if(not cmds.attributeQuery(MayaMetadatas.ATTRIBUTE, node=root, exists=True)):
+                        cmds.addAttr(root, longName=MayaMetadatas.ATTRIBUTE, niceName="SG Metadatas", dataType="string")
+                    cmds.setAttr("%s.%s" % (root, MayaMetadatas.ATTRIBUTE), token, type="string")
+                cmds.delete(anchor)
+                if(inventory is not None):
+                    inventory.moveAsset(anchor, root)
+        if(inventory is not None):
+            inventory.save()
+        timings["anchors"] = time.time() - startTime
+
+        return roots, timings
+
+    @classmethod
+    def getRootFromNodes(cls, nodes):
+        ''' Get the root transform from the nodes returned by a load.
+
+        Args:
+            nodes   (list(str)) : The loaded nodes.
+
+        Returns:
+            str                 : The root full path, None if not found.
+        '''
+        roots = [node for node in nodes if node.startswith("|") and DagPath.get(node).depth == 1]
+        if(not roots):
+            transforms = cmds.ls(nodes, type="transform", long=True) or []
+            if(not transforms):
+                return None
+            roots = [min(transforms, key=lambda x : DagPath.get(x).depth)]
+        return roots[0]
+
+    # SELECTION
+
+    @classmethod
+    def getSelectedReferences(cls):
+        ''' Get the deferred references of the selected anchors and referenced nodes.
+
+        Returns:
+            list(str)   : The reference nodes.
+        '''
+        deferred    = set(cls.getDeferredReferences())
+        references  = []
+        for node in cmds.ls(selection=True, long=True) or []:
+            refNode = None
+            if(cmds.attributeQuery(cls.ANCHOR_ATTRIBUTE, node=node, exists=True)):
+                refNode = cmds.getAttr("%s.%s" % (node, cls.ANCHOR_ATTRIBUTE))
+            elif(cmds.referenceQuery(node, isNodeReferenced=True)):
+                # The children references of a reference loaded top only.
+                parentRef = cmds.referenceQuery(node, referenceNode=True)
+                for childRef in cmds.referenceQuery(parentRef, referenceNode=True, child=True) or []:
+                    if(childRef in deferred and childRef not in references):
+                        references.append(childRef)
+            if(refNode in deferred and refNode not in references):
+                references.append(refNode)
+        return references
+
+    @classmethod
+    def getAssetReferences(cls, assetName):
+        ''' Get the deferred references of an asset.
+
+        Args:
+            assetName   (str)   : The asset name.
+
+        Returns:
+            list(str)           : The reference nodes.
+        '''
+        references = []
+        for refNode in cls.getDeferredReferences():
+            # The instance name is read from the reference node.
+            instanceName = refNode[:-2] if refNode.endswith("RN") else refNode
+            if(MayaInstanceRegistry.parseInstanceName(instanceName.rpartition(":")[2])[0] == assetName):
+                references.append(refNode)
+        return references
+
+    # CAMERA
+
+    @classmethod
+    def getReferencePosition(cls, refNode, anchors):
+        ''' Get the position of a deferred reference.
+        The position of an anchored reference is the anchor one, otherwise the root of its parent reference.
+
+        Args:
+            refNode (str)               : The reference node.
+            anchors (dict(str, str))    : The anchor by reference node.
+
+        Returns:
+            :class:`MPoint`             : The world position, None if unknown.
+        '''
+        node = anchors.get(refNode)
+        if(node is None):
+            parentRef = cmds.referenceQuery(refNode, referenceNode=True, parent=True)
+            if(not parentRef):
+                return None
+            members = cmds.referenceQuery(parentRef, nodes=True, dagPath=True) or []
+            transforms = cmds.ls(members, type="transform", long=True) or []
+            if(not transforms):
+                return None
+            node = min(transforms, key=lambda x : DagPath.get(x).depth)
+
+        return om.MPoint(cmds.xform(node, query=True, worldSpace=True, translation=True))
+
+    @classmethod
+    def getCameraFrustum(cls, camera, frame):
+        ''' Get the camera inverse world matrix and the tangents of its half angles of view at a frame.
+
+        Args:
+            camera  (str)   : The camera transform.
+            frame   (float) : The frame.
+
+        Returns:
+            :class:`MMatrix`, float, float  : The inverse world matrix, the horizontal and vertical tangents.
+        '''
+        shape = (cmds.listRelatives(camera, shapes=True, type="camera", fullPath=True) or [camera])[0]
+        inverseMatrix   = om.MMatrix(cmds.getAttr("%s.worldInverseMatrix" % camera, time=frame))
+        focalLength     = cmds.getAttr("%s.focalLength" % shape, time=frame)
+        # The film apertures are in inches and the focal length in millimeters.
+        horizontal      = cmds.getAttr("%s.horizontalFilmAperture" % shape, time=frame) * 25.4 / 2.0 / focalLength
+        vertical        = cmds.getAttr("%s.verticalFilmAperture" % shape, time=frame) * 25.4 / 2.0 / focalLength
+        return inverseMatrix, horizontal, vertical
+
+    @classmethod
+    def getCameraReferences(cls, camera, startFrame, endFrame, maxDistance=None, margin=0.1, step=1):
+        ''' Get the deferred references seen by a camera over a frame range.
+
+        Args:
+            camera      (str)               : The camera transform.
+            startFrame  (float)             : The first frame.
+            endFrame    (float)             : The last frame.
+            maxDistance (float, optional)   : The maximum distance from the camera, None for no limit.
+                                            Defaults to None.
+            margin      (float, optional)   : The extra angle of view, as a ratio, for the assets partly in view.
+                                            Defaults to 0.1.
+            step        (float, optional)   : The frame step of the samples.
+                                            Defaults to 1.
+
+        Returns:
+            list(str)                       : The reference nodes.
+        '''
+        anchors = cls.getAnchors()
+        positions = {}
+        for refNode in cls.getDeferredReferences():
+            position = cls.getReferencePosition(refNode, anchors)
+            if(position is not None):
+                positions[refNode] = position
+
+        seen = set()
+        frame = startFrame
+        while(frame <= endFrame and len(seen) < len(positions)):
+            inverseMatrix, horizontal, vertical = cls.getCameraFrustum(camera, frame)
+            horizontal  *= 1.0 + margin
+            vertical    *= 1.0 + margin
+            for refNode, position in positions.items():
+                if(refNode in seen):
+                    continue
+                # The camera looks down its -Z axis.
+                local = position * inverseMatrix
+                depth = -local.z
+                if(depth <= 0.0):
+                    continue
+                if(maxDistance is not None and math.sqrt(local.x ** 2 + local.y ** 2 + local.z ** 2) > maxDistance):
+                    continue
+                if(abs(local.x) <= horizontal * depth and abs(local.y) <= vertical * depth):
+                    seen.add(refNode)
+            frame += step
+
+        return [refNode for refNode in positions if refNode in seen]
@@ -0,0 +1,250 @@
+try:
+    from    maya import cmds
+    import  maya.api.OpenMaya as om
+    import  time
+except:
+    pass
+
+
+class MayaRenamePlan(object):
+    ''' Plan of renames applied to the scene in one pass.
+    All the target names are computed before touching the scene, so the collisions
+    are detected first. The nodes are resolved to handles before the renames, so they
+    do not need to be sorted by depth, and renamed with cmds in one undo chunk.
+    The reference namespaces are edited with the file command, which is not in the undo
+    queue, so a plan renaming namespaces can only be restored with :func:`revert`.
+    '''
+
+    def __init__(self, chunkName="P3D rename"):
+        ''' Initialize the plan.
+
+        Args:
+            chunkName   (str,   optional)   : The name of the undo chunk.
+                                            Defaults to "P3D rename".
+        '''
+        self._chunkName     = chunkName
+        # The node renames as (path, new name).
+        self._renames       = []
+        # The reference namespace renames as (reference node, old namespace, new namespace).
+        self._namespaces    = []
+        # The handles of the renamed nodes, in the renames order.
+        self._handles       = []
+        self._applied       = False
+        self._timings       = {}
+
+    def addRename(self, path, newName):
+        ''' Add a node rename to the plan.
+        The nodes that keep their name are skipped.
+
+        Args:
+            path    (str)   : The node path.
+            newName (str)   : The new short name of the node.
+        '''
+        if(path.rpartition("|")[2] != newName):
+            self._renames.append((path, newName))
+
+    def addReferenceNamespace(self, refNode, oldNamespace, newNamespace):
+        ''' Add a reference namespace rename to the plan.
+
+        Args:
+            refNode         (str)   : The reference node.
+            oldNamespace    (str)   : The current namespace of the reference.
+            newNamespace    (str)   : The new namespace of the reference.
+        '''
+        if(oldNamespace != newNamespace):
+            self._namespaces.append((refNode, oldNamespace, newNamespace))
+
+    def getCollisions(self):
+        ''' Get the renames that would give a node a name already in use.
+
+        Returns:
+            list(dict)  : The collisions with the node path, the new name and the reason.
+        '''
+        startTime   = time.time()
+        collisions  = []
+
+        # The dag nodes must have a unique name under their parent.
+        dagRenames  = [(path, newName) for path, newName in self._renames if path.find("|") != -1]
+        renamed     = set(path for path, _ in dagRenames)
+        parents     = set(path.rpartition("|")[0] for path, _ in dagRenames)
+
+        # Get the current children of all the parents in one call.
+        # The world is not a node, the top nodes are listed as assemblies.
+        names = {}
+        worldChildren = cmds.ls(assemblies=True, long=True) if "" in parents else []
+        children = cmds.listRelatives([p for p in parents if p], children=True, fullPath=True) or []
+        for child in worldChildren + children:
+            if(child in renamed):
+                continue
+            parent, _, shortName = child.rpartition("|")
+            names.setdefault(parent, set()).add(shortName)
+
+        for path, newName in dagRenames:
+            parent = path.rpartition("|")[0]
+            siblings = names.setdefault(parent, set())
+            if(newName in siblings):
+                collisions.append({"node": path, "name": newName, "reason": "sibling"})
+            siblings.add(newName)
+
+        # The other nodes must have a unique name in the scene.
+        dgRenames = [(path, newName) for path, newName in self._renames if path.find("|") == -1]
+        if(dgRenames):
+            existing = set(cmds.ls([newName for _, newName in dgRenames]) or [])
+            planned = set()
+            for path, newName in dgRenames:
+                if(newName in existing or newName in planned):
+                    collisions.append({"node": path, "name": newName, "reason": "scene"})
+                planned.add(newName)
+
+        # The new namespaces must be free or released by the plan.
+        if(self._namespaces):
+            released = set(old for _, old, _ in self._namespaces)
+            planned = set()
+            for refNode, _, newNamespace in self._namespaces:
+                inUse = cmds.namespace(exists=":%s" % newNamespace) and newNamespace not in released
+                if(inUse or newNamespace in planned):
+                    collisions.append({"node": refNode, "name": newNamespace, "reason": "namespace"})
+                planned.add(newNamespace)
+
+        self._timings["validate"] = time.time() - startTime
+        return collisions
+
+    @classmethod
+    def getNodeName(cls, handle):
+        ''' Get the current unique name of a node.
+
+        Args:
+            handle  (:class:`MObjectHandle`)    : The handle of the node.
+
+        Returns:
+            str                                 : The full path of a dag node, the absolute name of the other nodes.
+        '''
+        node = handle.object()
+        if(node.hasFn(om.MFn.kDagNode)):
+            return om.MDagPath.getAPathTo(node).fullPathName()
+        return om.MFnDependencyNode(node).absoluteName()
+
+    def _renameNodes(self, names):
+        ''' Rename the planned nodes from the root namespace.
+
+        Args:
+            names   (list(tuple))   : The (handle, new name) pairs, in rename order.
+        '''
+        # The new names are given from the root namespace, as the planned names.
+        currentNamespace = cmds.namespaceInfo(currentNamespace=True, absoluteName=True)
+        cmds.namespace(setNamespace=":")
+        try:
+            for handle, newName in names:
+                cmds.rename(self.getNodeName(handle), newName)
+        finally:
+            cmds.namespace(setNamespace=currentNamespace)
+
+    def apply(self):
+        ''' Apply the plan to the scene.
+        The node renames are made in one undo chunk, the reference namespaces are only restored by :func:`revert`.
+        Raise an exception if a collision is found, nothing is renamed in this case.
+
+        Returns:
+            dict    : The time spent in each phase, in seconds.
+        '''
+        if(self._applied):
+            raise Exception("The rename plan has already been applied.")
+
+        collisions = self.getCollisions()
+        if(collisions):
+            error_msg = "The rename plan has %d collision(s): %s" % (
+                len(collisions),
+                ", ".join(["%s -> %s" % (c["node"], c["name"]) for c in collisions])
+            )
+            raise Exception(error_msg)
+
+        cmds.undoInfo(openChunk=True, chunkName=self._chunkName)
+        try:
+            # Resolve all the nodes before renaming, the paths are not valid afterwards.
+            startTime = time.time()
+            selection = om.MSelectionList()
+            for path, _ in self._renames:
+                selection.add(path)
+            self._handles = [om.MObjectHandle(selection.getDependNode(index)) for index in range(len(self._renames))]
+            self._timings["resolve"] = time.time() - startTime
+
+            # Rename the nodes with cmds to keep the renames in the undo chunk.
+            startTime = time.time()
+            self._renameNodes([(handle, newName) for handle, (_, newName) in zip(self._handles, self._renames)])
+            self._timings["rename"] = time.time() - startTime
+
+            # Rename the reference namespaces in two passes to avoid the temporary collisions.
+            startTime = time.time()
+            for index, (refNode, _, _) in enumerate(self._namespaces):
+                self.setReferenceNamespace(refNode, "P3DTMP%d" % index)
+            for refNode, _, newNamespace in self._namespaces:
+                self.setReferenceNamespace(refNode, newNamespace)
+            self._timings["namespaces"] = time.time() - startTime
+
+        finally:
+            cmds.undoInfo(closeChunk=True)
+
+        self._applied = True
+        return self.timings
+
+    @classmethod
+    def setReferenceNamespace(cls, refNode, namespace):
+        ''' Rename the namespace of a reference.
+        The namespace is edited on the reference file, with its copy number to get the right reference.
+
+        Args:
+            refNode     (str)   : The reference node.
+            namespace   (str)   : The new namespace.
+        '''
+        cmds.file(cmds.referenceQuery(refNode, filename=True), edit=True, namespace=namespace)
+
+    def revert(self):
+        ''' Restore the names changed by the plan, it does not rely on the undo queue.
+        It is the only way to restore the reference namespaces.
+        '''
+        if(not self._applied):
+            return
+
+        for index, (refNode, _, _) in enumerate(self._namespaces):
+            self.setReferenceNamespace(refNode, "P3DTMP%d" % index)
+        for refNode, oldNamespace, _ in self._namespaces:
+            self.setReferenceNamespace(refNode, oldNamespace)
+
+        # Restore the node names, the last renamed first.
+        names = [(handle, path.rpartition("|")[2]) for handle, (path, _) in zip(self._handles, self._renames)]
+        self._renameNodes([(handle, oldName) for handle, oldName in reversed(names) if handle.isValid()])
+
+        self._applied = False
+
+    @property
+    def renames(self):
+        return list(self._renames)
+
+    @property
+    def namespaces(self):
+        return list(self._namespaces)
+
+    @property
+    def timings(self):
+        return dict(self._timings)
+
+    @classmethod
+    def fromMapping(cls, paths, rename, chunkName="P3D rename"):
+        ''' Build a plan by applying a function to the short name of each node.
+
+        Args:
+            paths       (list(str))             : The nodes paths.
+            rename      (function)              : The function returning the new short name from the current one.
+            chunkName   (str,       optional)   : The name of the undo chunk.
+                                                Defaults to "P3D rename".
+
+        Returns:
+            :class:`MayaRenamePlan`             : The rename plan.
+        '''
+        startTime = time.time()
+        plan = cls(chunkName=chunkName)
+        for path in paths:
+            plan.addRename(path, rename(path.rpartition("|")[2]))
+        plan._timings["plan"] = time.time() - startTime
+
+        return plan
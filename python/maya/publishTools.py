@@ -8,24 +8,55 @@ try:
     from tank_vendor    import six
 
     import sgtk
-    import os
-    import re
 
     from .technicalCheck.technicalCheck import TechnicalCheck
 
 except:
     pass
 
-__ABC_COMMAND_WORLD__       = 'AbcExport -j "-frameRange <startFrame> <endFrame> -noNormals -renderableOnly <stripNamespaces> -uvWrite -worldSpace -writeVisibility -writeUVSets -dataFormat ogawa -root <listObjects> -file <filePath>"'
-__ABC_COMMAND_LOCAL__       = 'AbcExport -j "-frameRange <startFrame> <endFrame> -noNormals -renderableOnly <stripNamespaces> -uvWrite -writeVisibility -writeUVSets -dataFormat ogawa -root <listObjects> -file <filePath>"'
-__ABC2_COMMAND_WORLD__      = 'AbcExport2 -j "-frameRange <startFrame> <endFrame> -noNormals -renderableOnly <stripNamespaces> -uvWrite -worldSpace -writeVisibility -writeUVSets -dataFormat ogawa -root <listObjects> -file <filePath>"'
-__ABC2_COMMAND_LOCAL__      = 'AbcExport2 -j "-frameRange <startFrame> <endFrame> -noNormals -renderableOnly <stripNamespaces> -uvWrite -writeVisibility -writeUVSets -dataFormat ogawa -root <listObjects> -file <filePath>"'
+# The export worker runs without Toolkit, the standard modules are imported outside of the try.
+import  os
+import  re
+import  json
+
+from .dagPath       import DagPath
+from .mayaRename    import MayaRenamePlan
+from .mayaLODSwitcher import MayaLODSwitcher
+from .publishTransaction import PublishTransaction
+from ..utils         import PathResolver
+
+# The alembic export commands by plugin version.
+__ABC_COMMANDS__            = {1: "AbcExport", 2: "AbcExport2"}
+# The alembic export jobs by space type, several jobs are written in the same frame walk.
+__ABC_JOB_WORLD__           = '-frameRange <startFrame> <endFrame> -noNormals -renderableOnly <stripNamespaces> -uvWrite -worldSpace -writeVisibility -writeUVSets -dataFormat ogawa -root <listObjects> -file <filePath>'
+__ABC_JOB_LOCAL__           = '-frameRange <startFrame> <endFrame> -noNormals -renderableOnly <stripNamespaces> -uvWrite -writeVisibility -writeUVSets -dataFormat ogawa -root <listObjects> -file <filePath>'
 
 class PublishTools(object):
     ''' Commun publish functions for Maya.'''
 
-    def __init__(self):
-        pass
+    # The LOD tags of the mesh names by LOD.
+    LOD_TAGS            = {"LO": "_low", "MI": "_mid", "HI": "_high"}
+    # The name of the index of the fan-out alembic exports.
+    ALEMBIC_INDEX_NAME  = "index.json"
+
+    # The transactions of the rigs prepared for the export by asset root, shared by the publish hooks.
+    _preparedRigs       = {}
+    # The same transactions in preparation order.
+    _preparedOrder      = []
+
+    def __init__(self, exportBackend=None):
+        ''' Initialize the publish tools.
+
+        Args:
+            exportBackend   (:class:`MayaExportBackend`, optional)  : The pool of mayapy processes running the
+                                                                    exports that do not modify the scene.
+                                                                    Its snapshot is saved here, before any
+                                                                    mutation of the publish.
+                                                                    Defaults to None.
+        '''
+        self._exportBackend = exportBackend
+        if(exportBackend is not None and exportBackend.snapshot is None):
+            exportBackend.saveSnapshot()
 
     # Get functions.
 
@@ -124,12 +155,14 @@ class PublishTools(object):
 
     # Export functions.
 
-    def exportMayaSelection(self, selection, path):
+    def exportMayaSelection(self, selection, path, emptyGroups=None):
         ''' Save the selection as maya scene.
 
         Args:
-            selection   (list(str)):   The selection to save in the maya file.
-            path        (str):          The path to save the maya file.
+            selection   (list(str)):            The selection to save in the maya file.
+            path        (str):                  The path to save the maya file.
+            emptyGroups (list(str), optional):  The groups saved without their children, see :func:`addEmptyGroups`.
+                                                Defaults to None.
         '''
         # Select the asset before save.
         cmds.select(clear=True)
@@ -137,6 +170,34 @@ class PublishTools(object):
 
         # Save the asset.
         cmds.file(path, force=True, type="mayaAscii", exportSelected=True, preserveReferences=True)
+        self.addEmptyGroups(path, emptyGroups)
+
+    def addEmptyGroups(self, path, groups):
+        ''' Add empty groups to an exported maya ascii file.
+        A selected group is always exported with its children, the groups kept without
+        their children are written in the file instead, under their exported parent.
+
+        Args:
+            path    (str)       : The maya ascii file.
+            groups  (list(str)) : The full paths of the groups.
+        '''
+        if(not groups):
+            return
+
+        lines = []
+        for group in groups:
+            parent, _, name = group.rpartition("|")
+            lines.append('createNode transform -n "%s" -p "%s";\n' % (name, parent))
+
+        with open(path, "r") as f:
+            content = f.readlines()
+        # Create the groups before the end of file comment.
+        end = len(content)
+        if(content and content[-1].startswith("// End of")):
+            end -= 1
+        content[end:end] = lines
+        with open(path, "w") as f:
+            f.writelines(content)
 
     def exportMayaAsset(self, asset, path):
         ''' Save the asset as maya scene.
@@ -147,29 +208,247 @@ class PublishTools(object):
         '''
         self.exportMayaSelection(asset.fullname, path)
 
-    def exportMayaAssetRig(self, asset, filePath):
+    def getLODGroups(self, asset, lod):
+        ''' Get the meshes and technical groups of a LOD.
+
+        Args:
+            asset   (:class:`MayaAsset`)    : The asset.
+            lod     (str)                   : The LOD, "LO", "MI" or "HI".
+
+        Returns:
+            list(str)                       : The existing groups.
+        '''
+        groups = [getattr(asset, "groupMeshes" + lod), getattr(asset, "groupMeshesTechnical" + lod)]
+        return [group for group in groups if group]
+
+    def getLODExportSelection(self, asset, lod):
+        ''' Get the nodes to export for a LOD of the asset, without modifying the scene.
+        The selection covers the asset hierarchy without the content of the other LODs, as the
+        meshes and technical meshes deleted by :func:`MayaAsset.deleteMeshesHI`. The groups of the
+        other LODs are kept empty, so the exported asset is still valid.
+        The selected nodes are exported with their parents.
+
+        Args:
+            asset   (:class:`MayaAsset`)    : The asset.
+            lod     (str)                   : The LOD to keep, "LO", "MI" or "HI".
+
+        Returns:
+            list(str), list(str)            : The nodes to select, and the groups to export without their children.
+        '''
+        hierarchy = asset.hierarchy
+
+        # Get the content of the other LOD groups and their parents.
+        excluded    = set()
+        parents     = set()
+        emptyGroups = []
+        for otherLod in self.LOD_TAGS:
+            if(otherLod == lod):
+                continue
+            for group in self.getLODGroups(asset, otherLod):
+                children = hierarchy.getChildren(group)
+                # An empty group is selected as is.
+                if(not children):
+                    continue
+                excluded.update(children)
+                emptyGroups.append(group)
+                parent = group
+                while(parent):
+                    parents.add(parent)
+                    parent = parent.rpartition("|")[0]
+
+        # Select the largest subtrees without the excluded nodes.
+        selection   = []
+        stack       = [hierarchy.root]
+        while(stack):
+            node = stack.pop()
+            if(node in excluded):
+                continue
+            if(node in parents):
+                stack.extend(reversed(hierarchy.getChildren(node)))
+                continue
+            selection.append(node)
+
+        return selection, emptyGroups
+
+    def exportMayaAssetLOD(self, asset, lod, path):
+        ''' Save a LOD of the asset as maya scene, without the other LODs.
+
+        Args:
+            asset   (:class:`MayaAsset`):   The asset to save in the maya file.
+            lod     (str):                  The LOD to save, "LO", "MI" or "HI".
+            path    (str):                  The path to save the maya file.
+        '''
+        selection, emptyGroups = self.getLODExportSelection(asset, lod)
+        self.exportMayaSelection(selection, path, emptyGroups=emptyGroups)
+
+    def exportMayaAssetLODs(self, asset, paths):
+        ''' Save the LODs of the asset as maya scenes from the same scene state.
+        With an export backend, all the LODs are exported at the same time.
+
+        Args:
+            asset   (:class:`MayaAsset`):   The asset to save in the maya files.
+            paths   (dict(str, str)):       The path to save the maya file by LOD.
+        '''
+        if(self._exportBackend is not None):
+            futures = [self.submitLODExport(None, "mayaAssetLOD", asset, lod, path) for lod, path in paths.items()]
+            for future in futures:
+                self._exportBackend.wait(future)
+            return
+
+        for lod, path in paths.items():
+            self.exportMayaAssetLOD(asset, lod, path)
+
+    def submitLODExport(self, item, jobType, asset, lod, path):
+        ''' Send the export of a LOD of the asset to the export backend, once by output file.
+
+        Args:
+            item    (sgUIItem)              : The publish item getting the result, can be None.
+            jobType (str)                   : The job type, "mayaAssetLOD" or "materialX".
+            asset   (:class:`MayaAsset`)    : The asset to export.
+            lod     (str)                   : The LOD to export, "LO", "MI" or "HI".
+            path    (str)                   : The path of the exported file.
+
+        Returns:
+            Future                          : The export in progress, None without export backend.
+        '''
+        if(self._exportBackend is None):
+            return None
+
+        # The export can already be submitted by the validation.
+        future = self._exportBackend.getExport(path)
+        if(future is not None):
+            return future
+
+        if(jobType == "materialX"):
+            return self._exportBackend.submitMaterialX(item, asset, "default", path, lod)
+        if(jobType == "mayaAssetLOD"):
+            return self._exportBackend.submitMayaAssetLOD(item, asset, lod, path)
+        raise Exception("The LOD export '%s' is not supported by the export backend." % jobType)
+
+    def getLODSpecificationPlan(self, asset, group, lodTag):
+        ''' Get the rename plan removing the LOD tag from the name of all the transforms under the group.
+
+        Args:
+            asset   (:class:`MayaAsset`)    : The asset that contains the group.
+            group   (str)                   : The LOD group.
+            lodTag  (str)                   : The LOD tag to remove. For instance "_low".
+
+        Returns:
+            :class:`MayaRenamePlan`         : The rename plan, it can be reverted once applied.
+        '''
+        # Get the transforms from the asset hierarchy snapshot.
+        content = asset.hierarchy.getDescendants(group)
+        # Remove the lod specification.
+        return MayaRenamePlan.fromMapping(
+            content,
+            lambda shortName : shortName.replace(lodTag, ""),
+            chunkName = "P3D remove LOD specification"
+        )
+
+    def removeLODSpecification(self, asset, group, lodTag):
+        ''' Remove the LOD tag from the name of all the transforms under the group.
+        All the names are computed first and the transforms are renamed in one pass.
+
+        Args:
+            asset   (:class:`MayaAsset`)    : The asset that contains the group.
+            group   (str)                   : The LOD group.
+            lodTag  (str)                   : The LOD tag to remove. For instance "_low".
+
+        Returns:
+            dict                            : The time spent in each phase of the rename, in seconds.
+        '''
+        timings = self.getLODSpecificationPlan(asset, group, lodTag).apply()
+
+        # The asset nodes have been renamed.
+        asset.invalidateHierarchy()
+
+        return timings
+
+    def prepareMayaAssetRig(self, asset):
+        ''' Import the references and bake the namespaces of the asset rig, once per asset.
+        The preparation is recorded in a publish transaction shared by all the rig exports,
+        see :func:`restorePreparedRigs`.
+
+        Args:
+            asset   (:class:`MayaAsset`)    : The asset to prepare.
+        '''
+        if(asset.fullname in PublishTools._preparedRigs):
+            return
+
+        transaction = PublishTransaction("P3D prepare rig", rollback=False)
+        PublishTools._preparedRigs[asset.fullname] = transaction
+        PublishTools._preparedOrder.append(transaction)
+        with transaction:
+            # Make the additional connections. For instance the facial rig.
+
+            # Import all the references of the asset.
+            # The import can not be undone, it is only recorded when there is a reference.
+            if(asset.getChildReferences()):
+                transaction.importChildReferences(asset)
+
+            # Bake the namespaces.
+            transaction.freezeNamespace(asset)
+
+    def restorePreparedRigs(self):
+        ''' Roll back the preparation of the rigs, once all the rig exports are done.
+        The baked namespaces are reverted in the scene. A rig with child references can
+        not be restored that way, as their import can not be undone: the work scene is then
+        reopened, once for all the prepared rigs.
+        '''
+        transactions = PublishTools._preparedOrder
+        PublishTools._preparedRigs  = {}
+        PublishTools._preparedOrder = []
+        if(not transactions):
+            return
+
+        if(any(transaction.requiresReopen for transaction in transactions)):
+            # A single reopen discards all the preparations.
+            transactions[0].rollback()
+            return
+
+        for transaction in reversed(transactions):
+            transaction.rollback()
+
+    def exportMayaAssetRig(self, asset, filePath, lod=None):
         ''' Export the asset rig as a maya ascii file.
+        The rig is prepared on the first export and stays prepared for the next ones,
+        until :func:`restorePreparedRigs`.
 
         Args:
             asset       (:class:`MayaAsset`)    : The asset to export.
             filePath    (str)                   : The full path to export the maya file.
+            lod         (str,   optional)       : The LOD to export, "LO", "MI" or "HI", all the LODs if None.
+                                                Defaults to None.
         '''
-        # Make the additional connections. For instance the facial rig.
-
-        # Import all the references of the asset.
-        asset.importChildReferences()
-
-        # Bake the namespaces.
-        asset.freezeNamespace()
+        self.prepareMayaAssetRig(asset)
 
         # Select the asset.
-        cmds.select(asset.fullname, replace=True)
+        emptyGroups = []
+        if(lod is None):
+            cmds.select(asset.fullname, replace=True)
+        else:
+            selection, emptyGroups = self.getLODExportSelection(asset, lod)
+            cmds.select(selection, replace=True)
 
         # Add to the selection the script nodes.
         cmds.select(cmds.ls(type='script'), add=True)
 
         # Export the meshes.
         cmds.file(filePath, force=True, options="v=0", typ="mayaAscii", exportSelected=True, preserveReferences=False)
+        self.addEmptyGroups(filePath, emptyGroups)
+
+    def exportMayaAssetRigLODs(self, asset, paths):
+        ''' Export the LODs of the asset rig from one preparation, then restore the scene.
+
+        Args:
+            asset   (:class:`MayaAsset`)    : The asset to export.
+            paths   (dict(str, str))        : The full path to export the maya file by LOD.
+        '''
+        try:
+            for lod, path in paths.items():
+                self.exportMayaAssetRig(asset, path, lod=lod)
+        finally:
+            self.restorePreparedRigs()
 
     def exportMayaEnvironment(self, environment, path):
         ''' Export the environment as a maya ascii file.
@@ -180,46 +459,235 @@ class PublishTools(object):
         '''
         self.exportMayaSelection(environment.fullname, path)
 
-    def exportAlembic(self, meshes, startFrame, endFrame, filePath, exportABCVersion=1, spaceType="world", stripNamespace=True):
-        ''' Export the list of meshes in an alembic file.
+    def getAlembicJob(self, meshes, startFrame, endFrame, filePath, spaceType="world", stripNamespace=True):
+        ''' Get the alembic export job of a list of meshes.
 
         Args:
             meshes              (list(str)):    The list of meshes to export.
             startFrame          (int):          The first frame of the export.
             endFrame            (int):          The last frame of the export.
             filePath            (str):          The full path to export the alembic.
-            exportABCVersion    (int):          The version of the alembic plugin.
             spaceType           (str):          The space use to export the alembic.
+            stripNamespace      (bool):         If True, the namespaces are removed from the names.
+
+        Returns:
+            str                                 : The job arguments.
+        '''
+        if(spaceType == "world"):
+            abcJob = __ABC_JOB_WORLD__
+        else:
+            abcJob = __ABC_JOB_LOCAL__
+
+        # Optionnaly enable strip namespace.
+        if(stripNamespace):
+            abcJob = abcJob.replace("<stripNamespaces>", "-stripNamespaces")
+        else:
+            abcJob = abcJob.replace("<stripNamespaces>", "")
+
+        # Replace the job tags.
+        abcJob = abcJob.replace("<startFrame>", str(startFrame))
+        abcJob = abcJob.replace("<endFrame>", str(endFrame))
+        abcJob = abcJob.replace("<listObjects>", ' -root '.join(meshes))
+        abcJob = abcJob.replace("<filePath>", filePath.replace("\\", "/"))
+
+        return abcJob
+
+    def exportAlembics(self, jobs, exportABCVersion=1):
+        ''' Export several alembic files in one command.
+        The jobs are written during the same evaluation of the timeline.
+
+        Args:
+            jobs                (list(dict)):   The jobs, with the "meshes", "startFrame", "endFrame" and "filePath" keys,
+                                                and optionally the "spaceType" and "stripNamespace" keys.
+            exportABCVersion    (int):          The version of the alembic plugin.
         '''
-        abcCommand = ""
-        # Load the abc export plugin and select the command to export.
+        if(not jobs):
+            return
+
+        # Load the abc export plugin.
         if(exportABCVersion == 1):
             self.loadABCExportPlugin()
-            if(spaceType == "world"):
-                abcCommand = __ABC_COMMAND_WORLD__
-            else:
-                abcCommand = __ABC_COMMAND_LOCAL__
         elif(exportABCVersion == 2):
             self.loadABCExport2Plugin()
-            if(spaceType == "world"):
-                abcCommand = __ABC2_COMMAND_WORLD__
+
+        abcJobs = []
+        for job in jobs:
+            abcJobs.append(self.getAlembicJob(
+                job["meshes"],
+                job["startFrame"],
+                job["endFrame"],
+                job["filePath"],
+                spaceType       = job.get("spaceType", "world"),
+                stripNamespace  = job.get("stripNamespace", True)
+            ))
+
+        # Launch the command with all the jobs.
+        abcCommand = __ABC_COMMANDS__[exportABCVersion] + "".join([' -j "%s"' % abcJob for abcJob in abcJobs])
+        mel.eval(abcCommand)
+
+    def exportAlembic(self, meshes, startFrame, endFrame, filePath, exportABCVersion=1, spaceType="world", stripNamespace=True):
+        ''' Export the list of meshes in an alembic file.
+
+        Args:
+            meshes              (list(str)):    The list of meshes to export.
+            startFrame          (int):          The first frame of the export.
+            endFrame            (int):          The last frame of the export.
+            filePath            (str):          The full path to export the alembic.
+            exportABCVersion    (int):          The version of the alembic plugin.
+            spaceType           (str):          The space use to export the alembic.
+        '''
+        self.exportAlembics(
+            [{
+                "meshes"            : meshes,
+                "startFrame"        : startFrame,
+                "endFrame"          : endFrame,
+                "filePath"          : filePath,
+                "spaceType"         : spaceType,
+                "stripNamespace"    : stripNamespace
+            }],
+            exportABCVersion = exportABCVersion
+        )
+
+    def exportAlembicLODs(self, asset, paths, startFrame, endFrame, exportABCVersion=2, spaceType="local"):
+        ''' Export the LODs of the asset in alembic files, in one command.
+        The LOD tags are removed from the mesh names during the export, the names are restored afterwards.
+
+        Args:
+            asset               (:class:`MayaAsset`)    : The asset to export.
+            paths               (dict(str, str))        : The full path to export the alembic by LOD.
+            startFrame          (int)                   : The first frame of the export.
+            endFrame            (int)                   : The last frame of the export.
+            exportABCVersion    (int,   optional)       : The version of the alembic plugin. Defaults to 2.
+            spaceType           (str,   optional)       : The space use to export the alembic. Defaults to "local".
+        '''
+        with PublishTransaction("P3D publish alembic LODs") as transaction:
+            # Remove the LOD specification of the meshes of all the LODs.
+            for lod in paths:
+                plan = self.getLODSpecificationPlan(asset, getattr(asset, "groupMeshes" + lod), self.LOD_TAGS[lod])
+                transaction.applyRenamePlan(plan, asset=asset)
+
+            jobs = []
+            for lod, path in paths.items():
+                jobs.append({
+                    "meshes"        : getattr(asset, "meshes" + lod),
+                    "startFrame"    : startFrame,
+                    "endFrame"      : endFrame,
+                    "filePath"      : path,
+                    "spaceType"     : spaceType
+                })
+
+            self.exportAlembics(jobs, exportABCVersion=exportABCVersion)
+
+    def getAlembicFanOutGroups(self, assetBuffers, folder, groupSize=1):
+        ''' Split the assets in alembic files of a folder.
+        A file holding a single asset is named from the asset instance.
+
+        Args:
+            assetBuffers    (list(tuple(str, list(str))))   : The asset root and its buffers to export.
+            folder          (str)                           : The folder of the alembic files.
+            groupSize       (int,   optional)               : The number of assets by file. Defaults to 1.
+
+        Returns:
+            list(tuple(str, dict(str, list(str))))          : The file path and the buffers by asset root of each file.
+        '''
+        # The assets without buffer are not exported.
+        assetBuffers = [(root, buffers) for root, buffers in assetBuffers if buffers]
+
+        groups      = []
+        fileNames   = set()
+        for index in range(0, len(assetBuffers), groupSize):
+            chunk = assetBuffers[index:index + groupSize]
+            if(len(chunk) == 1):
+                dagPath = DagPath.get(chunk[0][0])
+                fileName = (dagPath.rootNamespace or dagPath.name).replace(":", "_")
             else:
-                abcCommand = __ABC2_COMMAND_LOCAL__
+                fileName = "group_%03d" % (len(groups) + 1)
+            # Keep the file names unique.
+            uniqueName = fileName
+            number = 1
+            while(uniqueName in fileNames):
+                number += 1
+                uniqueName = "%s_%d" % (fileName, number)
+            fileNames.add(uniqueName)
 
-        # Optionnaly enable strip namespace.
-        if(stripNamespace):
-            abcCommand = abcCommand.replace("<stripNamespaces>", "-stripNamespaces")
-        else:
-            abcCommand = abcCommand.replace("<stripNamespaces>", "")
+            groups.append((os.path.join(folder, uniqueName + ".abc"), dict(chunk)))
 
-        # Replace the command tags.
-        abcCommand = abcCommand.replace("<startFrame>", str(startFrame))
-        abcCommand = abcCommand.replace("<endFrame>", str(endFrame))
-        abcCommand = abcCommand.replace("<listObjects>", ' -root '.join(meshes))
-        abcCommand = abcCommand.replace("<filePath>", filePath.replace("\\", "/"))
+        return groups
 
-        # Launch the command.
-        mel.eval(abcCommand)
+    def writeAlembicIndex(self, groups, startFrame, endFrame, indexPath):
+        ''' Write the index of fan-out alembic files.
+
+        Args:
+            groups      (list(tuple(str, dict(str, list(str)))))   : The file path and the buffers by asset root of each file.
+            startFrame  (int)                                       : The first frame of the export.
+            endFrame    (int)                                       : The last frame of the export.
+            indexPath   (str)                                       : The path of the index json.
+
+        Returns:
+            dict                                                    : The index, with the file of each asset relative to the index.
+        '''
+        index = {"startFrame": startFrame, "endFrame": endFrame, "files": {}, "assets": {}}
+        indexFolder = os.path.dirname(indexPath)
+        for filePath, assetBuffers in groups:
+            # The files without buffer are not exported.
+            if(not any(assetBuffers.values())):
+                continue
+            relativePath = os.path.relpath(filePath, indexFolder).replace("\\", "/")
+            index["files"][relativePath] = list(assetBuffers)
+            for root, buffers in assetBuffers.items():
+                dagPath = DagPath.get(root)
+                index["assets"][root] = {
+                    "file"      : relativePath,
+                    "name"      : dagPath.assetName,
+                    "instance"  : dagPath.instance,
+                    "buffers"   : buffers
+                }
+
+        with open(indexPath, "w") as f:
+            json.dump(index, f, indent=4, sort_keys=True)
+        PathResolver.get().invalidate(indexPath)
+
+        return index
+
+    def exportAlembicFanOut(self, groups, startFrame, endFrame, indexPaths, exportABCVersion=2, spaceType="local", stripNamespace=False):
+        ''' Export several alembic files in one evaluation of the timeline, and write their index.
+
+        Args:
+            groups              (list(tuple(str, dict(str, list(str)))))   : The file path and the buffers by asset root of each file.
+            startFrame          (int)                                       : The first frame of the export.
+            endFrame            (int)                                       : The last frame of the export.
+            indexPaths          (list(str))                                 : The paths of the index json, one by folder
+                                                                            reading the index.
+            exportABCVersion    (int,   optional)                           : The version of the alembic plugin. Defaults to 2.
+            spaceType           (str,   optional)                           : The space use to export the alembic. Defaults to "local".
+            stripNamespace      (bool,  optional)                           : If True, the namespaces are removed from the names.
+                                                                            Defaults to False.
+
+        Returns:
+            dict                                                            : The index of the first path, with the file of each asset
+                                                                            relative to the index.
+        '''
+        jobs = []
+        for filePath, assetBuffers in groups:
+            meshes = []
+            for buffers in assetBuffers.values():
+                meshes.extend(buffers)
+            # A job without root would export the whole scene.
+            if(not meshes):
+                continue
+            jobs.append({
+                "meshes"            : meshes,
+                "startFrame"        : startFrame,
+                "endFrame"          : endFrame,
+                "filePath"          : filePath,
+                "spaceType"         : spaceType,
+                "stripNamespace"    : stripNamespace
+            })
+
+        self.exportAlembics(jobs, exportABCVersion=exportABCVersion)
+
+        indexes = [self.writeAlembicIndex(groups, startFrame, endFrame, path) for path in indexPaths]
+        return indexes[0] if indexes else None
 
     def exportMaterialX(self, asset, lookName, path, lod):
         ''' Publish a material X for asset.
@@ -248,14 +716,14 @@ class PublishTools(object):
             # We do that to fix the object path in the material X file to be sure that is compatible with the alembic path.
             shapeMeshes = {}
             for msh in meshes:
-                mshName = msh.split("|")[-1]
+                mshName = DagPath.get(msh).shortName
                 shapes = [shape for shape in cmds.listRelatives(msh, allDescendents=True, fullPath=True)
                             if cmds.nodeType(shape) == "mesh" and
                             cmds.getAttr("%s.intermediateObject" % shape) == 0]
                 if(len(shapes) > 0):
                     for shape in shapes:
                         print(shape)
-                        shapeName = shape.split("|")[-1]
+                        shapeName = DagPath.get(shape).shortName
                         # We build the correct path to replace it in the material X file.
                         localPath = "|%s%s" % (mshName, shape.split(msh)[-1])
                         # Clean the namespace in the path hierarchy.
@@ -467,8 +935,6 @@ class PublishTools(object):
 
     def hookPublishValidateAsset(self, hookClass, settings, item, propertiesPublishTemplate, resolution="ALL", addFields={}):
 
-        # Get the maya object.
-        mayaObject = self.getItemProperty(item, "mayaObject")
         # # Validate the asset.
         # errors = TechnicalCheck.validateAsset(
         #     mayaObject
@@ -533,6 +999,34 @@ class PublishTools(object):
 
         self.exportMayaAsset(mayaObject, publish_path)
     
+    def hookPublishValidateLODExport(self, hookClass, settings, item, lod, jobType="mayaAssetLOD", isChild=False):
+        ''' Generic implementation of the validate method submitting a LOD export to the export backend.
+        Called by the maya scene LOD and material X plugins once the publish path is set, all the
+        exports run in the workers during the validation and the publish hooks only wait for them.
+        Nothing is done without export backend.
+
+        Args:
+            settings                    (dict):     The keys are strings, matching
+                                                    the keys returned in the settings property. The values are `Setting`
+                                                    instances.
+            item                        (sgUIItem): Item to process
+            lod                         (str):      The LOD to export, "LO", "MI" or "HI".
+            jobType                     (str):      The job type, "mayaAssetLOD" or "materialX".
+        '''
+        if(self._exportBackend is None):
+            return
+
+        # Get the item asset object.
+        if(isChild):
+            asset = item.parent.properties["assetObject"]
+        else:
+            asset = item.properties["assetObject"]
+
+        publish_path = item.properties["path"]
+        hookClass.parent.ensure_folder_exists(os.path.dirname(publish_path))
+
+        self.submitLODExport(item, jobType, asset, lod, publish_path)
+
     def hookPublishMayaSceneLODPublish(self, hookClass, settings, item, lod, isChild=False):
         ''' Generic implementation of the publish method for maya scene publish asset LOD plugin hook.
 
@@ -548,17 +1042,6 @@ class PublishTools(object):
         else:
             asset = item.properties["assetObject"]
 
-        # Delete the meshes lod that we don't need.
-        if(lod == "LO"):
-            asset.deleteMeshesMI()
-            asset.deleteMeshesHI()
-        elif(lod == "MI"):
-            asset.deleteMeshesLO()
-            asset.deleteMeshesHI()
-        elif(lod == "HI"):
-            asset.deleteMeshesLO()
-            asset.deleteMeshesMI()
-
         # get the path to create and publish
         publish_path = item.properties["path"]
 
@@ -566,15 +1049,16 @@ class PublishTools(object):
         publish_folder = os.path.dirname(publish_path)
         hookClass.parent.ensure_folder_exists(publish_folder)
 
-        self.exportMayaAsset(asset, publish_path)
-
-        # Reload the master scene.
-        path = cmds.file(query=True, sn=True)
-        cmds.file(path, force=True, open=True)
+        # Export the asset without the other LODs, the scene is not modified.
+        if(self._exportBackend is not None):
+            # The export is submitted by the validation, the file must exist when the hook registers it.
+            self._exportBackend.wait(self.submitLODExport(item, "mayaAssetLOD", asset, lod, publish_path))
+        else:
+            self.exportMayaAssetLOD(asset, lod, publish_path)
 
     # Asset Rig Publish functions.
 
-    def hookPublishMayaRigPublish(self, hookClass, settings, item, isChild=False):
+    def hookPublishMayaRigPublish(self, hookClass, settings, item, isChild=False, restore=False):
         ''' Generic implementation of the publish method for maya scene publish plugin hook.
 
         Args:
@@ -582,6 +1066,9 @@ class PublishTools(object):
                                                     the keys returned in the settings property. The values are `Setting`
                                                     instances.
             item                        (sgUIItem): Item to process
+            restore                     (bool):     If True, the rig preparation is undone after the export.
+                                                    Otherwise the next rig exports reuse it, and it is undone once
+                                                    by :func:`hookPublishMayaRigFinalize`.
         '''
         # Get the item asset object.
         if(isChild):
@@ -600,11 +1087,11 @@ class PublishTools(object):
         self.exportMayaAssetRig(asset, publish_path)
 
         # As there are modifications between the working file and the published file.
-        # Reload the master scene.
-        path = cmds.file(query=True, sn=True)
-        cmds.file(path, force=True, open=True)
+        # Undo the rig preparation.
+        if(restore):
+            self.restorePreparedRigs()
 
-    def hookPublishMayaRigLODPublish(self, hookClass, settings, item, lod):
+    def hookPublishMayaRigLODPublish(self, hookClass, settings, item, lod, restore=False):
         ''' Generic implementation of the publish method for maya scene publish asset LOD plugin hook.
 
         Args:
@@ -612,20 +1099,12 @@ class PublishTools(object):
                                                     the keys returned in the settings property. The values are `Setting`
                                                     instances.
             item                        (sgUIItem): Item to process
+            restore                     (bool):     If True, the rig preparation is undone after the export.
+                                                    Otherwise the next rig exports reuse it, and it is undone once
+                                                    by :func:`hookPublishMayaRigFinalize`.
         '''
         mayaObject = self.getItemProperty(item, "mayaObject")
 
-        # Delete the meshes lod that we don't need.
-        if(lod == "LO"):
-            mayaObject.deleteMeshesMI()
-            mayaObject.deleteMeshesHI()
-        elif(lod == "MI"):
-            mayaObject.deleteMeshesLO()
-            mayaObject.deleteMeshesHI()
-        elif(lod == "HI"):
-            mayaObject.deleteMeshesLO()
-            mayaObject.deleteMeshesMI()
-
         # get the path to create and publish
         publish_path = item.properties["path"]
 
@@ -633,13 +1112,26 @@ class PublishTools(object):
         publish_folder = os.path.dirname(publish_path)
         hookClass.parent.ensure_folder_exists(publish_folder)
 
-        # Pubish the asset rig.
-        self.exportMayaAssetRig(mayaObject, publish_path)
+        # Pubish the asset rig without the other LODs.
+        self.exportMayaAssetRig(mayaObject, publish_path, lod=lod)
 
         # As there are modifications between the working file and the published file.
-        # Reload the master scene.
-        path = cmds.file(query=True, sn=True)
-        cmds.file(path, force=True, open=True)
+        # Undo the rig preparation.
+        if(restore):
+            self.restorePreparedRigs()
+
+    def hookPublishMayaRigFinalize(self, hookClass, settings, item):
+        ''' Generic implementation of the finalize method for the maya rig publish plugin hooks.
+        The rig preparation shared by the rig exports is undone once, the work scene is only
+        reopened if a rig had child references to import.
+
+        Args:
+            settings                    (dict):     The keys are strings, matching
+                                                    the keys returned in the settings property. The values are `Setting`
+                                                    instances.
+            item                        (sgUIItem): Item to process
+        '''
+        self.restorePreparedRigs()
 
     # Asset Alembic Publish functions.
 
@@ -655,44 +1147,6 @@ class PublishTools(object):
         # Get the maya object in the item properties.
         mayaObject = self.getItemProperty(item, "mayaObject")
 
-        # Get the asset's meshes to export.
-        if(lod == "LO"):
-            # Remove the LOD specification of the meshes.
-            content = cmds.listRelatives(mayaObject.groupMeshesLO, allDescendents=True, fullPath=True, type="transform")
-            content.sort(key = lambda x : len(x.split('|')) , reverse = True)
-            for transform in content:
-                # Get the shortname.
-                shortName = transform.split("|")[-1]
-                # Remove the lod specification.
-                newName = shortName.replace("_low", "")
-                cmds.rename(transform, newName)
-
-            meshes = mayaObject.meshesLO
-        elif(lod == "MI"):
-            # Remove the LOD specification of the meshes.
-            content = cmds.listRelatives(mayaObject.groupMeshesMI, allDescendents=True, fullPath=True, type="transform")
-            content.sort(key = lambda x : len(x.split('|')) , reverse = True)
-            for transform in content:
-                # Get the shortname.
-                shortName = transform.split("|")[-1]
-                # Remove the lod specification.
-                newName = shortName.replace("_mid", "")
-                cmds.rename(transform, newName)
-
-            meshes = mayaObject.meshesMI
-        elif(lod == "HI"):
-            # Remove the LOD specification of the meshes.
-            content = cmds.listRelatives(mayaObject.groupMeshesHI, allDescendents=True, fullPath=True, type="transform")
-            content.sort(key = lambda x : len(x.split('|')) , reverse = True)
-            for transform in content:
-                # Get the shortname.
-                shortName = transform.split("|")[-1]
-                # Remove the lod specification.
-                newName = shortName.replace("_high", "")
-                cmds.rename(transform, newName)
-
-            meshes = mayaObject.meshesHI
-
         if(useFrameRange):
             # Get the scene start and end frame.
             startFrame, endFrame = self.getSceneFrameRange()
@@ -708,21 +1162,41 @@ class PublishTools(object):
         hookClass.parent.ensure_folder_exists(publish_folder)
 
         # Export the asset's meshes in alembic path.
-        self.exportAlembic(
-            meshes,
-            startFrame,
-            endFrame,
-            publish_path,
-            exportABCVersion=2,
-            spaceType="local"
-        )
+        self.exportAlembicLODs(mayaObject, {lod: publish_path}, startFrame, endFrame)
 
-        # As there are modifications between the working file and the published file.
-        # Reload the master scene.
-        path = cmds.file(query=True, sn=True)
-        cmds.file(path, force=True, open=True)
+    def hookPublishAlembicLODsPublish(self, hookClass, settings, items, useFrameRange=False):
+        ''' Publish the alembic of several LODs of an asset in one evaluation of the timeline.
+
+        Args:
+            settings                    (dict):             The keys are strings, matching
+                                                            the keys returned in the settings property. The values are `Setting`
+                                                            instances.
+            items                       (dict(str, sgUIItem)):  The items to process by LOD, "LO", "MI" or "HI".
+        '''
+        if(not items):
+            return
 
-    def hookPublishAlembicAnimationPublish(self, hookClass, settings, item, useFrameRange=False):
+        # The LODs items share the maya object.
+        mayaObject = self.getItemProperty(list(items.values())[0], "mayaObject")
+
+        if(useFrameRange):
+            # Get the scene start and end frame.
+            startFrame, endFrame = self.getSceneFrameRange()
+        else:
+            startFrame = 1
+            endFrame = 1
+
+        # get the paths to create and publish
+        paths = {}
+        for lod, item in items.items():
+            paths[lod] = item.properties["path"]
+            # ensure the publish folder exists:
+            hookClass.parent.ensure_folder_exists(os.path.dirname(paths[lod]))
+
+        # Export all the LODs in one command.
+        self.exportAlembicLODs(mayaObject, paths, startFrame, endFrame)
+
+    def hookPublishAlembicAnimationPublish(self, hookClass, settings, item, useFrameRange=False, rollback=False, transaction=None):
         ''' Publish the deformation of the animated assets.
 
         Args:
@@ -730,76 +1204,25 @@ class PublishTools(object):
                                                     the keys returned in the settings property. The values are `Setting`
                                                     instances.
             item                        (sgUIItem): Item to process
+            rollback                    (bool):     If True, the scene mutations are rolled back after the export.
+            transaction                 (:class:`PublishTransaction`):  The transaction recording the mutations.
+                                                    If None, a new transaction is used.
         '''
+        if(transaction is None):
+            with PublishTransaction("P3D publish animation", rollback=rollback) as transaction:
+                return self.hookPublishAlembicAnimationPublish(
+                    hookClass,
+                    settings,
+                    item,
+                    useFrameRange   = useFrameRange,
+                    transaction     = transaction
+                )
+
         # Get the maya object.
         mayaObject = self.getItemProperty(item, "mayaObject")
 
-        # Switch the current reference to the highest LOD.
-
-        if(mayaObject.referenceNode):
-
-            # Get the path of the reference.
-            referencePath = os.path.normpath(mayaObject.referencePath)
-            # Use the maya_asset_rig_publish template to extract the data from the path.
-            template = hookClass.parent.get_template_by_name("maya_asset_rig_publish")
-            # Get the fields from the path.
-            fields = template.get_fields(referencePath)
-
-            higestLODFile = referencePath
-            highestLOD = fields.get("lod")
-            for lod in ["high", "mid", "low"]:
-                # Check if the file exists.
-                fields["lod"] = lod
-                lodFile = template.apply_fields(fields)
-                if(os.path.exists(lodFile)):
-                    higestLODFile = lodFile
-                    highestLOD = lod
-                    break
-            
-            # Switch the reference to the highest LOD.
-            mayaObject.referencePath = higestLODFile
-
-            # Import the reference.
-            ref = mayaObject.referenceNode
-            refFile = cmds.referenceQuery(ref, filename=True)
-            cmds.file(refFile, importReference=True)
-
         # Get the asset's meshes to export.
-        if(mayaObject.meshesHI):
-            # Remove the LOD specification of the meshes.
-            content = cmds.listRelatives(mayaObject.groupMeshesHI, allDescendents=True, fullPath=True, type="transform")
-            content.sort(key = lambda x : len(x.split('|')) , reverse = True)
-            for transform in content:
-                # Get the shortname.
-                shortName = transform.split("|")[-1]
-                # Remove the lod specification.
-                newName = shortName.replace("_high", "")
-                cmds.rename(transform, newName)
-            meshes = mayaObject.meshesHI
-            
-        elif(mayaObject.meshesMI):
-            # Remove the LOD specification of the meshes.
-            content = cmds.listRelatives(mayaObject.groupMeshesMI, allDescendents=True, fullPath=True, type="transform")
-            content.sort(key = lambda x : len(x.split('|')) , reverse = True)
-            for transform in content:
-                # Get the shortname.
-                shortName = transform.split("|")[-1]
-                # Remove the lod specification.
-                newName = shortName.replace("_mid", "")
-                cmds.rename(transform, newName)
-            meshes = mayaObject.meshesMI
-
-        elif(mayaObject.meshesLO):
-            # Remove the LOD specification of the meshes.
-            content = cmds.listRelatives(mayaObject.groupMeshesLO, allDescendents=True, fullPath=True, type="transform")
-            content.sort(key = lambda x : len(x.split('|')) , reverse = True)
-            for transform in content:
-                # Get the shortname.
-                shortName = transform.split("|")[-1]
-                # Remove the lod specification.
-                newName = shortName.replace("_low", "")
-                cmds.rename(transform, newName)
-            meshes = mayaObject.meshesLO
+        meshes = self.prepareAnimationExport(hookClass, mayaObject, transaction)
 
         # Define the export frame range.
         if(useFrameRange):
@@ -826,10 +1249,91 @@ class PublishTools(object):
             spaceType="local"
         )
 
-        # # As there are modifications between the working file and the published file.
-        # # Reload the master scene.
-        # path = cmds.file(query=True, sn=True)
-        # cmds.file(path, force=True, open=True)
+    def hookPublishAlembicAnimationFanOutPublish(self, hookClass, settings, items, useFrameRange=False, rollback=False):
+        ''' Publish the deformation of several animated assets in one evaluation of the timeline.
+        Each item gets its alembic, and an index of all the files is written in the folder of each item.
+        The index path of its folder is stored in the "alembicIndex" property of each item.
+
+        Args:
+            settings                    (dict):             The keys are strings, matching
+                                                            the keys returned in the settings property. The values are `Setting`
+                                                            instances.
+            items                       (list(sgUIItem)):   Items to process
+            rollback                    (bool):             If True, the scene mutations are rolled back after the export.
+
+        Returns:
+            dict                                            : The index of the alembic files.
+        '''
+        if(not items):
+            return None
+
+        # Define the export frame range.
+        if(useFrameRange):
+            # Get the scene start and end frame.
+            startFrame, endFrame = self.getSceneFrameRange()
+        else:
+            startFrame = 1
+            endFrame = 1
+
+        with PublishTransaction("P3D publish animation fan-out", rollback=rollback) as transaction:
+            groups = []
+            for item in items:
+                mayaObject = self.getItemProperty(item, "mayaObject")
+                meshes = self.prepareAnimationExport(hookClass, mayaObject, transaction)
+
+                publish_path = item.properties["path"]
+                hookClass.parent.ensure_folder_exists(os.path.dirname(publish_path))
+                groups.append((publish_path, {mayaObject.fullname: meshes}))
+
+            # The items can be published in different folders.
+            indexPaths = [os.path.join(os.path.dirname(item.properties["path"]), self.ALEMBIC_INDEX_NAME) for item in items]
+            index = self.exportAlembicFanOut(groups, startFrame, endFrame, sorted(set(indexPaths)), stripNamespace=True)
+
+        for item, indexPath in zip(items, indexPaths):
+            item.properties["alembicIndex"] = indexPath
+        return index
+
+    def prepareAnimationExport(self, hookClass, mayaObject, transaction):
+        ''' Prepare an animated asset for the alembic export.
+        The reference is switched to the highest LOD and imported, and the LOD tags are removed from the mesh names.
+
+        Args:
+            mayaObject  (:class:`MayaAsset`)            : The animated asset.
+            transaction (:class:`PublishTransaction`)   : The transaction recording the mutations.
+
+        Returns:
+            list(str)                                   : The meshes to export.
+        '''
+        # Switch the current reference to the highest LOD.
+
+        if(mayaObject.referenceNode):
+
+            # Get the path of the reference.
+            referencePath = os.path.normpath(mayaObject.referencePath)
+            # Use the maya_asset_rig_publish template to find the LOD files.
+            template = hookClass.parent.get_template_by_name("maya_asset_rig_publish")
+            switcher = MayaLODSwitcher(template)
+            # Get the highest existing LOD, with one listing of the publish folder.
+            higestLODFile, highestLOD = switcher.resolve(referencePath)
+
+            # Switch the reference to the highest LOD, if not already loaded.
+            if(higestLODFile):
+                transaction.reloadReferences({mayaObject.referenceNode: higestLODFile})
+
+            # Import the reference.
+            transaction.importReference(mayaObject.referenceNode)
+            # The asset nodes are no longer referenced.
+            mayaObject.invalidateHierarchy()
+
+        # Get the asset's meshes to export, from the highest LOD.
+        for lod in ["HI", "MI", "LO"]:
+            if(getattr(mayaObject, "meshes" + lod)):
+                # Remove the LOD specification of the meshes.
+                plan = self.getLODSpecificationPlan(mayaObject, getattr(mayaObject, "groupMeshes" + lod), self.LOD_TAGS[lod])
+                transaction.applyRenamePlan(plan, asset=mayaObject)
+                return getattr(mayaObject, "meshes" + lod)
+
+        return []
 
     # MaterialX Publish functions.
 
@@ -855,7 +1359,11 @@ class PublishTools(object):
         publish_folder = os.path.dirname(publish_path)
         hookClass.parent.ensure_folder_exists(publish_folder)
 
-        self.exportMaterialX(asset, "default", publish_path, lod)
+        if(self._exportBackend is not None):
+            # The export is submitted by the validation, the file must exist when the hook registers it.
+            self._exportBackend.wait(self.submitLODExport(item, "materialX", asset, lod, publish_path))
+        else:
+            self.exportMaterialX(asset, "default", publish_path, lod)
 
     # Environment Publish functions.
     
@@ -883,9 +1391,41 @@ class PublishTools(object):
 
         self.exportMayaEnvironment(mayaObject, publish_path)
 
+    def publishAlembicFanOut(self, hookClass, item, assetBuffers, startFrame, endFrame, groupSize=1):
+        ''' Publish an alembic by group of assets in one evaluation of the timeline.
+        The alembic files and their index are written in a folder named as the item publish path without extension.
+        The item publish path is replaced by the index path, so the index is registered as the published file.
+        The index path is also stored in the "alembicIndex" item property.
+
+        Args:
+            item            (sgUIItem)                      : Item to process.
+            assetBuffers    (list(tuple(str, list(str))))   : The asset root and its buffers to export.
+            startFrame      (int)                           : The first frame of the export.
+            endFrame        (int)                           : The last frame of the export.
+            groupSize       (int,   optional)               : The number of assets by file. Defaults to 1.
+
+        Returns:
+            dict                                            : The index of the alembic files.
+        '''
+        folder = os.path.splitext(item.properties["path"])[0]
+        hookClass.parent.ensure_folder_exists(folder)
+
+        indexPath = os.path.join(folder, self.ALEMBIC_INDEX_NAME)
+        index = self.exportAlembicFanOut(
+            self.getAlembicFanOutGroups(assetBuffers, folder, groupSize=groupSize),
+            startFrame,
+            endFrame,
+            [indexPath]
+        )
+        # The fan-out does not write the item publish path, the index is published instead.
+        item.properties["path"]         = sgtk.util.ShotgunPath.normalize(indexPath)
+        item.properties["publish_path"] = item.properties["path"]
+        item.properties["alembicIndex"] = indexPath
+        return index
+
     # Environment Alembic Publish functions.
 
-    def hookPublishAlembicEnvironmentPublish(self, hookClass, settings, item, useFrameRange=False, isChild=False):
+    def hookPublishAlembicEnvironmentPublish(self, hookClass, settings, item, useFrameRange=False, isChild=False, fanOut=False, groupSize=1):
         ''' Generic implementation of the publish method for alembic publish environment plugin hook.
 
         Args:
@@ -893,6 +1433,8 @@ class PublishTools(object):
                                                     the keys returned in the settings property. The values are `Setting`
                                                     instances.
             item                        (sgUIItem): Item to process
+            fanOut                      (bool):     If True, an alembic is written by group of assets, see :func:`publishAlembicFanOut`.
+            groupSize                   (int):      The number of assets by alembic of the fan-out.
         '''
         # Get the item maya object.
         if(isChild):
@@ -919,10 +1461,16 @@ class PublishTools(object):
         # Get the environment's asset's main buffers.
         # Get the assets to export.
         assets = self.getItemProperty(item, "assets")
+
+        if(fanOut):
+            assetBuffers = [(asset.fullname, mayaObject.getAnalysis().getMainBuffers(asset)) for asset in assets]
+            self.publishAlembicFanOut(hookClass, item, assetBuffers, startFrame, endFrame, groupSize=groupSize)
+            return
+
         # Get the main buffers of the assets.
         meshes = []
         for asset in assets:
-            mainBuffers = mayaObject.getAssetMainBuffers(asset)
+            mainBuffers = mayaObject.getAnalysis().getMainBuffers(asset)
             meshes.extend( mainBuffers )
 
         # Export the buffers as alembic.
@@ -936,7 +1484,7 @@ class PublishTools(object):
             stripNamespace=False
         )
 
-    def hookPublishAlembicAnimationEnvironmentPublish(self, hookClass, settings, item, useFrameRange=False):
+    def hookPublishAlembicAnimationEnvironmentPublish(self, hookClass, settings, item, useFrameRange=False, fanOut=False, groupSize=1):
         ''' Generic implementation of the publish method for alembic publish environment plugin hook.
 
         Args:
@@ -944,6 +1492,8 @@ class PublishTools(object):
                                                     the keys returned in the settings property. The values are `Setting`
                                                     instances.
             item                        (sgUIItem): Item to process
+            fanOut                      (bool):     If True, an alembic is written by group of assets, see :func:`publishAlembicFanOut`.
+            groupSize                   (int):      The number of assets by alembic of the fan-out.
         '''
         # Get the item maya object.
         mayaObject = self.getItemProperty(item, "mayaObject")
@@ -962,13 +1512,19 @@ class PublishTools(object):
         publish_folder = os.path.dirname(publish_path)
         hookClass.parent.ensure_folder_exists(publish_folder)
 
-        # Get the buffers of the animated assets.
-        meshes = []
         # Get the animated assets in the properties.
         animatedAssets = self.getItemProperty(item, "animatedAssets")
+
+        if(fanOut):
+            assetBuffers = [(asset.fullname, mayaObject.getAnalysis().getMainBuffers(asset)) for asset in animatedAssets]
+            self.publishAlembicFanOut(hookClass, item, assetBuffers, startFrame, endFrame, groupSize=groupSize)
+            return
+
+        # Get the buffers of the animated assets.
+        meshes = []
         # Check if the animated assets exists.
         for asset in animatedAssets:
-            meshes.extend( mayaObject.getAssetMainBuffers(asset) )
+            meshes.extend( mayaObject.getAnalysis().getMainBuffers(asset) )
 
         # Export the buffers as alembic.
         self.exportAlembic(
@@ -981,7 +1537,7 @@ class PublishTools(object):
             stripNamespace=False
         )
 
-    def hookPublishAlembicDeformationEnvironmentPublish(self, hookClass, settings, item, useFrameRange=False):
+    def hookPublishAlembicDeformationEnvironmentPublish(self, hookClass, settings, item, useFrameRange=False, rollback=False):
         ''' Publish the deformation of the animated assets.
 
         Args:
@@ -989,24 +1545,25 @@ class PublishTools(object):
                                                     the keys returned in the settings property. The values are `Setting`
                                                     instances.
             item                        (sgUIItem): Item to process
+            rollback                    (bool):     If True, the scene mutations are rolled back after the export.
         '''
-        # Get the environment and the asset objects.
+        # Get the environment object.
         environmentObject = self.getItemProperty(item, "environmentObject")
-        assetObject = self.getItemProperty(item, "mayaObject")
 
-        # Import the environment reference.
-        ref = environmentObject.referenceNode
-        if(ref):
-            refFile = cmds.referenceQuery(ref, filename=True)
-            cmds.file(refFile, importReference=True)
-
-        # Execute the animated asset publish.
-        self.hookPublishAlembicAnimationPublish(
-            hookClass,
-            settings,
-            item,
-            useFrameRange   = useFrameRange
-        )
+        with PublishTransaction("P3D publish environment deformation", rollback=rollback) as transaction:
+            # Import the environment reference.
+            ref = environmentObject.referenceNode
+            if(ref):
+                transaction.importReference(ref)
+
+            # Execute the animated asset publish.
+            self.hookPublishAlembicAnimationPublish(
+                hookClass,
+                settings,
+                item,
+                useFrameRange   = useFrameRange,
+                transaction     = transaction
+            )
 
     # Post Publish functions.
 
@@ -1091,7 +1648,7 @@ class PublishTools(object):
         # Get the file path to the review file.
         filePath = item.properties.get("path")
 
-        # Check if the file exist.
+        # Check if the file exist, the freshly written file is not checked through the cache.
         if(not os.path.exists(filePath)):
             error_msg = "The file {} does not exist.".format(filePath)
             hookClass.logger.error(error_msg)
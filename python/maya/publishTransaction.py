@@ -0,0 +1,328 @@
+import  time
+
+try:
+    from    maya import cmds
+except:
+    pass
+
+from .mayaInventory     import MayaSceneInventory
+from .mayaLODSwitcher   import MayaLODSwitcher
+
+
+class PublishTransaction(object):
+    ''' Scene mutations of a publish step, rolled back to the original scene state.
+    The mutations are recorded in a journal. A mutation in the undo queue is made in its own
+    undo chunk, a mutation with a revert function is made with the undo queue suspended, so
+    the queue only holds the chunks of the journal. On rollback the journal is replayed
+    strictly in reverse, each chunk is undone and each revert function is called in turn.
+    The scene is reopened when a mutation can neither be undone nor reverted, as a reference
+    import, or when the undo queue no longer matches the journal.
+
+    Example:
+        with PublishTransaction("P3D publish alembic") as transaction:
+            transaction.deleteMeshes(asset, "HI")
+            ...export...
+    '''
+
+    # The prefix of the undo chunks.
+    CHUNK_NAME  = "P3D publish transaction"
+
+    # The number of chunks of the session, to give them unique names.
+    _chunkCount = 0
+
+    def __init__(self, name="P3D publish", rollback=True):
+        ''' Initialize the transaction.
+
+        Args:
+            name        (str,   optional)   : The name of the transaction in the logs.
+                                            Defaults to "P3D publish".
+            rollback    (bool,  optional)   : If True, the scene is rolled back when the context exits.
+                                            Otherwise it is only rolled back on an exception.
+                                            Defaults to True.
+        '''
+        self._name          = name
+        self._autoRollback  = rollback
+        self._journal       = []
+        self._timings       = {}
+        self._scenePath     = None
+        self._undoState     = None
+        self._startTime     = None
+        self._rolledBack    = False
+
+    def __enter__(self):
+        return self.begin()
+
+    def __exit__(self, excType, excValue, traceback):
+        if(excType is not None or self._autoRollback):
+            self.rollback()
+        else:
+            self.commit()
+        # The exceptions are not swallowed.
+        return False
+
+    # STATE
+
+    def begin(self):
+        ''' Start the transaction.
+
+        Returns:
+            :class:`PublishTransaction` : The transaction.
+        '''
+        self._scenePath = cmds.file(query=True, sceneName=True)
+        # The undo queue is needed for the rollback.
+        self._undoState = cmds.undoInfo(query=True, state=True)
+        if(not self._undoState):
+            cmds.undoInfo(state=True)
+        self._startTime = time.time()
+        return self
+
+    def _endSteps(self):
+        ''' Keep the time spent in the mutations, once.
+        '''
+        if(self._startTime is not None and "steps" not in self._timings):
+            self._timings["steps"] = time.time() - self._startTime
+
+    def _restoreUndoState(self):
+        ''' Restore the state of the undo queue before the transaction.
+        '''
+        if(self._undoState is False):
+            cmds.undoInfo(state=False)
+
+    def commit(self):
+        ''' Keep the mutations, they can still be rolled back later.
+        '''
+        self._endSteps()
+        # The kept renames are not in the scene inventory.
+        if(any(entry["operation"] == "rename" for entry in self._journal)):
+            MayaSceneInventory.markStale()
+
+    # JOURNAL
+
+    @classmethod
+    def _runWithoutUndo(cls, function, args=()):
+        ''' Run a function with the undo queue suspended, without flushing it.
+
+        Args:
+            function    (callable)          : The function.
+            args        (tuple, optional)   : The arguments of the function. Defaults to ().
+
+        Returns:
+            object                          : The result of the function.
+        '''
+        cmds.undoInfo(stateWithoutFlush=False)
+        try:
+            return function(*args)
+        finally:
+            cmds.undoInfo(stateWithoutFlush=True)
+
+    def record(self, operation, target=None, undoable=True, revert=None, duration=0.0, chunk=None):
+        ''' Record a mutation in the journal.
+
+        Args:
+            operation   (str)                   : The operation name.
+            target      (str,   optional)       : The mutated node or file. Defaults to None.
+            undoable    (bool,  optional)       : True if the mutation is in the undo queue. Defaults to True.
+            revert      (callable,  optional)   : The function reverting a mutation out of the undo queue.
+                                                Defaults to None.
+            duration    (float, optional)       : The time spent in the mutation, in seconds. Defaults to 0.
+            chunk       (str,   optional)       : The undo chunk of the mutation. Defaults to None.
+        '''
+        self._journal.append({
+            "operation" : operation,
+            "target"    : target,
+            "undoable"  : undoable,
+            "revert"    : revert,
+            "duration"  : duration,
+            "chunk"     : chunk
+        })
+
+    def run(self, operation, function, args=(), target=None, undoable=True, revert=None):
+        ''' Run a mutation and record it in the journal.
+        The mutation is recorded even if it fails, as it can be partially applied.
+
+        Args:
+            operation   (str)                   : The operation name.
+            function    (callable)              : The mutation.
+            args        (tuple, optional)       : The arguments of the mutation. Defaults to ().
+            target      (str,   optional)       : The mutated node or file. Defaults to None.
+            undoable    (bool,  optional)       : True if the mutation is in the undo queue, it is made in its
+                                                own undo chunk. Defaults to True.
+            revert      (callable,  optional)   : The function reverting a mutation out of the undo queue,
+                                                the mutation and its revert are made with the undo queue suspended.
+                                                Defaults to None.
+
+        Returns:
+            object                              : The result of the mutation.
+        '''
+        if(undoable and revert is not None):
+            raise Exception("The undoable mutation '%s' is rolled back by the undo queue, it can not have a revert function." % operation)
+
+        startTime   = time.time()
+        chunk       = None
+        try:
+            if(undoable):
+                PublishTransaction._chunkCount += 1
+                chunk = "%s %d" % (self.CHUNK_NAME, PublishTransaction._chunkCount)
+                cmds.undoInfo(openChunk=True, chunkName=chunk)
+                try:
+                    return function(*args)
+                finally:
+                    cmds.undoInfo(closeChunk=True)
+            if(revert is not None):
+                # Keep the reverted mutations out of the undo queue, so they do not hide the chunks.
+                return self._runWithoutUndo(function, args)
+            return function(*args)
+        finally:
+            self.record(operation, target=target, undoable=undoable, revert=revert, duration=time.time() - startTime, chunk=chunk)
+
+    # MUTATIONS
+
+    def deleteMeshes(self, asset, lod):
+        ''' Delete the meshes of a LOD of the asset.
+
+        Args:
+            asset   (:class:`MayaAsset`)    : The asset.
+            lod     (str)                   : The LOD, "LO", "MI" or "HI".
+        '''
+        self.run("deleteMeshes" + lod, getattr(asset, "deleteMeshes" + lod), target=asset.fullname)
+
+    def applyRenamePlan(self, plan, asset=None):
+        ''' Apply a rename plan, it is reverted on rollback.
+        The scene inventory is not updated, it is marked stale if the transaction is committed.
+
+        Args:
+            plan    (:class:`MayaRenamePlan`)       : The rename plan.
+            asset   (:class:`MayaAsset`, optional)  : The renamed asset, its hierarchy is dropped.
+                                                    Defaults to None.
+
+        Returns:
+            dict                                    : The time spent in each phase of the rename, in seconds.
+        '''
+        def revert():
+            plan.revert()
+            if(asset is not None):
+                asset.invalidateHierarchy()
+
+        # The plan also renames the reference namespaces, which are only restored by the plan.
+        timings = self.run("rename", plan.apply, target=asset.fullname if asset else None, undoable=False, revert=revert)
+        if(asset is not None):
+            asset.invalidateHierarchy()
+        return timings
+
+    def reloadReferences(self, targets, resolve=None):
+        ''' Reload references on new files, the previous files are reloaded on rollback.
+
+        Args:
+            targets (dict(str, str))        : The target published file by reference node.
+            resolve (callable,  optional)   : The function giving the file to load for a published file.
+                                            Defaults to None.
+
+        Returns:
+            dict                            : The reload report, see :func:`MayaLODSwitcher.reload`.
+        '''
+        # The loaded files, the local copies of the publish cache included.
+        previous    = dict((refNode, cmds.referenceQuery(refNode, filename=True, withoutCopyNumber=True)) for refNode in targets)
+        report      = {}
+
+        def reload():
+            report.update(MayaLODSwitcher.reload(targets, resolve=resolve))
+            return report
+
+        def revert():
+            for refNode in report.get("switched", {}):
+                cmds.file(previous[refNode], loadReference=refNode, type=MayaLODSwitcher.getFileType(previous[refNode]))
+
+        return self.run("reloadReferences", reload, target=", ".join(sorted(targets)), undoable=False, revert=revert)
+
+    def importReference(self, refNode):
+        ''' Import a reference, it can not be undone.
+
+        Args:
+            refNode (str)   : The reference node.
+        '''
+        refFile = cmds.referenceQuery(refNode, filename=True)
+        self.run("importReference", lambda : cmds.file(refFile, importReference=True), target=refFile, undoable=False)
+
+    def importChildReferences(self, asset):
+        ''' Import the references of the asset, it can not be undone.
+
+        Args:
+            asset   (:class:`MayaAsset`)    : The asset.
+        '''
+        self.run("importChildReferences", asset.importChildReferences, target=asset.fullname, undoable=False)
+
+    def freezeNamespace(self, asset):
+        ''' Bake the namespaces of the asset, it is reverted on rollback.
+
+        Args:
+            asset   (:class:`MayaAsset`)    : The asset.
+
+        Returns:
+            dict                            : The time spent in each phase of the rename, in seconds.
+        '''
+        cmds.namespace(setNamespace=":")
+        return self.applyRenamePlan(asset.getFreezeNamespacePlan(), asset=asset)
+
+    # ROLLBACK
+
+    @property
+    def requiresReopen(self):
+        return any(not entry["undoable"] and entry["revert"] is None for entry in self._journal)
+
+    def reopen(self):
+        ''' Reopen the scene of the transaction, the mutations are discarded.
+        '''
+        self._endSteps()
+        if(not self._scenePath):
+            print("WARNING : The publish transaction '%s' can not reopen an untitled scene." % self._name)
+            return
+        cmds.file(self._scenePath, force=True, open=True)
+        self._rolledBack = True
+
+    def rollback(self):
+        ''' Roll back the mutations of the transaction, the last first.
+        The scene is reopened only if a mutation can neither be undone nor reverted.
+
+        Returns:
+            str     : The rollback method, "undo", "reopen" or None if there was nothing to roll back.
+        '''
+        self._endSteps()
+        if(self._rolledBack or not self._journal):
+            self._restoreUndoState()
+            return None
+
+        startTime = time.time()
+        method = "reopen" if self.requiresReopen else "undo"
+        if(method == "undo"):
+            for entry in reversed(self._journal):
+                if(not entry["undoable"]):
+                    self._runWithoutUndo(entry["revert"])
+                    continue
+                # The chunk of the mutation must be the next one of the queue.
+                if(cmds.undoInfo(query=True, undoName=True) != entry["chunk"]):
+                    method = "reopen"
+                    break
+                cmds.undo()
+
+        if(method == "reopen"):
+            self.reopen()
+        self._rolledBack = True
+        self._restoreUndoState()
+
+        self._timings["rollback"] = time.time() - startTime
+        print("%s : %d mutation(s) rolled back by %s in %.3f seconds." % (
+            self._name, len(self._journal), method, self._timings["rollback"]
+        ))
+        return method
+
+    @property
+    def journal(self):
+        return [dict((key, value) for key, value in entry.items() if key != "revert") for entry in self._journal]
+
+    @property
+    def timings(self):
+        return dict(self._timings)
+
+    @property
+    def rolledBack(self):
+        return self._rolledBack
@@ -3,6 +3,8 @@ try:
 except:
     pass
 
+from    ..dagPath       import  DagPath
+
 class ObjectTechnicalCheck:
     ''' Base class for technical check.'''
 
@@ -117,10 +119,8 @@ class ObjectTechnicalCheck:
         Returns:
             bool: True if the name is valid.
         '''
-        # Get the last part of the node.
-        nodeName = node.split('|')[-1]
-        # Remove the namespace.
-        nodeName = nodeName.split(':')[-1]
+        # Get the last part of the node without namespace.
+        nodeName = DagPath.get(node).name
         # Get the template from the node name.
         template = cls.getTemplateFromName(nodeName)
         # Check if the template is valid.
@@ -3,6 +3,7 @@ try:
     from    maya            import  cmds
 
     from    ..mayaAsset     import  MayaAsset
+    from    ..dagPath       import  DagPath
 
     from    .groupCheck     import  GroupTechnicalCheck
     from    .bufferCheck    import  BufferTechnicalCheck
@@ -89,7 +90,7 @@ class TechnicalCheck():
         for node in content:
 
             # Get the node shot name without namespace.
-            nodeName = node.split('|')[-1].split(':')[-1]
+            nodeName = DagPath.get(node).name
 
             # Check if the node is a transform.
             if(not cmds.nodeType(node) == 'transform'):
@@ -97,7 +98,7 @@ class TechnicalCheck():
                 # Get the node parent.
                 parent = cmds.listRelatives(node, parent=True, fullPath=True)[0]
                 # Get the parent node name.
-                parentName = parent.split('|')[-1].split(':')[-1]
+                parentName = DagPath.get(parent).name
 
                 # Check if the shape name is correct.
                 if(not (nodeName.endswith('Shape') or nodeName.endswith('ShapeOrig'))):
@@ -288,7 +289,7 @@ class TechnicalCheck():
         # Get the parent of the shape.
         parent = cmds.listRelatives(shapeNode, parent=True)[0]
         # Get the shot name.
-        parent = parent.split('|')[-1]
+        parent = DagPath.get(parent).shortName
         # Check if the shape has Orig at the end of its name.
         if(shapeNode.endswith("Orig")):
             # Rename the shape.
@@ -0,0 +1,3 @@
+from .pathResolver  import PathResolver
+from .publishCache  import PublishCache
+from .exportPool    import ExportPool
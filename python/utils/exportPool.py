@@ -0,0 +1,162 @@
+import  json
+import  os
+import  subprocess
+import  tempfile
+import  threading
+import  time
+
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ExportPool(object):
+    ''' Pool of worker processes running export jobs.
+    Each job is written as a json file and run by a worker script in its own process, as
+    "<executable> <workerScript> <jobFile>". The worker writes its result json next to the job
+    and exits with a non zero code on failure. The output of each attempt goes to the job log.
+    The failed and timed out jobs are run again up to the number of retries.
+    Any script following this protocol can be used as worker, for instance a stand-in run by
+    the local python to test the pool without Maya.
+    '''
+
+    def __init__(self, executable, workerScript, poolSize=None, timeout=3600.0, retries=1, logFolder=None, env=None):
+        ''' Initialize the pool.
+
+        Args:
+            executable      (str)               : The interpreter running the worker script, mayapy for the Maya exports.
+            workerScript    (str)               : The worker script.
+            poolSize        (int,   optional)   : The number of worker processes, the number of cores minus one by default.
+                                                Defaults to None.
+            timeout         (float, optional)   : The maximum time of a job attempt, in seconds.
+                                                Defaults to 3600.
+            retries         (int,   optional)   : The number of attempts after a failure.
+                                                Defaults to 1.
+            logFolder       (str,   optional)   : The folder of the job files and logs, a temporary folder by default.
+                                                Defaults to None.
+            env             (dict,  optional)   : The environment of the workers, the current one by default.
+                                                Defaults to None.
+        '''
+        if(poolSize is None):
+            poolSize = max(1, (os.cpu_count() or 2) - 1)
+
+        self._executable    = executable
+        self._workerScript  = workerScript
+        self._poolSize      = poolSize
+        self._timeout       = timeout
+        self._retries       = retries
+        self._env           = env
+        self._executor      = ThreadPoolExecutor(max_workers=poolSize)
+        self._lock          = threading.Lock()
+        self._count         = 0
+
+        self._logFolder = logFolder or tempfile.mkdtemp(prefix="p3d_export_")
+        if(not os.path.isdir(self._logFolder)):
+            os.makedirs(self._logFolder)
+
+    # JOBS
+
+    def _getJobId(self, jobType):
+        ''' Get a unique id for a job.
+
+        Args:
+            jobType (str)   : The job type.
+
+        Returns:
+            str             : The job id.
+        '''
+        with self._lock:
+            self._count += 1
+            return "%04d_%s" % (self._count, jobType)
+
+    def _run(self, job):
+        ''' Run a job in a worker process, with the retries.
+
+        Args:
+            job     (dict)  : The job.
+
+        Returns:
+            dict            : The result of the job.
+        '''
+        jobPath     = os.path.join(self._logFolder, job["id"] + ".job.json")
+        logPath     = os.path.join(self._logFolder, job["id"] + ".log")
+        resultPath  = os.path.join(self._logFolder, job["id"] + ".result.json")
+        job["resultPath"] = resultPath
+        with open(jobPath, "w") as f:
+            json.dump(job, f, indent=4)
+
+        startTime   = time.time()
+        error       = None
+        attempt     = 0
+        for attempt in range(1, self._retries + 2):
+            if(os.path.isfile(resultPath)):
+                os.remove(resultPath)
+
+            with open(logPath, "a") as log:
+                log.write("=== Attempt %d : %s %s %s\n" % (attempt, self._executable, self._workerScript, jobPath))
+                log.flush()
+                try:
+                    process = subprocess.run(
+                        [self._executable, self._workerScript, jobPath],
+                        stdout  = log,
+                        stderr  = subprocess.STDOUT,
+                        timeout = self._timeout,
+                        env     = self._env
+                    )
+                except subprocess.TimeoutExpired:
+                    # The worker is killed by subprocess.
+                    error = "The job timed out after %s seconds." % self._timeout
+                    log.write("=== %s\n" % error)
+                    continue
+
+            result = {}
+            if(os.path.isfile(resultPath)):
+                with open(resultPath, "r") as f:
+                    result = json.load(f)
+            if(process.returncode == 0 and result.get("status") == "ok"):
+                result.update({
+                    "id"        : job["id"],
+                    "log"       : logPath,
+                    "attempts"  : attempt,
+                    "duration"  : time.time() - startTime
+                })
+                return result
+            error = result.get("error") or "The worker exited with the code %d." % process.returncode
+
+        raise Exception("The export job '%s' failed after %d attempt(s): %s\nSee the log '%s'." % (
+            job["id"], attempt, error, logPath
+        ))
+
+    def submit(self, jobType, args, scene=None):
+        ''' Submit an export job.
+
+        Args:
+            jobType (str)               : The job type, known by the worker script.
+            args    (dict)              : The json serializable arguments of the job.
+            scene   (str,   optional)   : The scene opened by the worker. Defaults to None.
+
+        Returns:
+            Future                      : The job in progress, its result is the result dict of the worker.
+        '''
+        job = {
+            "id"    : self._getJobId(jobType),
+            "type"  : jobType,
+            "scene" : scene,
+            "args"  : args
+        }
+        return self._executor.submit(self._run, job)
+
+    def shutdown(self, wait=True):
+        ''' Stop the pool.
+
+        Args:
+            wait    (bool,  optional)   : If True, wait for the jobs in progress.
+                                        Defaults to True.
+        '''
+        self._executor.shutdown(wait=wait)
+
+    @property
+    def logFolder(self):
+        return self._logFolder
+
+    @property
+    def poolSize(self):
+        return self._poolSize
@@ -0,0 +1,224 @@
+import  os
+import  stat
+import  threading
+import  time
+
+
+class PathResolver(object):
+    ''' Cached file system queries for the load and publish tools.
+    The results of the stat calls are kept for a time to live, the missing paths too with
+    a shorter one, so the same publish file is not checked again on the network storage.
+    The paths of a same folder can be answered from a single directory listing.
+    The paths are compared normalized and with the case of the platform, as os.path.normcase.
+    The tools creating or removing files must invalidate their paths.
+    '''
+
+    # The resolver shared by the tools of the session.
+    _resolver = None
+
+    def __init__(self, ttl=60.0, negativeTtl=10.0):
+        ''' Initialize the resolver.
+
+        Args:
+            ttl         (float, optional)   : The time to keep the existing paths, in seconds.
+                                            Defaults to 60.
+            negativeTtl (float, optional)   : The time to keep the missing paths, in seconds.
+                                            Defaults to 10.
+        '''
+        self._ttl           = ttl
+        self._negativeTtl   = negativeTtl
+        # The stat result by path, None if the path does not exist, with the query time.
+        self._stats         = {}
+        # The directory entries by folder, None if the folder does not exist, with the query time.
+        self._listings      = {}
+        self._lock          = threading.Lock()
+
+    @classmethod
+    def get(cls):
+        ''' Get the resolver shared by the tools.
+
+        Returns:
+            :class:`PathResolver`   : The resolver.
+        '''
+        if(cls._resolver is None):
+            cls._resolver = cls()
+        return cls._resolver
+
+    @classmethod
+    def normalize(cls, path):
+        ''' Get the key of a path in the cache.
+
+        Args:
+            path    (str)   : The path.
+
+        Returns:
+            str             : The normalized path, lower case on the platforms ignoring the case.
+        '''
+        return os.path.normcase(os.path.normpath(path))
+
+    def _isFresh(self, entry):
+        ''' Check if a cached entry can still be used.
+
+        Args:
+            entry   (tuple) : The query time and the cached value.
+
+        Returns:
+            bool            : True if the entry is still valid.
+        '''
+        queryTime, value = entry
+        ttl = self._ttl if value is not None else self._negativeTtl
+        return time.time() - queryTime < ttl
+
+    def stat(self, path):
+        ''' Get the stat of a path.
+
+        Args:
+            path    (str)   : The path.
+
+        Returns:
+            os.stat_result  : The stat result, None if the path does not exist.
+        '''
+        key = self.normalize(path)
+        with self._lock:
+            entry = self._stats.get(key)
+        if(entry and self._isFresh(entry)):
+            return entry[1]
+
+        try:
+            result = os.stat(path)
+        except OSError:
+            result = None
+
+        with self._lock:
+            self._stats[key] = (time.time(), result)
+        return result
+
+    def listDirectory(self, folder):
+        ''' List a folder with a single scandir call.
+
+        Args:
+            folder  (str)       : The folder path.
+
+        Returns:
+            dict(str, bool)     : True if the entry is a folder by normalized entry name, None if the folder does not exist.
+        '''
+        key = self.normalize(folder)
+        with self._lock:
+            entry = self._listings.get(key)
+        if(entry and self._isFresh(entry)):
+            return entry[1]
+
+        entries = None
+        try:
+            if(hasattr(os, "scandir")):
+                entries = dict((os.path.normcase(item.name), item.is_dir()) for item in os.scandir(folder))
+            else:
+                entries = dict((os.path.normcase(name), os.path.isdir(os.path.join(folder, name))) for name in os.listdir(folder))
+        except OSError:
+            entries = None
+
+        with self._lock:
+            self._listings[key] = (time.time(), entries)
+        return entries
+
+    def _getListedEntry(self, path):
+        ''' Get the state of a path from a cached listing of its folder.
+
+        Args:
+            path    (str)   : The path.
+
+        Returns:
+            bool            : True if the path is a folder, False if it is a file, None if it does not exist.
+                            The listing is not used when the folder has not been listed.
+        '''
+        folder, name = os.path.split(self.normalize(path))
+        with self._lock:
+            entry = self._listings.get(folder)
+        if(not entry or not self._isFresh(entry)):
+            raise KeyError(path)
+        if(entry[1] is None):
+            return None
+        return entry[1].get(name)
+
+    def exists(self, path, scanDirectory=False):
+        ''' Check if a path exists.
+
+        Args:
+            path            (str)               : The path.
+            scanDirectory   (bool,  optional)   : If True, the folder of the path is listed and
+                                                the next checks in the folder use the listing.
+                                                Defaults to False.
+
+        Returns:
+            bool                                : True if the path exists.
+        '''
+        path = os.path.normpath(path)
+        if(scanDirectory):
+            self.listDirectory(os.path.dirname(path))
+        try:
+            return self._getListedEntry(path) is not None
+        except KeyError:
+            return self.stat(path) is not None
+
+    def existsMany(self, paths):
+        ''' Check if the paths exist, with one listing per folder.
+
+        Args:
+            paths   (list(str)) : The paths.
+
+        Returns:
+            dict(str, bool)     : True if the path exists by path.
+        '''
+        states = {}
+        for path in paths:
+            states[path] = self.exists(path, scanDirectory=True)
+        return states
+
+    def isFile(self, path):
+        ''' Check if a path is an existing file.
+
+        Args:
+            path    (str)   : The path.
+
+        Returns:
+            bool            : True if the path is a file.
+        '''
+        path = os.path.normpath(path)
+        try:
+            return self._getListedEntry(path) is False
+        except KeyError:
+            result = self.stat(path)
+            return result is not None and not stat.S_ISDIR(result.st_mode)
+
+    def isDir(self, path):
+        ''' Check if a path is an existing folder.
+
+        Args:
+            path    (str)   : The path.
+
+        Returns:
+            bool            : True if the path is a folder.
+        '''
+        path = os.path.normpath(path)
+        try:
+            return self._getListedEntry(path) is True
+        except KeyError:
+            result = self.stat(path)
+            return result is not None and stat.S_ISDIR(result.st_mode)
+
+    def invalidate(self, path=None):
+        ''' Drop the cached state of a path and the listing of its folder.
+
+        Args:
+            path    (str,   optional)   : The path, if None all the cache is dropped.
+                                        Defaults to None.
+        '''
+        with self._lock:
+            if(path is None):
+                self._stats     = {}
+                self._listings  = {}
+                return
+            key = self.normalize(path)
+            self._stats.pop(key, None)
+            self._listings.pop(key, None)
+            self._listings.pop(os.path.dirname(key), None)
@@ -0,0 +1,347 @@
+import  hashlib
+import  json
+import  os
+import  threading
+import  time
+
+from concurrent.futures import ThreadPoolExecutor
+
+from .pathResolver  import PathResolver
+
+
+class PublishCache(object):
+    ''' Local copy of the published files.
+    The files are copied from the file server to a local folder by a pool of threads,
+    and the copy is verified with a checksum before being used. A copy is valid while the
+    size and modification time of the published file are unchanged. The least recently used
+    copies are removed when the cache is over its size budget.
+    The entries are kept in an index json at the root of the cache.
+    The caches of the session map their local copies back to the published files, so the
+    tools reading the files of the scene always get the published paths.
+    '''
+
+    # The name of the index file.
+    INDEX_NAME  = "index.json"
+    # The size of the chunks read to copy and hash the files.
+    CHUNK_SIZE  = 1024 * 1024
+
+    # The caches of the session.
+    _caches     = []
+
+    def __init__(self, cacheRoot, sizeBudget=50 * 1024 ** 3, workers=4, hashName="sha1"):
+        ''' Initialize the cache.
+
+        Args:
+            cacheRoot   (str)               : The local folder of the cache.
+            sizeBudget  (int,   optional)   : The maximum size of the cache, in bytes.
+                                            Defaults to 50 GB.
+            workers     (int,   optional)   : The number of copy threads.
+                                            Defaults to 4.
+            hashName    (str,   optional)   : The hashlib algorithm of the checksums.
+                                            Defaults to "sha1".
+        '''
+        self._cacheRoot     = cacheRoot
+        self._sizeBudget    = sizeBudget
+        self._hashName      = hashName
+        self._executor      = ThreadPoolExecutor(max_workers=workers)
+        self._lock          = threading.Lock()
+        # The copies in progress by published file.
+        self._pending       = {}
+
+        if(not os.path.isdir(cacheRoot)):
+            os.makedirs(cacheRoot)
+
+        self._indexPath = os.path.join(cacheRoot, self.INDEX_NAME)
+        self._index     = self._readIndex()
+        # The published file by local file key, the evicted copies are kept as they can still be loaded.
+        self._publishedPaths = dict((self._getKey(entry["localPath"]), path) for path, entry in self._index.items())
+
+        PublishCache._caches.append(self)
+
+    # INDEX
+
+    def _readIndex(self):
+        ''' Read the index of the cache.
+
+        Returns:
+            dict    : The entries by published file.
+        '''
+        if(not os.path.isfile(self._indexPath)):
+            return {}
+        try:
+            with open(self._indexPath, "r") as f:
+                return json.load(f)
+        except ValueError:
+            # A broken index is rebuilt by the next copies.
+            return {}
+
+    def _writeIndex(self):
+        ''' Write the index of the cache, the lock must be held.
+        '''
+        tempPath = "%s.%d.tmp" % (self._indexPath, threading.current_thread().ident)
+        with open(tempPath, "w") as f:
+            json.dump(self._index, f, indent=4, sort_keys=True)
+        os.replace(tempPath, self._indexPath)
+
+    def getLocalPath(self, path):
+        ''' Get the location of the copy of a published file.
+
+        Args:
+            path    (str)   : The published file.
+
+        Returns:
+            str             : The local file.
+        '''
+        key = hashlib.sha1(os.path.normpath(path).encode("utf-8")).hexdigest()
+        return os.path.join(self._cacheRoot, key[:2], key, os.path.basename(path))
+
+    @classmethod
+    def _getKey(cls, path):
+        ''' Get the key of a file in the session caches.
+
+        Args:
+            path    (str)   : The file.
+
+        Returns:
+            str             : The normalized file path.
+        '''
+        return os.path.normcase(os.path.normpath(path))
+
+    def getPublishedPath(self, localPath):
+        ''' Get the published file of a local copy.
+
+        Args:
+            localPath   (str)   : The local file.
+
+        Returns:
+            str                 : The published file, None if the file is not a copy of this cache.
+        '''
+        with self._lock:
+            return self._publishedPaths.get(self._getKey(localPath))
+
+    @classmethod
+    def toPublishedPath(cls, path):
+        ''' Map a file loaded from a session cache back to its published file.
+
+        Args:
+            path    (str)   : The file, a local copy or a published file.
+
+        Returns:
+            str             : The published file, the file itself if it is not a local copy.
+        '''
+        if(not path):
+            return path
+        for cache in cls._caches:
+            publishedPath = cache.getPublishedPath(path)
+            if(publishedPath is not None):
+                return publishedPath
+        return path
+
+    def _isValid(self, path, entry):
+        ''' Check if an entry matches the published file.
+
+        Args:
+            path    (str)   : The published file.
+            entry   (dict)  : The cache entry.
+
+        Returns:
+            bool            : True if the copy can be used.
+        '''
+        source = PathResolver.get().stat(path)
+        if(source is None):
+            return False
+        return (
+            entry["size"] == source.st_size and
+            entry["mtime"] == source.st_mtime and
+            os.path.isfile(entry["localPath"])
+        )
+
+    # COPY
+
+    def _hashFile(self, path):
+        ''' Get the checksum of a file.
+
+        Args:
+            path    (str)   : The file.
+
+        Returns:
+            str             : The checksum.
+        '''
+        checksum = hashlib.new(self._hashName)
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(self.CHUNK_SIZE), b""):
+                checksum.update(chunk)
+        return checksum.hexdigest()
+
+    def _copy(self, path):
+        ''' Copy a published file to the cache and verify the copy.
+
+        Args:
+            path    (str)   : The published file.
+
+        Returns:
+            str             : The local file.
+        '''
+        source      = os.stat(path)
+        localPath   = self.getLocalPath(path)
+        tempPath    = localPath + ".part"
+        localFolder = os.path.dirname(localPath)
+        if(not os.path.isdir(localFolder)):
+            os.makedirs(localFolder)
+
+        # Hash the published file while copying it.
+        checksum = hashlib.new(self._hashName)
+        with open(path, "rb") as src, open(tempPath, "wb") as dst:
+            for chunk in iter(lambda: src.read(self.CHUNK_SIZE), b""):
+                checksum.update(chunk)
+                dst.write(chunk)
+        checksum = checksum.hexdigest()
+
+        # Verify the written copy.
+        if(self._hashFile(tempPath) != checksum):
+            os.remove(tempPath)
+            raise Exception("The copy of '%s' does not match the published file." % path)
+        os.replace(tempPath, localPath)
+
+        with self._lock:
+            self._index[path] = {
+                "localPath"     : localPath,
+                "size"          : source.st_size,
+                "mtime"         : source.st_mtime,
+                "checksum"      : checksum,
+                "lastAccess"    : time.time()
+            }
+            self._publishedPaths[self._getKey(localPath)] = path
+            self._evict()
+            self._writeIndex()
+
+        return localPath
+
+    def _copyTask(self, path):
+        ''' Run a copy in the pool and clear its pending state.
+
+        Args:
+            path    (str)   : The published file.
+
+        Returns:
+            str             : The local file.
+        '''
+        try:
+            return self._copy(path)
+        finally:
+            with self._lock:
+                self._pending.pop(path, None)
+
+    def _evict(self):
+        ''' Remove the least recently used copies until the cache fits its budget.
+        The lock must be held.
+        '''
+        totalSize = sum(entry["size"] for entry in self._index.values())
+        if(totalSize <= self._sizeBudget):
+            return
+
+        for path, entry in sorted(self._index.items(), key=lambda x : x[1]["lastAccess"]):
+            if(totalSize <= self._sizeBudget):
+                break
+            # Keep the copies being written.
+            if(path in self._pending):
+                continue
+            if(os.path.isfile(entry["localPath"])):
+                os.remove(entry["localPath"])
+            del self._index[path]
+            totalSize -= entry["size"]
+
+    # API
+
+    def prefetch(self, paths):
+        ''' Copy published files to the cache in the background.
+        The files already cached or being copied are skipped.
+
+        Args:
+            paths   (list(str))     : The published files.
+
+        Returns:
+            dict(str, Future)       : The copies in progress by published file.
+        '''
+        futures = {}
+        for path in paths:
+            with self._lock:
+                entry = self._index.get(path)
+                future = self._pending.get(path)
+            if(future is None and entry and self._isValid(path, entry)):
+                continue
+            if(future is None):
+                with self._lock:
+                    future = self._pending.get(path)
+                    if(future is None):
+                        future = self._executor.submit(self._copyTask, path)
+                        self._pending[path] = future
+            futures[path] = future
+
+        return futures
+
+    def resolve(self, path, wait=False):
+        ''' Get the file to load for a published file.
+
+        Args:
+            path    (str)               : The published file.
+            wait    (bool,  optional)   : If True, the file is copied when not cached.
+                                        Otherwise the copy is made in the background and the
+                                        published file is returned.
+                                        Defaults to False.
+
+        Returns:
+            str                         : The local copy when valid, otherwise the published file.
+        '''
+        with self._lock:
+            entry = self._index.get(path)
+        if(entry and self._isValid(path, entry)):
+            with self._lock:
+                entry["lastAccess"] = time.time()
+            return entry["localPath"]
+
+        future = self.prefetch([path]).get(path)
+        if(wait and future is not None):
+            try:
+                return future.result()
+            except Exception as e:
+                print("WARNING : The file '%s' could not be cached, %s" % (path, e))
+        return path
+
+    def wait(self, timeout=None):
+        ''' Wait for the copies in progress.
+
+        Args:
+            timeout (float, optional)   : The maximum time to wait for each copy, in seconds.
+                                        Defaults to None.
+        '''
+        with self._lock:
+            futures = list(self._pending.values())
+        for future in futures:
+            try:
+                future.result(timeout=timeout)
+            except Exception as e:
+                print("WARNING : A publish file could not be cached, %s" % e)
+
+    def saveIndex(self):
+        ''' Write the access times of the entries to the index.
+        '''
+        with self._lock:
+            self._writeIndex()
+
+    def shutdown(self):
+        ''' Wait for the copies in progress and stop the threads.
+        '''
+        self._executor.shutdown(wait=True)
+        self.saveIndex()
+        if(self in PublishCache._caches):
+            PublishCache._caches.remove(self)
+
+    @property
+    def size(self):
+        with self._lock:
+            return sum(entry["size"] for entry in self._index.values())
+
+    @property
+    def cacheRoot(self):
+        return self._cacheRoot
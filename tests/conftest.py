@@ -0,0 +1,5 @@
+import  os
+import  sys
+
+# The framework python folder is imported as the "python" package.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
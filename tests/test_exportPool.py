@@ -0,0 +1,169 @@
+import  os
+import  shutil
+import  sys
+import  tempfile
+import  unittest
+
+from unittest import mock
+
+from python.utils   import ExportPool
+from python.maya    import mayaExportBackend
+from python.maya.mayaExportBackend  import MayaExportBackend
+
+
+# The stand-in worker, it follows the worker protocol without Maya.
+# The "mode" argument of the job makes it succeed, fail until an attempt, or hang.
+WORKER_SCRIPT = '''
+import json
+import os
+import sys
+import time
+
+with open(sys.argv[1], "r") as f:
+    job = json.load(f)
+args = job["args"]
+
+# Count the attempts in a file next to the job.
+countPath = sys.argv[1] + ".count"
+count = 1
+if(os.path.isfile(countPath)):
+    with open(countPath, "r") as f:
+        count = int(f.read()) + 1
+with open(countPath, "w") as f:
+    f.write(str(count))
+
+if(args["mode"] == "hang"):
+    time.sleep(30)
+
+if(args["mode"] == "fail" and count < args.get("succeedAt", 1000)):
+    with open(job["resultPath"], "w") as f:
+        json.dump({"status": "error", "error": "Failure %d" % count}, f)
+    sys.exit(1)
+
+with open(args["path"], "w") as f:
+    f.write(job["type"])
+with open(job["resultPath"], "w") as f:
+    json.dump({"status": "ok", "outputs": [args["path"]]}, f)
+'''
+
+
+class WorkerTestCase(unittest.TestCase):
+    ''' Write the stand-in worker, run by the local python.
+    '''
+
+    def setUp(self):
+        self._folder = tempfile.mkdtemp(prefix="p3d_test_")
+        self._workerScript = os.path.join(self._folder, "worker.py")
+        with open(self._workerScript, "w") as f:
+            f.write(WORKER_SCRIPT)
+
+    def tearDown(self):
+        shutil.rmtree(self._folder)
+
+
+class ExportPoolTest(WorkerTestCase):
+    ''' Test the export pool with the stand-in worker.
+    '''
+
+    def getPool(self, **kwargs):
+        pool = ExportPool(sys.executable, self._workerScript, poolSize=2, logFolder=os.path.join(self._folder, "logs"), **kwargs)
+        self.addCleanup(pool.shutdown)
+        return pool
+
+    def test_submitRunsTheJobs(self):
+        pool = self.getPool()
+        paths = [os.path.join(self._folder, "out_%d.txt" % index) for index in range(3)]
+
+        futures = [pool.submit("alembics", {"mode": "ok", "path": path}) for path in paths]
+        results = [future.result(timeout=60) for future in futures]
+
+        for path, result in zip(paths, results):
+            self.assertEqual(result["status"], "ok")
+            self.assertEqual(result["outputs"], [path])
+            self.assertEqual(result["attempts"], 1)
+            self.assertTrue(os.path.isfile(result["log"]))
+            with open(path, "r") as f:
+                self.assertEqual(f.read(), "alembics")
+        self.assertEqual(len(set(result["id"] for result in results)), 3)
+
+    def test_failedJobIsRetried(self):
+        pool = self.getPool(retries=2)
+        path = os.path.join(self._folder, "out.txt")
+
+        result = pool.submit("materialX", {"mode": "fail", "succeedAt": 2, "path": path}).result(timeout=60)
+
+        self.assertEqual(result["status"], "ok")
+        self.assertEqual(result["attempts"], 2)
+        self.assertTrue(os.path.isfile(path))
+
+    def test_failedJobRaisesAfterTheRetries(self):
+        pool = self.getPool(retries=1)
+        future = pool.submit("materialX", {"mode": "fail", "path": os.path.join(self._folder, "out.txt")})
+
+        with self.assertRaises(Exception) as context:
+            future.result(timeout=60)
+
+        self.assertIn("after 2 attempt(s)", str(context.exception))
+        self.assertIn("Failure 2", str(context.exception))
+
+    def test_timedOutJobRaises(self):
+        pool = self.getPool(timeout=0.5, retries=0)
+        future = pool.submit("mayaSelection", {"mode": "hang", "path": os.path.join(self._folder, "out.txt")})
+
+        with self.assertRaises(Exception) as context:
+            future.result(timeout=60)
+
+        self.assertIn("timed out", str(context.exception))
+        with open(os.path.join(pool.logFolder, "0001_mayaSelection.log"), "r") as f:
+            self.assertIn("timed out", f.read())
+
+
+class Item(object):
+    ''' A publish item stand-in.
+    '''
+
+    def __init__(self):
+        self.properties = {}
+
+
+class MayaExportBackendTest(WorkerTestCase):
+    ''' Test the export backend with the stand-in worker, the snapshot is not saved by Maya.
+    '''
+
+    def getBackend(self):
+        backend = MayaExportBackend(
+            poolSize        = 2,
+            executable      = sys.executable,
+            workerScript    = self._workerScript,
+            logFolder       = os.path.join(self._folder, "logs")
+        )
+        self.addCleanup(backend.shutdown)
+        return backend
+
+    def test_submitRequiresTheSnapshot(self):
+        backend = self.getBackend()
+
+        with self.assertRaises(Exception):
+            backend.submitMayaSelection(None, ["|chair"], os.path.join(self._folder, "chair.ma"))
+
+    def test_waitCollectsTheSubmittedExport(self):
+        backend = self.getBackend()
+        with mock.patch.object(mayaExportBackend, "cmds", mock.MagicMock(), create=True):
+            backend.saveSnapshot()
+
+        item = Item()
+        path = os.path.join(self._folder, "chair_high.ma")
+        future = backend.submit(item, "mayaAssetLOD", {"mode": "ok", "path": path})
+        self.assertIs(backend.getExport(path), future)
+
+        result = backend.wait(backend.getExport(path))
+
+        self.assertEqual(result["status"], "ok")
+        self.assertTrue(os.path.isfile(path))
+        self.assertEqual(item.properties["exportResults"], [result])
+        self.assertIsNone(backend.getExport(path))
+        self.assertEqual(backend.collect(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
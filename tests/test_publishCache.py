@@ -0,0 +1,137 @@
+import  os
+import  shutil
+import  tempfile
+import  unittest
+
+from unittest import mock
+
+from python.utils               import PathResolver, PublishCache
+from python.maya                import mayaLODSwitcher
+from python.maya.mayaLODSwitcher import MayaLODSwitcher
+
+
+class PublishCacheTest(unittest.TestCase):
+    ''' Test the publish cache against a local publish folder.
+    '''
+
+    def setUp(self):
+        self._folder        = tempfile.mkdtemp(prefix="p3d_test_")
+        self._publishRoot   = os.path.join(self._folder, "publish")
+        os.makedirs(self._publishRoot)
+        self._cache         = PublishCache(os.path.join(self._folder, "cache"), workers=2)
+        PathResolver.get().invalidate()
+
+    def tearDown(self):
+        self._cache.shutdown()
+        shutil.rmtree(self._folder)
+
+    def writePublish(self, name, content="publish"):
+        path = os.path.join(self._publishRoot, name)
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def test_resolveCopiesTheFile(self):
+        path = self.writePublish("chair_rig_high.v001.ma", "high")
+
+        localPath = self._cache.resolve(path, wait=True)
+
+        self.assertNotEqual(localPath, path)
+        self.assertTrue(localPath.startswith(self._cache.cacheRoot))
+        with open(localPath, "r") as f:
+            self.assertEqual(f.read(), "high")
+
+    def test_resolveWithoutWaitReturnsThePublishedFile(self):
+        path = self.writePublish("chair_rig_high.v001.ma")
+
+        self.assertEqual(self._cache.resolve(path, wait=False), path)
+        self._cache.wait()
+        self.assertEqual(self._cache.resolve(path), self._cache.getLocalPath(path))
+
+    def test_changedPublishIsCopiedAgain(self):
+        path = self.writePublish("chair_rig_high.v001.ma", "first")
+        localPath = self._cache.resolve(path, wait=True)
+
+        self.writePublish("chair_rig_high.v001.ma", "second version")
+        PathResolver.get().invalidate(path)
+
+        self.assertEqual(self._cache.resolve(path, wait=True), localPath)
+        with open(localPath, "r") as f:
+            self.assertEqual(f.read(), "second version")
+
+    def test_indexIsReadBack(self):
+        path = self.writePublish("chair_rig_high.v001.ma")
+        localPath = self._cache.resolve(path, wait=True)
+        self._cache.shutdown()
+
+        self._cache = PublishCache(self._cache.cacheRoot)
+        self.assertEqual(self._cache.resolve(path, wait=False), localPath)
+        self.assertEqual(PublishCache.toPublishedPath(localPath), path)
+
+    def test_evictionKeepsTheBudget(self):
+        self._cache.shutdown()
+        self._cache = PublishCache(os.path.join(self._folder, "small"), sizeBudget=10, workers=1)
+        first   = self.writePublish("first.ma", "0123456789")
+        second  = self.writePublish("second.ma", "0123456789")
+
+        firstLocal = self._cache.resolve(first, wait=True)
+        self._cache.resolve(second, wait=True)
+
+        self.assertFalse(os.path.isfile(firstLocal))
+        self.assertLessEqual(self._cache.size, 10)
+        # The evicted copy can still be loaded by a scene, it is still mapped back.
+        self.assertEqual(PublishCache.toPublishedPath(firstLocal), first)
+
+    def test_toPublishedPath(self):
+        path = self.writePublish("chair_rig_high.v001.ma")
+        localPath = self._cache.resolve(path, wait=True)
+
+        self.assertEqual(PublishCache.toPublishedPath(localPath), path)
+        self.assertEqual(PublishCache.toPublishedPath(path), path)
+        self.assertIsNone(self._cache.getPublishedPath(path))
+
+    def test_lodSwitchOnCachedReference(self):
+        low     = self.writePublish("chair_rig_low.v001.ma", "low")
+        high    = self.writePublish("chair_rig_high.v001.ma", "high")
+        loaded  = {"chairRN": self._cache.resolve(low, wait=True)}
+
+        def referenceQuery(refNode, **kwargs):
+            return loaded[refNode]
+
+        def loadReference(path, loadReference=None, **kwargs):
+            loaded[loadReference] = path
+
+        cmds = mock.Mock()
+        cmds.referenceQuery.side_effect = referenceQuery
+        cmds.file.side_effect           = loadReference
+
+        # A template only parses the files of the publish folder.
+        template = mock.Mock()
+        template.get_fields.side_effect = lambda path : (
+            {"lod": os.path.basename(path).split("_")[2].split(".")[0], "name": "chair"}
+            if os.path.dirname(path) == self._publishRoot else None
+        )
+        template.apply_fields.side_effect = lambda fields : os.path.join(
+            self._publishRoot, "%s_rig_%s.v001.ma" % (fields["name"], fields["lod"])
+        )
+
+        with mock.patch.object(mayaLODSwitcher, "cmds", cmds, create=True):
+            switcher = MayaLODSwitcher(template)
+            self.assertEqual(MayaLODSwitcher.getReferencePath("chairRN"), low)
+            self.assertEqual(switcher.getLOD(MayaLODSwitcher.getReferencePath("chairRN")), "low")
+
+            report = switcher.switch("high", references=["chairRN"], resolve=lambda path : self._cache.resolve(path, wait=True))
+
+            self.assertEqual(report["switched"], {"chairRN": high})
+            self.assertEqual(report["missing"], [])
+            # The reference is loaded from the local copy and read back as the published file.
+            self.assertEqual(loaded["chairRN"], self._cache.getLocalPath(high))
+            self.assertEqual(MayaLODSwitcher.getReferencePath("chairRN"), high)
+
+            # The reference already on its target is skipped.
+            report = switcher.switch("high", references=["chairRN"])
+            self.assertEqual(report["skipped"], ["chairRN"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+import  os
+import  shutil
+import  tempfile
+import  unittest
+
+from python.maya    import MayaAsset, PublishTools
+from python.maya.mayaHierarchy  import MayaHierarchy
+
+
+# A production asset with meshes in every LOD.
+ROOT = "|chair"
+GROUPS = [
+    "|chair|meshes_GRP",
+    "|chair|meshes_GRP|HI_GRP",
+    "|chair|meshes_GRP|HI_GRP|seat_high",
+    "|chair|meshes_GRP|HI_GRP|leg_high",
+    "|chair|meshes_GRP|MI_GRP",
+    "|chair|meshes_GRP|MI_GRP|seat_mid",
+    "|chair|meshes_GRP|LO_GRP",
+    "|chair|meshes_GRP|LO_GRP|seat_low",
+    "|chair|meshes_GRP|Technical_GRP",
+    "|chair|meshes_GRP|Technical_GRP|ALL_GRP",
+    "|chair|meshes_GRP|Technical_GRP|ALL_GRP|collider",
+    "|chair|meshes_GRP|Technical_GRP|HI_GRP",
+    "|chair|meshes_GRP|Technical_GRP|HI_GRP|cloth_high",
+    "|chair|meshes_GRP|Technical_GRP|MI_GRP",
+    "|chair|meshes_GRP|Technical_GRP|LO_GRP",
+    "|chair|bones_GRP",
+    "|chair|bones_GRP|root_JNT",
+    "|chair|rig_GRP",
+    "|chair|rig_GRP|main_CON"
+]
+
+
+def getAsset(nodes):
+    ''' Get an asset on a synthetic hierarchy.
+    '''
+    asset = MayaAsset(ROOT, readOnly=True)
+    # listRelatives returns the descendants deepest first.
+    asset.hierarchy = MayaHierarchy(ROOT, descendants=list(reversed(nodes)))
+    return asset
+
+
+class LODExportSelectionTest(unittest.TestCase):
+    ''' Test the LOD export selection on a synthetic asset hierarchy.
+    '''
+
+    def getExportedNodes(self, selection, emptyGroups):
+        ''' Get the nodes written by the export of the selection, with their parents and the empty groups.
+        '''
+        exported = set(emptyGroups)
+        for node in selection:
+            exported.add(node)
+            exported.update(path for path in GROUPS if path.startswith(node + "|"))
+            parent = node.rpartition("|")[0]
+            while(parent and parent != ROOT):
+                exported.add(parent)
+                parent = parent.rpartition("|")[0]
+        # Keep the hierarchy order.
+        return [path for path in GROUPS if path in exported]
+
+    def test_otherLODsContentIsExcluded(self):
+        selection, emptyGroups = PublishTools().getLODExportSelection(getAsset(GROUPS), "HI")
+        exported = self.getExportedNodes(selection, emptyGroups)
+
+        self.assertIn("|chair|meshes_GRP|HI_GRP|seat_high", exported)
+        self.assertIn("|chair|meshes_GRP|Technical_GRP|HI_GRP|cloth_high", exported)
+        self.assertIn("|chair|meshes_GRP|Technical_GRP|ALL_GRP|collider", exported)
+        self.assertIn("|chair|rig_GRP|main_CON", exported)
+        self.assertNotIn("|chair|meshes_GRP|MI_GRP|seat_mid", exported)
+        self.assertNotIn("|chair|meshes_GRP|LO_GRP|seat_low", exported)
+        self.assertEqual(sorted(emptyGroups), ["|chair|meshes_GRP|LO_GRP", "|chair|meshes_GRP|MI_GRP"])
+
+    def test_exportedAssetIsValid(self):
+        for lod in ["LO", "MI", "HI"]:
+            selection, emptyGroups = PublishTools().getLODExportSelection(getAsset(GROUPS), lod)
+            exported = getAsset(self.getExportedNodes(selection, emptyGroups))
+
+            self.assertTrue(exported.isValid(), lod)
+            for otherLod in ["LO", "MI", "HI"]:
+                if(otherLod != lod):
+                    self.assertEqual(getattr(exported, "meshes" + otherLod), [])
+                    self.assertEqual(getattr(exported, "meshesTechnical" + otherLod), [])
+
+
+class AddEmptyGroupsTest(unittest.TestCase):
+    ''' Test the empty groups written in an exported maya ascii file.
+    '''
+
+    def setUp(self):
+        self._folder = tempfile.mkdtemp(prefix="p3d_test_")
+
+    def tearDown(self):
+        shutil.rmtree(self._folder)
+
+    def test_groupsAreCreatedBeforeTheEnd(self):
+        path = os.path.join(self._folder, "chair.ma")
+        with open(path, "w") as f:
+            f.write('createNode transform -n "chair";\n// End of chair.ma\n')
+
+        PublishTools().addEmptyGroups(path, ["|chair|meshes_GRP|MI_GRP"])
+
+        with open(path, "r") as f:
+            lines = f.read().splitlines()
+        self.assertEqual(lines, [
+            'createNode transform -n "chair";',
+            'createNode transform -n "MI_GRP" -p "|chair|meshes_GRP";',
+            "// End of chair.ma"
+        ])
+
+
+if __name__ == "__main__":
+    unittest.main()